@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Сравнение скорости загрузки и пикового RSS для форматов входных данных
+
+Строки демо таблицы размножаются до --rows записей и сохраняются в xlsx,
+CSV, Parquet и Arrow. Каждый формат загружается в отдельном процессе
+(load_file + validate_structure + clean_data), чтобы пиковый RSS одного
+замера не влиял на другие.
+
+    uv run python benchmarks/input_formats.py --rows 100000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+FORMATS = ['xlsx', 'csv', 'parquet', 'arrow']
+
+
+def load_config():
+    with open(ROOT / 'config.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def generate(rows, folder):
+    """Синтетические данные во всех форматах"""
+    import pandas as pd
+
+    config = load_config()
+    demo = pd.read_excel(ROOT / config['input']['excel_file'])
+    data = demo.iloc[[i % len(demo) for i in range(rows)]].reset_index(drop=True)
+    data.iloc[:, 0] = range(1, rows + 1)
+
+    paths = {name: folder / f"data.{name}" for name in FORMATS}
+    data.to_excel(paths['xlsx'], index=False)
+    data.to_csv(paths['csv'], index=False)
+    data.to_parquet(paths['parquet'], index=False)
+    data.to_feather(paths['arrow'])
+    return paths
+
+
+def measure(path):
+    """Замер в текущем процессе: время загрузки и пиковый RSS в МБ"""
+    from src.core.excel_processor import ExcelProcessor
+    from src.utils.metrics import peak_rss
+
+    started = time.perf_counter()
+    processor = ExcelProcessor(load_config())
+    processor.load_file(path)
+    processor.validate_structure()
+    processor.clean_data()
+    elapsed = time.perf_counter() - started
+
+    return {'rows': len(processor.data), 'seconds': elapsed, 'peak_rss_mb': peak_rss() / 1024 / 1024}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure)))
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"Генерация {args.rows} строк...")
+        paths = generate(args.rows, Path(folder))
+
+        print(f"{'формат':<10}{'размер, МБ':>12}{'загрузка, с':>14}{'пик RSS, МБ':>14}")
+        for name, path in paths.items():
+            output = subprocess.run(
+                [sys.executable, __file__, '--measure', str(path)],
+                check=True, capture_output=True, text=True, cwd=ROOT
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            size = path.stat().st_size / 1024 / 1024
+            print(f"{name:<10}{size:>12.1f}{result['seconds']:>14.2f}{result['peak_rss_mb']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк генерации на синтетических данных с базовыми результатами
+
+Генерирует таблицу, шаблон и изображения по сценарию (small, medium,
+large, huge) и замеряет в отдельных процессах: загрузку и очистку данных,
+подстановку плейсхолдеров, поиск изображений, создание документа и полный
+запуск main.py. Для каждого замера выводятся операций в секунду и пиковый
+RSS.
+
+    uv run python benchmarks/suite.py --scenario small --save-baseline
+    uv run python benchmarks/suite.py --scenario small --compare
+
+--compare завершается с кодом 1, если скорость замера упала или память
+выросла больше допуска относительно сохраненного базового результата.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+BASELINES = ROOT / 'benchmarks' / 'baselines'
+
+SCENARIOS = {
+    'small': {
+        'rows': 1000, 'pipeline_rows': 200, 'documents': 100, 'text_placeholders': 10, 'image_placeholders': 2,
+        'tables': 2, 'nested_tables': 1, 'images': 50, 'image_size': [640, 480], 'data_format': 'xlsx'
+    },
+    'medium': {
+        'rows': 10000, 'pipeline_rows': 500, 'documents': 200, 'text_placeholders': 30, 'image_placeholders': 4,
+        'tables': 5, 'nested_tables': 2, 'images': 300, 'image_size': [1280, 960], 'data_format': 'xlsx'
+    },
+    'large': {
+        'rows': 100000, 'pipeline_rows': 1000, 'documents': 200, 'text_placeholders': 60, 'image_placeholders': 6,
+        'tables': 10, 'nested_tables': 4, 'images': 1000, 'image_size': [1920, 1440], 'data_format': 'xlsx'
+    },
+    'huge': {
+        'rows': 1000000, 'pipeline_rows': 1000, 'documents': 200, 'text_placeholders': 20, 'image_placeholders': 4,
+        'tables': 10, 'nested_tables': 4, 'images': 1000, 'image_size': [1920, 1440], 'data_format': 'csv'
+    }
+}
+
+CASES = ['load_data', 'clean_data', 'substitute', 'find_image', 'create_document', 'pipeline']
+
+
+def load_config():
+    with open(ROOT / 'config.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def prepare(spec, folder):
+    """Синтетические данные сценария в папке folder"""
+    import synthetic
+
+    folder = Path(folder)
+    width, height = spec['image_size']
+    image_names = synthetic.make_images(folder / 'images' / synthetic.IMAGE_FOLDER, spec['images'], width, height)
+    template = synthetic.make_template(
+        folder / 'template.docx', spec['text_placeholders'], spec['image_placeholders'],
+        spec['tables'], spec['nested_tables']
+    )
+
+    counts = (spec['text_placeholders'], spec['image_placeholders'])
+    for subfolder, rows in (('data', spec['rows']), ('pipeline', spec['pipeline_rows'])):
+        data = synthetic.make_data(folder / subfolder / f"data.{spec['data_format']}", rows, *counts, image_names)
+        synthetic.make_config(load_config(), folder / subfolder, data, template, folder / 'images', *counts)
+
+
+def measure(case, folder, spec):
+    """Замер одного случая в текущем процессе"""
+    from src.core.excel_processor import ExcelProcessor
+    from src.core.word_processor import WordProcessor
+    from src.utils.logger import setup_logger, shutdown_logger
+    from src.utils.metrics import peak_rss, peak_rss_children
+
+    folder = Path(folder)
+    setup_logger({'format': 'progress'})
+    with open(folder / 'data' / 'config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    def loaded_data(clean=True):
+        processor = ExcelProcessor(config)
+        processor.load_file(config['input']['excel_file'])
+        if clean:
+            processor.clean_data()
+        return processor
+
+    def word_processor():
+        processor = WordProcessor(config)
+        processor.load_template(config['input']['word_template'])
+        return processor
+
+    if case == 'load_data':
+        started = time.perf_counter()
+        operations = len(loaded_data(clean=False).data)
+        seconds = time.perf_counter() - started
+
+    elif case == 'clean_data':
+        processor = loaded_data(clean=False)
+        started = time.perf_counter()
+        processor.clean_data()
+        seconds = time.perf_counter() - started
+        operations = len(processor.data)
+
+    elif case == 'substitute':
+        processor = word_processor()
+        row = next(loaded_data().iter_records())[1]
+        values, images, _ = processor._collect_row_values(row)
+        seconds = 0.0
+        for _ in range(spec['documents']):
+            _, paragraphs = processor.compiled_template.clone()
+            started = time.perf_counter()
+            for paragraph in paragraphs.values():
+                processor.substitution.substitute(paragraph._p, values, images)
+            seconds += time.perf_counter() - started
+        operations = spec['documents']
+
+    elif case == 'find_image':
+        processor = word_processor()
+        data = loaded_data().data
+        columns = [value['column'] for value in config['placeholders'].values() if value['type'] == 'image']
+        names = [name for column in columns for name in data[column] if name]
+        names = names * max(1, 100000 // max(1, len(names)))
+        started = time.perf_counter()
+        for name in names:
+            processor._find_image_file(name)
+        seconds = time.perf_counter() - started
+        operations = len(names)
+
+    elif case == 'create_document':
+        processor = word_processor()
+        records = loaded_data().iter_records()
+        rows = [row for _, (_, row) in zip(range(spec['documents']), records)]
+        started = time.perf_counter()
+        for row in rows:
+            processor.create_document_from_template(row, io.BytesIO())
+        seconds = time.perf_counter() - started
+        operations = len(rows)
+
+    elif case == 'pipeline':
+        import main as application
+
+        shutdown_logger()
+        os.chdir(folder / 'pipeline')
+        started = time.perf_counter()
+        application.main(['--log-format', 'progress', '--workers', str(spec.get('workers', 1))])
+        seconds = time.perf_counter() - started
+        operations = len(list(Path('output/word').glob('*.docx')))
+        if operations != spec['pipeline_rows']:
+            raise RuntimeError(f"Создано {operations} документов из {spec['pipeline_rows']}")
+
+    else:
+        raise ValueError(f"Неизвестный замер: {case}")
+
+    shutdown_logger()
+    peak = max(peak_rss() or 0, peak_rss_children() or 0)
+    return {
+        'operations': operations,
+        'seconds': seconds,
+        'operations_per_second': operations / seconds if seconds > 0 else 0.0,
+        'peak_rss_mb': peak / 1024 / 1024
+    }
+
+
+def run_case(case, folder, spec, repeat):
+    """Лучший из repeat замеров, каждый в отдельном процессе"""
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, __file__, '--measure', case, '--folder', str(folder), '--spec', json.dumps(spec)],
+            check=True, capture_output=True, text=True, cwd=ROOT
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result['operations_per_second'] > best['operations_per_second']:
+            best = result
+    return best
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """Сравнение с базовыми результатами, возвращает список регрессий"""
+    regressions = []
+    for case, result in results.items():
+        base = baseline['results'].get(case)
+        if base is None:
+            continue
+
+        speed = result['operations_per_second'] / base['operations_per_second'] if base['operations_per_second'] else 1.0
+        memory = result['peak_rss_mb'] / base['peak_rss_mb'] if base['peak_rss_mb'] else 1.0
+        status = 'ok'
+        if speed < 1 - tolerance:
+            regressions.append(f"{case}: скорость {speed * 100:.0f}% от базовой")
+            status = 'РЕГРЕССИЯ'
+        if memory > 1 + memory_tolerance:
+            regressions.append(f"{case}: память {memory * 100:.0f}% от базовой")
+            status = 'РЕГРЕССИЯ'
+        print(f"{case:<18}{speed * 100:>10.0f}%{memory * 100:>10.0f}%   {status}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='small')
+    parser.add_argument('--rows', type=int, help="Строк в таблице для загрузки и очистки")
+    parser.add_argument('--pipeline-rows', type=int, help="Строк для полного запуска main.py")
+    parser.add_argument('--documents', type=int, help="Документов в замерах substitute и create_document")
+    parser.add_argument('--text-placeholders', type=int)
+    parser.add_argument('--image-placeholders', type=int)
+    parser.add_argument('--tables', type=int)
+    parser.add_argument('--nested-tables', type=int)
+    parser.add_argument('--images', type=int, help="Количество файлов изображений")
+    parser.add_argument('--image-size', help="Размер изображений, например 1280x960")
+    parser.add_argument('--data-format', choices=['xlsx', 'csv', 'parquet'])
+    parser.add_argument('--workers', type=int, default=1, help="Процессов в полном запуске main.py")
+    parser.add_argument('--cases', default=','.join(CASES), help="Замеры через запятую")
+    parser.add_argument('--repeat', type=int, default=1, help="Повторов замера, берется лучший")
+    parser.add_argument('--save-baseline', nargs='?', const='', default=None, metavar='PATH')
+    parser.add_argument('--compare', nargs='?', const='', default=None, metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Допустимое падение скорости (доля)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help="Допустимый рост памяти (доля)")
+    parser.add_argument('--keep', help="Папка для синтетических данных (не удаляется)")
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--folder', help=argparse.SUPPRESS)
+    parser.add_argument('--spec', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.folder, json.loads(args.spec))))
+        return 0
+
+    spec = dict(SCENARIOS[args.scenario])
+    for key in ('rows', 'pipeline_rows', 'documents', 'text_placeholders', 'image_placeholders',
+                'tables', 'nested_tables', 'images', 'data_format'):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+    if args.image_size:
+        spec['image_size'] = [int(value) for value in args.image_size.lower().split('x')]
+    spec['workers'] = args.workers
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+
+    with tempfile.TemporaryDirectory(prefix='docgen_bench_') as temporary:
+        folder = Path(args.keep or temporary)
+        print(f"Генерация данных сценария {args.scenario}: {spec['rows']} строк, "
+              f"{spec['text_placeholders']} + {spec['image_placeholders']} плейсхолдеров, "
+              f"{spec['images']} изображений {spec['image_size'][0]}x{spec['image_size'][1]}...")
+        prepare(spec, folder)
+
+        print(f"{'замер':<18}{'операций':>10}{'время, с':>10}{'опер./с':>12}{'пик RSS, МБ':>14}")
+        results = {}
+        for case in cases:
+            result = run_case(case, folder, spec, args.repeat)
+            results[case] = result
+            print(f"{case:<18}{result['operations']:>10}{result['seconds']:>10.2f}"
+                  f"{result['operations_per_second']:>12.1f}{result['peak_rss_mb']:>14.0f}")
+
+    report = {
+        'scenario': args.scenario,
+        'spec': spec,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+    if args.save_baseline is not None:
+        path = Path(args.save_baseline or BASELINES / f"{args.scenario}.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"Базовые результаты сохранены: {path}")
+
+    if args.compare is not None:
+        path = Path(args.compare or BASELINES / f"{args.scenario}.json")
+        baseline = json.loads(path.read_text(encoding='utf-8'))
+        if baseline['spec'] != spec:
+            print("Внимание: параметры сценария отличаются от базовых")
+        print(f"{'замер':<18}{'скорость':>11}{'память':>11}")
+        regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+        if regressions:
+            for message in regressions:
+                print(f"Регрессия: {message}")
+            return 1
+        print("Регрессий нет")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Генераторы синтетических данных для бенчмарков
+
+Таблица с заданным числом строк, шаблон с заданным числом плейсхолдеров,
+таблиц и вложенных таблиц, папка изображений заданного размера и
+количества, config.json для запуска main.py на этих данных.
+"""
+import json
+import struct
+import zlib
+from pathlib import Path
+
+NAMING_COLUMN = 'Номер'
+IMAGE_FOLDER = 'фото'
+CHUNK_ROWS = 50000
+
+
+def text_placeholders(count):
+    """Текстовые плейсхолдеры и колонки: {ПОЛЕ 1} -> 'Поле 1'"""
+    return {f"{{ПОЛЕ {number}}}": f"Поле {number}" for number in range(1, count + 1)}
+
+
+def image_placeholders(count):
+    """Плейсхолдеры изображений и колонки: {ФОТО 1} -> 'Фото 1'"""
+    return {f"{{ФОТО {number}}}": f"Фото {number}" for number in range(1, count + 1)}
+
+
+def make_images(folder, count, width, height):
+    """PNG изображения image_0001.png, ...; возвращает имена без расширения"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    pattern = bytes(range(256)) * (width * 3 // 256 + 2)
+    names = []
+
+    for number in range(1, count + 1):
+        rows = [
+            b'\x00' + pattern[(row + number) % 256:(row + number) % 256 + width * 3]
+            for row in range(height)
+        ]
+        name = f"image_{number:04d}"
+        (folder / f"{name}.png").write_bytes(_png(width, height, b''.join(rows)))
+        names.append(name)
+    return names
+
+
+def _png(width, height, raw):
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw, 1)) + chunk(b'IEND', b''))
+
+
+def make_template(path, text_count, image_count, tables=0, nested_tables=0, table_rows=5):
+    """Word шаблон: абзацы, таблицы и вложенные таблицы с плейсхолдерами
+
+    Каждый третий текстовый плейсхолдер разбит на несколько runs, как это
+    делает Word при редактировании.
+    """
+    from docx import Document
+
+    document = Document()
+    document.add_heading('Синтетический шаблон', level=1)
+    texts = list(text_placeholders(text_count))
+
+    for number, placeholder in enumerate(texts):
+        paragraph = document.add_paragraph(f"Значение {number + 1}: ")
+        if number % 3 == 2:
+            middle = len(placeholder) // 2
+            paragraph.add_run(placeholder[:middle]).bold = True
+            paragraph.add_run(placeholder[middle:])
+        else:
+            paragraph.add_run(placeholder)
+
+    for table_number in range(tables):
+        table = document.add_table(rows=table_rows, cols=2)
+        for row_number, row in enumerate(table.rows):
+            placeholder = texts[(table_number * table_rows + row_number) % len(texts)] if texts else ''
+            row.cells[0].text = f"Строка {row_number + 1}"
+            row.cells[1].text = f"{placeholder} / {placeholder}"
+
+        if table_number < nested_tables:
+            nested = table.cell(0, 1).add_table(rows=2, cols=2)
+            for row_number, row in enumerate(nested.rows):
+                for cell_number, cell in enumerate(row.cells):
+                    cell.text = texts[(row_number * 2 + cell_number) % len(texts)] if texts else ''
+
+    for placeholder in image_placeholders(image_count):
+        document.add_paragraph(placeholder)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document.save(path)
+    return path
+
+
+def make_data(path, rows, text_count, image_count, image_names, missing_share=0.05, empty_share=0.02):
+    """Таблица данных в формате по расширению (.xlsx, .csv, .parquet)
+
+    Доля missing_share ссылок на изображения указывает на несуществующие
+    файлы, доля empty_share ячеек изображений пуста. Строки создаются и
+    записываются частями по CHUNK_ROWS, память не зависит от rows.
+    """
+    import numpy as np
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generator = np.random.default_rng(42)
+    chunks = (
+        _data_chunk(start, min(rows, start + CHUNK_ROWS), text_count, image_count, image_names,
+                    generator, missing_share, empty_share)
+        for start in range(0, rows, CHUNK_ROWS)
+    )
+
+    if path.suffix == '.csv':
+        for number, frame in enumerate(chunks):
+            frame.to_csv(path, index=False, mode='w' if number == 0 else 'a', header=number == 0)
+    elif path.suffix == '.parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for frame in chunks:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            writer = writer or pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        writer.close()
+    else:
+        _write_xlsx(path, chunks)
+    return path
+
+
+def _data_chunk(start, stop, text_count, image_count, image_names, generator, missing_share, empty_share):
+    import numpy as np
+    import pandas as pd
+
+    numbers = np.arange(start + 1, stop + 1)
+    data = {NAMING_COLUMN: numbers}
+    for number, column in enumerate(text_placeholders(text_count).values()):
+        data[column] = pd.Series(numbers + number).astype(str).radd(f"{column} ").to_numpy(dtype=object)
+
+    names = np.array(image_names or ['image_0001'], dtype=object)
+    for column in image_placeholders(image_count).values():
+        values = names[generator.integers(0, len(names), len(numbers))]
+        draw = generator.random(len(numbers))
+        values = np.where(draw < missing_share, 'нет_такого_файла', values)
+        values = np.where(draw > 1 - empty_share, '', values)
+        data[column] = values
+
+    return pd.DataFrame(data)
+
+
+def _write_xlsx(path, chunks):
+    """Запись xlsx в режиме write_only: в разы быстрее DataFrame.to_excel"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for number, frame in enumerate(chunks):
+        if number == 0:
+            sheet.append(list(frame.columns))
+        for row in frame.itertuples(index=False, name=None):
+            sheet.append([value.item() if hasattr(value, 'item') else value for value in row])
+    workbook.save(path)
+
+
+def make_config(base_config, folder, data_path, template_path, images_path, text_count, image_count):
+    """config.json для запуска main.py в папке folder"""
+    folder = Path(folder)
+    placeholders = {
+        placeholder: {'column': column, 'type': 'text'}
+        for placeholder, column in text_placeholders(text_count).items()
+    }
+    placeholders.update({
+        placeholder: {'column': column, 'type': 'image'}
+        for placeholder, column in image_placeholders(image_count).items()
+    })
+
+    config = json.loads(json.dumps(base_config))
+    config['input'].update({
+        'excel_file': str(data_path),
+        'word_template': str(template_path),
+        'images_folder': str(images_path),
+        'images_subdirectories': {IMAGE_FOLDER: IMAGE_FOLDER}
+    })
+    config['output'].update({
+        'word_folder': str(folder / 'output' / 'word'),
+        'pdf_folder': str(folder / 'output' / 'pdf'),
+        'plan_file': str(folder / 'output' / 'plan.csv'),
+        'metrics': {}
+    })
+    config['output'].get('archive', {})['folder'] = str(folder / 'output' / 'archives')
+    config['processing']['create_pdf'] = False
+    config['processing'].get('incremental', {})['enabled'] = False
+    config['processing'].get('image_index', {})['cache_file'] = None
+    config['placeholders'] = placeholders
+    config['excel_columns'] = {'naming_column': NAMING_COLUMN}
+
+    with open(folder / 'config.json', 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=4)
+    return config
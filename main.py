@@ -3,7 +3,9 @@
 Главный модуль для генерации документов
 Обрабатывает Excel данные и создает Word/PDF документы на основе шаблона
 """
+import argparse
 import json
+import sys
 import traceback
 from pathlib import Path
 from src.utils.logger import setup_logger, log_info, log_error, log_success, log_step, log_separator
@@ -46,101 +48,216 @@ def create_output_directories(config):
     log_success("Выходные папки созданы")
 
 
-def main():
+def submit_job(config, args):
+    """Генерация через запущенный сервис (--submit)"""
+    from src.core.daemon import submit
+
+    overrides = {}
+    if args.archive:
+        overrides['output'] = {'archive': {'enabled': True}}
+    if args.profile_slowest is not None:
+        overrides['processing'] = {'profile': {'slowest_rows': args.profile_slowest}}
+
+    log_step("Отправка задания сервису генерации")
+    response = submit(config, {
+        'config': str(Path("config.json").resolve()),
+        'overrides': overrides,
+        'workers': args.workers or config['processing'].get('workers', 1),
+        'incremental': args.incremental or config['processing'].get('incremental', {}).get('enabled', False),
+        'force': args.force
+    })
+
+    if 'lines' not in response:
+        log_error(f"❌ Задание не выполнено: {response.get('error')}")
+        return 1
+
+    log_separator()
+    for line in response['lines']:
+        log_info(line)
+    log_success(f"Задание выполнено сервисом за {response['seconds'] * 1000:.0f} мс")
+    return 0 if response['ok'] else 1
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(description="Генерация Word/PDF документов из Excel по шаблону")
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help="Количество процессов генерации (по умолчанию processing.workers или 1)"
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="Потоковое чтение Excel без загрузки всей таблицы в память"
+    )
+    parser.add_argument(
+        '--archive', action='store_true',
+        help="Записывать документы в zip архивы (output.archive) вместо отдельных файлов"
+    )
+    parser.add_argument(
+        '--plan', action='store_true',
+        help="Только построить план (имена файлов, изображения, объем) и проверить его без генерации"
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="Пропускать документы, входные данные которых не изменились с прошлого запуска"
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help="В инкрементальном режиме создать все документы заново"
+    )
+    parser.add_argument(
+        '--log-format', choices=['human', 'json', 'progress'], default=None,
+        help="Формат вывода: цветные строки, JSON строки или строка прогресса (logging.format)"
+    )
+    parser.add_argument(
+        '--quiet', action='store_true',
+        help="Не выводить сообщения по отдельным документам"
+    )
+    parser.add_argument(
+        '--serve', action='store_true',
+        help="Запустить сервис генерации: шаблоны и индексы изображений остаются в памяти (daemon)"
+    )
+    parser.add_argument(
+        '--submit', action='store_true',
+        help="Отправить задание запущенному сервису генерации вместо генерации в этом процессе"
+    )
+    parser.add_argument(
+        '--profile-slowest', type=int, default=None, metavar='N',
+        help="Сохранить профили cProfile для N самых медленных строк (processing.profile)"
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help="После генерации отслеживать таблицу, шаблон и изображения и перегенерировать затронутые документы"
+    )
+    parser.add_argument(
+        '--shard', default=None, metavar='i/N',
+        help="Обработать только шард i из N (строки делятся по имени документа)"
+    )
+    parser.add_argument(
+        '--rows', default=None, metavar='START:END',
+        help="Обработать только строки с номерами START..END (с 1, как в плане)"
+    )
+    parser.add_argument(
+        '--merge', nargs='*', default=None, metavar='FILE',
+        help="Объединить результаты запусков --shard/--rows (по умолчанию все из output.shards.folder)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Главная функция"""
     try:
-        setup_logger()
+        args = parse_args(argv)
+        log_options = {'format': args.log_format, 'verbose': False if args.quiet else None}
+        setup_logger(log_options)
         log_info("🚀 Автогенератор документов - Демо версия")
         log_separator()
 
         log_step("Инициализация системы")
         config = load_config()
+        config['logging'] = {**config.get('logging', {}), **{k: v for k, v in log_options.items() if v is not None}}
+        setup_logger(config['logging'])
         log_success("Конфигурация загружена")
 
+        if args.archive:
+            config['output'].setdefault('archive', {})['enabled'] = True
+        if args.profile_slowest is not None:
+            config['processing'].setdefault('profile', {})['slowest_rows'] = args.profile_slowest
+
+        if args.serve:
+            from src.core.daemon import serve
+            serve(config)
+            return 0
+        if args.submit:
+            return submit_job(config, args)
+        if args.merge is not None:
+            from src.core.sharding import merge_results
+            return merge_results(config, args.merge)
+
+        from src.core.sharding import RowSelection
+        selection = RowSelection(args.shard, args.rows)
+        if selection.enabled:
+            config = selection.apply(config)
+            log_info(f"🧩 Выбор строк: {selection.describe()}")
+
         validate_files(config)
         create_output_directories(config)
 
+        if args.watch:
+            from src.core.watcher import Watcher
+            return Watcher(config, workers=args.workers or config['processing'].get('workers', 1)).run()
+
         log_step("Обработка данных")
         log_info("📊 Загрузка Excel данных...")
 
         from src.core.excel_processor import ExcelProcessor
         excel_processor = ExcelProcessor(config)
-        excel_processor.load_file(config['input']['excel_file'])
-        excel_processor.validate_structure()
-        excel_processor.clean_data()
+        streaming = (args.stream or config['processing'].get('streaming', False)) and not args.plan
+
+        if streaming:
+            log_info("   🌊 Потоковое чтение: строки обрабатываются по мере чтения")
+            records = excel_processor.iter_rows(config['input']['excel_file'])
+        else:
+            excel_processor.load_file(config['input']['excel_file'])
+            excel_processor.validate_structure()
+            excel_processor.clean_data()
+            if selection.enabled:
+                from src.core.planner import RunPlanner
+                names = RunPlanner(config, None).filenames(excel_processor.data)
+                excel_processor.data = selection.filter_data(excel_processor.data, names)
+                log_info(f"   🧩 Строк в запуске: {len(excel_processor.data)}")
+            records = excel_processor.iter_records()
 
         log_info("📄 Загрузка Word шаблона...")
 
-        from src.core.word_processor import WordProcessor
-        word_processor = WordProcessor(config)
-        word_processor.load_template(config['input']['word_template'])
+        from src.core.document_generator import DocumentGenerator
+        generator = DocumentGenerator(config)
+        if streaming and selection.enabled:
+            records = selection.filter_records(records, generator.filename)
+
+        if args.plan:
+            log_step("Планирование")
+            plan = generator.plan(excel_processor.data)
+            plan_path = plan.save(config['output'].get('plan_file', 'output/plan.csv'))
+            plan.log_summary()
+            log_info(f"📋 План сохранен: {plan_path}")
+            return 1 if plan.blocking else 0
 
         log_step("Генерация документов")
         log_info("🔄 Обработка записей...")
 
-        from src.core.pdf_converter import PDFConverter
-        from src.utils.statistics import Statistics
-
-        pdf_converter = PDFConverter(config)
-        stats = Statistics()
-
-        total_rows = len(excel_processor.data)
-        success_count = 0
-
-        for row_index, row_data in excel_processor.data.iterrows():
-            log_info(f"📄 ФАЙЛ {row_index + 1:04d}:")
-
-            filename = excel_processor.get_naming_column_value(row_data, row_index + 1)
-            word_output = Path(config['output']['word_folder']) / f"{filename}.docx"
-            pdf_output = Path(config['output']['pdf_folder']) / f"{filename}.pdf"
-
-            try:
-                doc_stats = word_processor.create_document_from_template(row_data, str(word_output))
-
-                stats.add_text_replacements(doc_stats['text_replacements'])
-                stats.add_image_insertions(doc_stats['image_insertions'])
-                stats.add_document_created()
-
-                images_found = doc_stats['image_insertions']
-                images_not_found = doc_stats['images_requested'] - images_found
-                for _ in range(images_found):
-                    stats.add_image_found()
-                for _ in range(images_not_found):
-                    stats.add_image_not_found()
-
-                if config['processing']['create_pdf']:
-                    pdf_success = pdf_converter.convert_word_to_pdf(str(word_output), str(pdf_output))
-                    if not pdf_success:
-                        log_info("   📄 Word документ создан, PDF - в полной версии")
-                else:
-                    log_info("   📄 Word документ создан")
-
-                success_count += 1
-
-            except Exception as e:
-                stats.add_error()
-                log_error(f"Ошибка создания документа {filename}: {e}")
-
-        log_info("📋 Создание отчета...")
-        # NOTE: В полной версии здесь будет ReportGenerator
-        # report_generator = ReportGenerator(config)
-        # report_generator.generate_excel_report()
-        log_info("   📊 Детальная отчетность доступна в полной версии")
+        outputs = [] if selection.enabled else None
+        stats = generator.run(
+            records,
+            workers=args.workers or config['processing'].get('workers', 1),
+            incremental=args.incremental or config['processing'].get('incremental', {}).get('enabled', False),
+            force=args.force,
+            total=None if streaming else len(excel_processor.data),
+            outputs=outputs
+        )
+        if selection.enabled:
+            selection.save_result(config, stats, outputs)
 
         log_separator()
 
         for line in stats.get_formatted_summary():
             log_info(line)
 
+        if stats.errors:
+            log_error(f"Обработка завершена с ошибками: {stats.errors}")
+            return 1
+
         log_success(f"✅ Обработка завершена успешно!")
-        log_info("🎯 Демо-версия завершена! Для PDF и отчетности используйте полную версию")
+        return 0
 
     except KeyboardInterrupt:
         log_error("⚠️ Прервано пользователем")
+        return 130
     except Exception as e:
         log_error(f"❌ Критическая ошибка: {e}")
         log_error(f"Трассировка: {traceback.format_exc()}")
+        return 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
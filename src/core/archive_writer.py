@@ -0,0 +1,104 @@
+"""
+Запись документов в zip архивы
+"""
+import csv
+import time
+import zipfile
+from pathlib import Path
+from src.utils.logger import log_info, log_success
+
+
+COMPRESSION = {
+    'stored': zipfile.ZIP_STORED,
+    'deflated': zipfile.ZIP_DEFLATED
+}
+
+
+class ArchiveWriter:
+    """Потоковая запись документов в архивы с ротацией по размеру и числу документов
+
+    Каждый документ записывается в архив сразу после создания. Индекс
+    (CSV рядом с архивами) связывает имя документа и строку данных с
+    архивом и файлом внутри него.
+    """
+
+    def __init__(self, config):
+        options = config['output'].get('archive', {})
+        self.folder = Path(options.get('folder', 'output/archives'))
+        self.max_documents = options.get('max_documents') or None
+        self.max_bytes = options['max_mb'] * 1024 * 1024 if options.get('max_mb') else None
+        self.compression = COMPRESSION[options.get('compression', 'stored')]
+        self.prefix = f"{options.get('name', 'documents')}_{time.strftime('%Y%m%d_%H%M%S')}"
+
+        self.archive = None
+        self.archive_path = None
+        self.archive_documents = 0
+        self.archives = []
+        self.stems = set()
+        self.documents = 0
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.folder / f"{self.prefix}_index.csv"
+        self.index_file = open(self.index_path, 'w', encoding='utf-8-sig', newline='')
+        self.index = csv.writer(self.index_file)
+        self.index.writerow(['name', 'row', 'archive', 'entry', 'bytes'])
+
+    def add_result(self, result):
+        """Запись документов строки; байты удаляются из результата"""
+        word_data = result.pop('word_data', None)
+        pdf_data = result.pop('pdf_data', None)
+        if not result['success'] or word_data is None:
+            return
+
+        if self._needs_rotation(len(word_data) + len(pdf_data or b'')):
+            self._rotate()
+
+        stem = self._unique_stem(result['filename'])
+        self.add(result['filename'], result['row_index'], f"{stem}.docx", word_data)
+        if pdf_data is not None:
+            self.add(result['filename'], result['row_index'], f"{stem}.pdf", pdf_data)
+        self.archive_documents += 1
+        self.documents += 1
+
+    def add(self, name, row_index, entry_name, data):
+        """Запись одного файла в текущий архив"""
+        self.archive.writestr(entry_name, data, compress_type=self.compression)
+
+        self.index.writerow([name, row_index + 1, self.archive_path.name, entry_name, len(data)])
+
+    def _needs_rotation(self, size):
+        if self.archive is None:
+            return True
+        if self.max_documents and self.archive_documents >= self.max_documents:
+            return True
+        return bool(self.max_bytes and self.archive_documents and self.archive.fp.tell() + size > self.max_bytes)
+
+    def _rotate(self):
+        """Закрытие текущего архива и открытие следующего"""
+        self._close_archive()
+        self.archive_path = self.folder / f"{self.prefix}_{len(self.archives) + 1:03d}.zip"
+        self.archive = zipfile.ZipFile(self.archive_path, 'w', allowZip64=True)
+        self.archive_documents = 0
+        self.archives.append(self.archive_path)
+        log_info(f"   🗜️ Новый архив: {self.archive_path.name}")
+
+    def _unique_stem(self, filename):
+        """Имя документа без повторов в пределах запуска: name, name_2, ..."""
+        stem = filename
+        number = 2
+        while stem in self.stems:
+            stem = f"{filename}_{number}"
+            number += 1
+        self.stems.add(stem)
+        return stem
+
+    def _close_archive(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    def close(self):
+        """Завершение записи архивов и индекса"""
+        self._close_archive()
+        self.index_file.close()
+        log_success(f"Архивов: {len(self.archives)}, документов: {self.documents}, индекс {self.index_path.name}")
@@ -0,0 +1,111 @@
+"""
+Скомпилированный Word шаблон
+"""
+import copy
+import re
+from pathlib import Path
+from docx import Document
+from docx.oxml.ns import qn
+from docx.package import Package
+from docx.parts.hdrftr import FooterPart, HeaderPart
+from docx.shared import lazyproperty
+from docx.text.paragraph import Paragraph
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\{[^}]+\}')
+
+
+class CompiledTemplate:
+    """Шаблон, разобранный один раз, с индексом расположения плейсхолдеров"""
+
+    def __init__(self, template_path, placeholders):
+        self.template_path = Path(template_path)
+        self.placeholders = placeholders
+        self.document = Document(self.template_path)
+        self.package = self.document.part.package
+        self.parts = list(self.package.iter_parts())
+        self.image_sha1s = {part.partname: part.sha1 for part in self.package.image_parts}
+
+        # (индекс части, путь к абзацу) -> плейсхолдеры абзаца в порядке появления
+        self.paragraph_index = {}
+        # плейсхолдер -> список расположений (индекс части, путь к абзацу)
+        self.placeholder_index = {}
+        self._build_index()
+
+        document_part = self.parts.index(self.document.part)
+        self.mutable_parts = {document_part} | {location[0] for location in self.paragraph_index}
+
+    def _build_index(self):
+        """Построение индекса плейсхолдеров по тексту, таблицам и колонтитулам"""
+        for part_index, part in enumerate(self.parts):
+            if part is not self.document.part and not isinstance(part, (HeaderPart, FooterPart)):
+                continue
+
+            root = part.element
+            for p in root.iter(qn('w:p')):
+                found = [
+                    placeholder
+                    for placeholder in PLACEHOLDER_PATTERN.findall(Paragraph(p, part).text)
+                    if placeholder in self.placeholders
+                ]
+                if not found:
+                    continue
+
+                location = (part_index, self._element_path(root, p))
+                self.paragraph_index[location] = found
+                for placeholder in found:
+                    self.placeholder_index.setdefault(placeholder, []).append(location)
+
+    @staticmethod
+    def _element_path(root, element):
+        """Путь от корня части до элемента в виде индексов потомков"""
+        path = []
+        while element is not root:
+            parent = element.getparent()
+            path.append(parent.index(element))
+            element = parent
+        return tuple(reversed(path))
+
+    def placeholder_counts(self):
+        """Количество вхождений каждого плейсхолдера в шаблоне"""
+        counts = {}
+        for found in self.paragraph_index.values():
+            for placeholder in found:
+                counts[placeholder] = counts.get(placeholder, 0) + 1
+        return counts
+
+    def clone(self):
+        """Копия документа в памяти и абзацы с плейсхолдерами по расположениям
+
+        Копируются только XML изменяемых частей (основной документ и колонтитулы
+        с плейсхолдерами), остальные части разделяются с шаблоном.
+        """
+        package = Package()
+        clones = {}
+
+        for part_index, part in enumerate(self.parts):
+            clone = copy.copy(part)
+            for name in list(vars(clone)):
+                if name == '_rels' or isinstance(getattr(type(clone), name, None), lazyproperty):
+                    del vars(clone)[name]
+            clone._package = package
+            if part_index in self.mutable_parts:
+                clone._element = copy.deepcopy(part._element)
+            clones[part] = clone
+
+        for source, target in [(self.package, package), *clones.items()]:
+            for rel in source.rels.values():
+                rel_target = rel.target_ref if rel.is_external else clones[rel.target_part]
+                target.load_rel(rel.reltype, rel_target, rel.rId, rel.is_external)
+        package.after_unmarshal()
+
+        paragraphs = {}
+        for location in self.paragraph_index:
+            part_index, path = location
+            part = clones[self.parts[part_index]]
+            element = part.element
+            for child_index in path:
+                element = element[child_index]
+            paragraphs[location] = Paragraph(element, part)
+
+        return clones[self.document.part].document, paragraphs
@@ -0,0 +1,241 @@
+"""
+Фоновый сервис генерации (main.py --serve)
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from src.utils.logger import log_info, log_success, log_error, log_warning
+
+
+def merge_config(base, overrides):
+    """Копия конфигурации с примененными переопределениями (вложенные словари объединяются)"""
+    merged = dict(base)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class GenerationService:
+    """Состояние между заданиями: конфигурации, шаблоны, индексы изображений и пулы PDF
+
+    Шаблон перечитывается, только если изменился его mtime, индекс
+    изображений - если в папках изображений добавились или удалились файлы.
+    Задания выполняются по одному.
+    """
+
+    def __init__(self, config_path='config.json', max_templates=8):
+        self.config_path = Path(config_path)
+        self.max_templates = max_templates
+        self.configs = {}
+        self.generators = OrderedDict()
+        self.pdf_converters = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.jobs = 0
+
+    def load_config(self, path=None):
+        """Конфигурация из файла, перечитывается при изменении mtime"""
+        path = Path(path or self.config_path)
+        mtime = path.stat().st_mtime_ns
+        cached = self.configs.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = (mtime, json.load(f))
+            self.configs[path] = cached
+        return cached[1]
+
+    def generator(self, config):
+        """Скомпилированный шаблон для конфигурации"""
+        from src.core.document_generator import DocumentGenerator
+
+        key = json.dumps(config, sort_keys=True, ensure_ascii=False)
+        mtime = Path(config['input']['word_template']).stat().st_mtime_ns
+
+        entry = self.generators.get(key)
+        if entry is not None and entry[0] == mtime:
+            self.generators.move_to_end(key)
+            entry[1].refresh_images()
+            return entry[1]
+
+        if entry is not None:
+            log_info(f"   📄 Шаблон изменился и будет загружен заново: {config['input']['word_template']}")
+        generator = DocumentGenerator(config)
+        self.generators[key] = (mtime, generator)
+        self.generators.move_to_end(key)
+        while len(self.generators) > self.max_templates:
+            self.generators.popitem(last=False)
+        return generator
+
+    def pdf_converter(self, config):
+        """Запущенный конвертер для настроек processing.pdf"""
+        from src.core.pdf_converter import PDFConverter
+
+        key = json.dumps(config['processing'].get('pdf', {}), sort_keys=True)
+        if key not in self.pdf_converters:
+            self.pdf_converters[key] = PDFConverter(config)
+        return self.pdf_converters[key]
+
+    def run_job(self, job):
+        """Выполнение задания, результат - словарь для ответа
+
+        job: config (путь к конфигурации), overrides (переопределения),
+        excel_file или rows (список словарей колонка -> значение),
+        template, workers, incremental, force.
+        """
+        from src.utils.metrics import reset_run_stages
+
+        with self.lock:
+            started = time.perf_counter()
+            reset_run_stages()
+            self.jobs += 1
+
+            config = merge_config(self.load_config(job.get('config')), job.get('overrides'))
+            config['input'] = dict(config['input'])
+            if job.get('template'):
+                config['input']['word_template'] = job['template']
+            if job.get('excel_file'):
+                config['input']['excel_file'] = job['excel_file']
+
+            generator = self.generator(config)
+            records, total = self._records(config, job)
+            for folder in (config['output']['word_folder'], config['output']['pdf_folder']):
+                Path(folder).mkdir(parents=True, exist_ok=True)
+
+            stats = generator.run(
+                records,
+                workers=job.get('workers', 1),
+                incremental=job.get('incremental', config['processing'].get('incremental', {}).get('enabled', False)),
+                force=job.get('force', False),
+                total=total,
+                pdf_converter=self.pdf_converter(config) if config['processing']['create_pdf'] else None
+            )
+
+            seconds = time.perf_counter() - started
+            log_success(f"Задание {self.jobs} выполнено за {seconds * 1000:.0f} мс")
+            return {
+                'ok': stats.errors == 0,
+                'seconds': seconds,
+                'summary': stats.get_summary(),
+                'lines': stats.get_formatted_summary()
+            }
+
+    @staticmethod
+    def _records(config, job):
+        """Строки задания: переданные в запросе или прочитанные из файла данных"""
+        from src.core.excel_processor import ExcelProcessor
+
+        excel_processor = ExcelProcessor(config)
+        rows = job.get('rows')
+        if rows is not None:
+            if not rows:
+                raise ValueError("Задание не содержит строк")
+            excel_processor._check_columns(set().union(*rows))
+            return list(enumerate(rows)), len(rows)
+
+        excel_processor.load_file(config['input']['excel_file'])
+        excel_processor.validate_structure()
+        excel_processor.clean_data()
+        return excel_processor.iter_records(), len(excel_processor.data)
+
+    def status(self):
+        return {
+            'ok': True,
+            'uptime_seconds': time.time() - self.started,
+            'jobs': self.jobs,
+            'templates': [json.loads(key)['input']['word_template'] for key in self.generators],
+            'busy': self.lock.locked()
+        }
+
+    def close(self):
+        for converter in self.pdf_converters.values():
+            converter.close()
+        self.pdf_converters.clear()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """JSON API: GET /status, POST /jobs, POST /shutdown"""
+
+    service = None
+
+    def do_GET(self):
+        if self.path == '/status':
+            self._reply(200, self.service.status())
+        else:
+            self._reply(404, {'ok': False, 'error': f"Неизвестный адрес: {self.path}"})
+
+    def do_POST(self):
+        if self.path == '/shutdown':
+            self._reply(200, {'ok': True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        if self.path != '/jobs':
+            self._reply(404, {'ok': False, 'error': f"Неизвестный адрес: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            job = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self._reply(400, {'ok': False, 'error': f"Некорректный запрос: {e}"})
+            return
+
+        try:
+            self._reply(200, self.service.run_job(job))
+        except Exception as e:
+            log_error(f"Ошибка задания: {e}")
+            self._reply(500, {'ok': False, 'error': str(e) or type(e).__name__})
+
+    def _reply(self, code, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(config, config_path='config.json'):
+    """Запуск сервиса до POST /shutdown или Ctrl+C"""
+    options = config.get('daemon', {})
+    host, port = options.get('host', '127.0.0.1'), options.get('port', 8765)
+    if host not in ('127.0.0.1', 'localhost', '::1'):
+        log_warning(f"Сервис доступен не только локально: {host}")
+
+    service = GenerationService(config_path, max_templates=options.get('max_templates', 8))
+    service.generator(service.load_config())
+    handler = type('Handler', (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+
+    log_success(f"Сервис генерации запущен: http://{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
+        log_info("Сервис генерации остановлен")
+
+
+def submit(config, job, timeout=None):
+    """Отправка задания запущенному сервису, результат - ответ сервиса"""
+    from urllib import error, request
+
+    options = config.get('daemon', {})
+    url = f"http://{options.get('host', '127.0.0.1')}:{options.get('port', 8765)}/jobs"
+    data = json.dumps(job, ensure_ascii=False).encode('utf-8')
+    http_request = request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with request.urlopen(http_request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except error.HTTPError as e:
+        return json.loads(e.read() or b'{}') or {'ok': False, 'error': str(e)}
+    except error.URLError as e:
+        raise ConnectionError(f"Сервис генерации недоступен ({url}): {e.reason}")
@@ -0,0 +1,127 @@
+"""
+Дедупликация документов с одинаковым содержимым
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from src.core.generation import new_result, output_paths
+from src.core.row_binding import MISSING
+from src.utils.logger import log_info, log_error
+
+LINK_MODES = ('hardlink', 'copy')
+
+# Поля результата строки-оригинала, которые переносятся на повторы
+COPIED_FIELDS = ('success', 'error', 'text_replacements', 'image_insertions', 'images_requested', 'pdf_created')
+
+
+def dedup_enabled(config):
+    """Дедупликация включена (processing.dedup.enabled)"""
+    return config['processing'].get('dedup', {}).get('enabled', False)
+
+
+class Deduplicator:
+    """Один рендеринг на уникальный набор значений плейсхолдеров
+
+    Ключ строки - хэш шаблона строки и значений колонок, используемых
+    плейсхолдерами. Первая строка с ключом создается как обычно, повторы
+    не передаются в генерацию: после готовности оригинала их файлы
+    создаются жесткими ссылками (или копиями) на файлы оригинала.
+    filter работает в потоке чтения строк, collect и flush - в потоке
+    сбора результатов.
+    """
+
+    def __init__(self, config, word_processor):
+        options = config['processing'].get('dedup', {})
+        self.config = config
+        self.word_processor = word_processor
+        self.link_mode = options.get('link', 'hardlink')
+        if self.link_mode not in LINK_MODES:
+            raise ValueError(f"Неизвестный способ создания повторов: {self.link_mode}")
+
+        self.lock = threading.Lock()
+        self.keys = {}
+        self.originals = {}
+        self.finished = {}
+        self.waiting = {}
+        self.ready = []
+        self.hits = 0
+        self.copies = 0
+
+    def key(self, row_data):
+        """Хэш входных данных документа строки"""
+        binding = self.word_processor.binding
+        values, missing = binding.text_values(row_data)
+        images = [None if value is MISSING else str(value) for _, _, value in binding.image_values(row_data)]
+        content = [str(self.word_processor.template_for(row_data)), values, sorted(missing), images]
+        return hashlib.sha1(json.dumps(content, ensure_ascii=False, sort_keys=True).encode()).digest()
+
+    def filter(self, jobs):
+        """Задания без повторов: повторы ждут готовности строки-оригинала"""
+        for job in jobs:
+            key = self.key(job[3])
+            with self.lock:
+                original = self.originals.setdefault(key, job[2])
+                if original == job[2]:
+                    self.keys[job[0]] = key
+                    yield job
+                    continue
+
+                self.hits += 1
+                if key in self.finished:
+                    self.ready.append((key, job))
+                else:
+                    self.waiting.setdefault(key, []).append(job)
+
+    def collect(self, result):
+        """Учет результата строки; возвращает готовые результаты повторов"""
+        with self.lock:
+            key = self.keys.pop(result['position'], None)
+            if key is not None:
+                self.finished[key] = {field: result[field] for field in COPIED_FIELDS}
+                self.finished[key]['filename'] = result['filename']
+                self.ready.extend((key, job) for job in self.waiting.pop(key, []))
+            ready, self.ready = self.ready, []
+        return [self._materialize(self.finished[key], job) for key, job in ready]
+
+    def flush(self):
+        """Результаты повторов, оставшихся после завершения генерации"""
+        return self.collect({'position': None})
+
+    def _materialize(self, original, job):
+        """Файлы повтора - ссылки на файлы строки-оригинала"""
+        started = time.perf_counter()
+        result = new_result(job)
+        result.update({field: original[field] for field in COPIED_FIELDS})
+        result['deduplicated'] = True
+
+        if original['success']:
+            source_word, source_pdf = output_paths(self.config, original['filename'])
+            target_word, target_pdf = output_paths(self.config, job[2])
+            try:
+                self._link(source_word, target_word)
+                if original['pdf_created']:
+                    self._link(source_pdf, target_pdf)
+                log_info(f"📄 ФАЙЛ {job[1] + 1:04d}: повтор {original['filename']}", detail=True)
+            except OSError as e:
+                result['success'] = False
+                result['error'] = f"Не удалось создать повтор документа {original['filename']}: {e}"
+                log_error(result['error'])
+
+        result['render_seconds'] = time.perf_counter() - started
+        return result
+
+    def _link(self, source, target):
+        if source == target:
+            return
+        target.unlink(missing_ok=True)
+        if self.link_mode == 'hardlink':
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(source, target)
+        self.copies += 1
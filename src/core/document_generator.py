@@ -0,0 +1,200 @@
+"""
+Программный интерфейс генерации документов
+"""
+import io
+from src.core.excel_processor import ExcelProcessor, resolve_collision
+from src.core.word_processor import WordProcessor
+from src.utils.logger import log_info, log_progress, log_warning
+
+
+class DocumentGenerator:
+    """Генерация документов по одному скомпилированному шаблону
+
+    Строки - любые отображения колонка -> значение (dict, pandas Series).
+    iter_documents и render_to создают документы в памяти, не записывая
+    файлов; run - пакетная генерация файлов в выходные папки или архивы.
+    """
+
+    def __init__(self, config, template_path=None):
+        if template_path is not None:
+            config = {**config, 'input': {**config['input'], 'word_template': str(template_path)}}
+        self.config = config
+        self.word_processor = WordProcessor(config)
+        self.word_processor.load_template(config['input']['word_template'])
+        self.naming = ExcelProcessor(config)
+
+    def filename(self, row, number):
+        """Имя документа строки без расширения"""
+        return self.naming.get_naming_column_value(row, number)
+
+    def render(self, row):
+        """Документ строки в виде байтов"""
+        buffer = io.BytesIO()
+        self.render_to(row, buffer)
+        return buffer.getvalue()
+
+    def render_to(self, row, output):
+        """Запись документа строки в поток или файл, результат - статистика документа"""
+        return self.word_processor.create_document_from_template(row, output)
+
+    def iter_documents(self, rows):
+        """Ленивая генерация пар (имя файла, байты документа)"""
+        for number, row in enumerate(rows, 1):
+            yield f"{self.filename(row, number)}.docx", self.render(row)
+
+    def write_documents(self, rows, open_output):
+        """Запись документов в потоки вызывающего кода
+
+        open_output(имя файла) возвращает поток для записи. Генерирует
+        пары (имя файла, статистика документа).
+        """
+        for number, row in enumerate(rows, 1):
+            filename = f"{self.filename(row, number)}.docx"
+            yield filename, self.render_to(row, open_output(filename))
+
+    def refresh_images(self):
+        """Перестроение индекса изображений, если в папках изменились файлы"""
+        from src.core.image_index import ImageIndex
+
+        if not self.word_processor.image_index.is_current():
+            self.word_processor.image_index = ImageIndex(self.config).load()
+            log_info(f"   🖼️ Индекс изображений обновлен: {len(self.word_processor.image_index)} файлов")
+
+    def plan(self, data):
+        """Предварительный план генерации для загруженной таблицы"""
+        from src.core.planner import RunPlanner
+        return RunPlanner(self.config, self.word_processor).build(data)
+
+    def run(self, records, workers=1, incremental=False, force=False, total=None, pdf_converter=None,
+            outputs=None):
+        """Генерация файлов для пар (индекс строки, данные строки), результат - Statistics
+
+        total - число строк для оценки оставшегося времени, если известно.
+        pdf_converter - запущенный конвертер вызывающего кода, он не
+        закрывается после генерации. outputs - список, в который
+        добавляются пары (номер строки, имя документа) всех строк запуска.
+        """
+        from src.core.dedup import dedup_enabled
+        from src.core.generation import archive_enabled
+        from src.core.pdf_converter import PDFConverter
+        from src.core.pipeline import Pipeline
+        from src.core.report_generator import report_enabled
+        from src.utils.metrics import start_profiling
+        from src.utils.statistics import Statistics
+
+        start_profiling(self.config)
+        owns_converter = pdf_converter is None
+        if owns_converter:
+            pdf_converter = PDFConverter(self.config)
+        stats = Statistics()
+
+        seen_names = {}
+        resolve_collisions = self.config['output'].get('resolve_collisions', False)
+
+        def filename(row_data, row_index):
+            name = self.filename(row_data, row_index + 1)
+            name = resolve_collision(name, seen_names) if resolve_collisions else name
+            if outputs is not None:
+                outputs.append((row_index + 1, name))
+            return name
+
+        jobs = (
+            (position, row_index, filename(row_data, row_index), row_data)
+            for position, (row_index, row_data) in enumerate(records)
+        )
+
+        archive = None
+        if archive_enabled(self.config):
+            from src.core.archive_writer import ArchiveWriter
+            archive = ArchiveWriter(self.config)
+            if incremental:
+                log_warning("Инкрементальный режим не поддерживается при записи в архивы и отключен")
+                incremental = False
+
+        report = None
+        if report_enabled(self.config):
+            from src.core.report_generator import ReportGenerator
+            report = ReportGenerator(self.config)
+
+        pipeline = Pipeline(
+            self.config, self.word_processor, pdf_converter,
+            workers=workers, timeout=self.config['processing'].get('row_timeout_seconds')
+        )
+
+        manifest = None
+        if incremental:
+            from src.core.manifest import Manifest
+            manifest = Manifest(self.config, self.word_processor, require_pdf=pipeline.convert_pdf).load(force=force)
+            jobs = manifest.pending_jobs(jobs)
+
+        router = self.word_processor.router
+        if router.enabled:
+            from src.core.template_router import group_by_template
+            jobs = group_by_template(jobs, router, router.group_window)
+
+        dedup = None
+        if dedup_enabled(self.config):
+            if archive:
+                log_warning("Дедупликация не поддерживается при записи в архивы и отключена")
+            else:
+                from src.core.dedup import Deduplicator
+                dedup = Deduplicator(self.config, self.word_processor)
+                jobs = dedup.filter(jobs)
+
+        if workers > 1:
+            log_info(f"⚙️ Параллельная обработка: {workers} процессов")
+
+        def processed():
+            return stats.documents_created + stats.errors + (manifest.skipped if manifest else 0)
+
+        def collect_result(result):
+            record_result(result)
+            if dedup:
+                for duplicate in dedup.collect(result):
+                    record_result(duplicate)
+
+        def record_result(result):
+            stats.add_document_result(result)
+            if report:
+                report.add_result(result)
+            if archive:
+                archive.add_result(result)
+            if manifest:
+                manifest.record(result)
+            log_progress(processed(), total, stats.errors)
+
+        log_progress(0, total)
+        try:
+            pipeline.run(jobs, collect_result)
+            if dedup:
+                for duplicate in dedup.flush():
+                    record_result(duplicate)
+            log_progress(processed(), total, stats.errors, final=True)
+        finally:
+            if manifest:
+                manifest.save()
+            if archive:
+                archive.close()
+            if report:
+                report.close()
+            if owns_converter:
+                pdf_converter.close()
+
+        if manifest:
+            manifest.finish()
+            stats.add_incremental_counts(manifest.skipped, manifest.regenerated, manifest.removed)
+        stats.set_pipeline_summary(pipeline.summary())
+        stats.metrics.finish(
+            pipeline.wall_seconds, self.config['processing'].get('profile', {}).get('slowest_rows', 0)
+        )
+        self._export_metrics(stats.metrics)
+        return stats
+
+    def _export_metrics(self, metrics):
+        """Запись метрик запуска в файлы из output.metrics"""
+        options = self.config['output'].get('metrics', {})
+        if options.get('json_file'):
+            metrics.export_json(options['json_file'])
+            log_info(f"📈 Метрики запуска: {options['json_file']}")
+        if options.get('prometheus_file'):
+            metrics.export_prometheus(options['prometheus_file'])
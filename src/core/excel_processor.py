@@ -1,9 +1,32 @@
 """
 Обработчик Excel файлов
+
+pandas и openpyxl импортируются при первом чтении данных: имена файлов
+и строки, переданные из кода, обрабатываются без них.
 """
-import pandas as pd
+import itertools
+import math
+import sys
 from pathlib import Path
 from src.utils.logger import log_info, log_success, log_warning, log_error
+from src.utils.metrics import timed
+
+# Строк в одной порции при переводе таблицы в словари
+RECORDS_CHUNK_ROWS = 10000
+
+
+# Расширение входного файла -> формат
+INPUT_FORMATS = {
+    '.xlsx': 'excel',
+    '.xlsm': 'excel',
+    '.xls': 'excel',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow'
+}
+FORMAT_NAMES = {'excel': 'Excel', 'csv': 'CSV', 'parquet': 'Parquet', 'arrow': 'Arrow'}
 
 
 class ExcelProcessor:
@@ -13,20 +36,80 @@ class ExcelProcessor:
         self.config = config
         self.data = None
         self.file_path = None
+        self.naming_column = config['excel_columns']['naming_column']
 
     def load_file(self, file_path: str):
-        """Загрузка Excel файла"""
+        """Загрузка файла данных: Excel, CSV, Parquet или Arrow"""
         self.file_path = Path(file_path)
 
         if not self.file_path.exists():
             raise FileNotFoundError(f"Excel файл не найден: {file_path}")
 
+        file_format = self.detect_format(self.file_path)
+        readers = {
+            'excel': self._read_excel,
+            'csv': self._read_csv,
+            'parquet': self._read_parquet,
+            'arrow': self._read_arrow
+        }
+
         try:
-            self.data = pd.read_excel(self.file_path)
-            log_success(f"Excel файл загружен: {len(self.data)} записей")
+            with timed('excel_load'):
+                self.data = readers[file_format]()
+            log_success(f"{FORMAT_NAMES[file_format]} файл загружен: {len(self.data)} записей")
             return self.data
         except Exception as e:
-            raise RuntimeError(f"Ошибка чтения Excel файла: {e}")
+            raise RuntimeError(f"Ошибка чтения {FORMAT_NAMES[file_format]} файла: {e}")
+
+    @staticmethod
+    def detect_format(file_path):
+        """Формат входного файла по расширению"""
+        suffix = Path(file_path).suffix.lower()
+        if suffix not in INPUT_FORMATS:
+            raise ValueError(
+                f"Неподдерживаемый формат входного файла: {suffix or Path(file_path).name} "
+                f"(поддерживаются {', '.join(INPUT_FORMATS)})"
+            )
+        return INPUT_FORMATS[suffix]
+
+    def _read_excel(self):
+        import pandas as pd
+        return pd.read_excel(self.file_path)
+
+    def _read_csv(self):
+        """CSV через многопоточный парсер pyarrow, если он установлен"""
+        import pandas as pd
+        options = self.config['input'].get('csv', {})
+        engine = 'pyarrow' if self._has_pyarrow() else 'c'
+        return pd.read_csv(
+            self.file_path,
+            sep=options.get('delimiter', ','),
+            encoding=options.get('encoding', 'utf-8-sig'),
+            engine=engine
+        )
+
+    def _read_parquet(self):
+        self._require_pyarrow('Parquet')
+        import pandas as pd
+        return pd.read_parquet(self.file_path, engine='pyarrow', memory_map=True)
+
+    def _read_arrow(self):
+        """Arrow IPC (Feather v2) файл, отображенный в память"""
+        self._require_pyarrow('Arrow')
+        from pyarrow import feather
+        return feather.read_table(self.file_path, memory_map=True).to_pandas()
+
+    @staticmethod
+    def _has_pyarrow():
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _require_pyarrow(self, format_name):
+        if not self._has_pyarrow():
+            raise RuntimeError(f"Для чтения {format_name} файлов нужен pyarrow (uv sync --extra columnar)")
 
     def validate_structure(self):
         """Валидация структуры данных"""
@@ -36,6 +119,12 @@ class ExcelProcessor:
         if self.data.empty:
             raise ValueError("Excel файл пуст")
 
+        self._check_columns(self.data.columns)
+
+        log_success("Структура данных валидна")
+
+    def _check_columns(self, columns):
+        """Проверка наличия колонок, используемых плейсхолдерами"""
         required_columns = []
         for placeholder_config in self.config['placeholders'].values():
             column_name = placeholder_config['column']
@@ -43,14 +132,12 @@ class ExcelProcessor:
 
         missing_columns = []
         for column in required_columns:
-            if column not in self.data.columns:
+            if column not in columns:
                 missing_columns.append(column)
 
         if missing_columns:
             raise ValueError(f"Отсутствуют колонки: {', '.join(missing_columns)}")
 
-        log_success("Структура данных валидна")
-
     def clean_data(self):
         """Очистка и подготовка данных"""
         if self.data is None:
@@ -58,14 +145,15 @@ class ExcelProcessor:
 
         initial_count = len(self.data)
 
-        self.data = self.data.dropna(how='all')
+        with timed('excel_clean'):
+            self.data = self.data.dropna(how='all')
 
-        for column in self.data.columns:
-            if self.data[column].dtype == 'object':
-                self.data[column] = self.data[column].fillna('')
-                self.data[column] = self.data[column].astype(str).str.strip()
-            else:
-                self.data[column] = self.data[column].fillna(0)
+            for column in self.data.columns:
+                if self._is_text_dtype(self.data[column].dtype):
+                    self.data[column] = self.data[column].fillna('')
+                    self.data[column] = self.data[column].astype(str).str.strip()
+                else:
+                    self.data[column] = self.data[column].fillna(0)
 
         final_count = len(self.data)
 
@@ -74,18 +162,161 @@ class ExcelProcessor:
 
         log_success("Данные очищены и подготовлены")
 
+    @staticmethod
+    def _is_text_dtype(dtype):
+        """Текстовая колонка: object или строковый тип pandas"""
+        import pandas as pd
+        return dtype == 'object' or isinstance(dtype, pd.StringDtype)
+
+    def iter_records(self):
+        """Записи загруженных данных: пары (индекс строки, словарь значений)
+
+        Числовые колонки текстовых плейсхолдеров заранее переводятся в
+        строки (RowBinding.stringify). Словари собираются из списков
+        значений колонок (в разы быстрее to_dict('records')) порциями по
+        RECORDS_CHUNK_ROWS строк, а не для всей таблицы сразу.
+        """
+        if self.data is None:
+            raise ValueError("Данные не загружены")
+
+        from src.core.row_binding import RowBinding
+        return self._records(RowBinding(self.config['placeholders']).stringify(self.data))
+
+    @staticmethod
+    def _records(data):
+        names = list(data.columns)
+        for start in range(0, len(data), RECORDS_CHUNK_ROWS):
+            chunk = data.iloc[start:start + RECORDS_CHUNK_ROWS]
+            columns = [chunk.iloc[:, position].tolist() for position in range(len(names))]
+            for row_index, values in zip(chunk.index, zip(*columns)):
+                yield row_index, dict(zip(names, values))
+
+    def iter_rows(self, file_path: str, sample_size=1000):
+        """Потоковое чтение Excel файла с постоянным расходом памяти
+
+        Заголовок проверяется как в validate_structure, строки очищаются по
+        правилам clean_data. Тип колонки, который pandas определил бы по всей
+        колонке, определяется по первым sample_size строкам.
+        Возвращает пары (индекс строки, словарь значений).
+        CSV, Parquet и Arrow файлы читаются целиком быстрыми читателями.
+        """
+        self.file_path = Path(file_path)
+
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Excel файл не найден: {file_path}")
+
+        if self.detect_format(self.file_path) != 'excel':
+            log_info("   🌊 Потоковое чтение доступно только для Excel, файл загружается целиком")
+            self.load_file(file_path)
+            self.validate_structure()
+            self.clean_data()
+            yield from self.iter_records()
+            return
+
+        import openpyxl
+
+        try:
+            workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        except Exception as e:
+            raise RuntimeError(f"Ошибка чтения Excel файла: {e}")
+
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                raise ValueError("Excel файл пуст")
+
+            columns = self._column_names(header)
+            self._check_columns(columns)
+
+            sample = list(itertools.islice(rows, sample_size))
+            kinds = self._column_kinds(columns, sample)
+
+            records = 0
+            skipped = 0
+            for row_index, values in enumerate(itertools.chain(sample, rows)):
+                record = self._clean_row(columns, kinds, values)
+                if record is None:
+                    skipped += 1
+                    continue
+                records += 1
+                yield row_index, record
+
+            if records == 0:
+                raise ValueError("Excel файл пуст")
+            if skipped:
+                log_warning(f"Пропущено {skipped} пустых строк")
+            log_success(f"Excel файл прочитан потоково: {records} записей")
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _column_names(header):
+        """Имена колонок по правилам pandas: пустые и повторяющиеся заголовки"""
+        columns = []
+        seen = {}
+        for position, name in enumerate(header):
+            if name is None:
+                name = f"Unnamed: {position}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return columns
+
+    @staticmethod
+    def _column_kinds(columns, sample):
+        """Тип колонок по выборке строк: text, int, float или other"""
+        kinds = {}
+        for position, column in enumerate(columns):
+            values = [row[position] if position < len(row) else None for row in sample]
+            present = [value for value in values if value is not None]
+
+            if any(isinstance(value, str) for value in present):
+                kinds[column] = 'text'
+            elif present and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+                has_float = any(isinstance(value, float) for value in present)
+                kinds[column] = 'float' if has_float or len(present) < len(values) else 'int'
+            elif present:
+                kinds[column] = 'other'
+            else:
+                kinds[column] = 'text'
+        return kinds
+
+    @staticmethod
+    def _clean_row(columns, kinds, values):
+        """Очистка строки по правилам clean_data, None для пустой строки"""
+        if all(value is None for value in values):
+            return None
+
+        record = {}
+        for position, column in enumerate(columns):
+            value = values[position] if position < len(values) else None
+            kind = kinds[column]
+
+            if kind == 'text':
+                record[column] = '' if value is None else str(value).strip()
+            elif value is None:
+                record[column] = 0.0 if kind == 'float' else 0
+            elif kind == 'float' and isinstance(value, (int, float)):
+                record[column] = float(value)
+            else:
+                record[column] = value
+        return record
+
     def get_naming_column_value(self, row_data, row_index):
         """Получение значения для именования файла"""
-        naming_column = self.config['excel_columns']['naming_column']
-
-        if naming_column in row_data and pd.notna(row_data[naming_column]):
-            value = str(row_data[naming_column]).strip()
+        naming_value = row_data.get(self.naming_column)
+        if naming_value is not None and not _is_missing(naming_value):
+            value = str(naming_value).strip()
             if value:
                 return self._clean_filename(value)
 
         if len(row_data) > 0:
-            first_column = row_data.iloc[0] if hasattr(row_data, 'iloc') else list(row_data.values())[0]
-            if pd.notna(first_column):
+            first_column = row_data.iloc[0] if hasattr(row_data, 'iloc') else next(iter(row_data.values()))
+            if not _is_missing(first_column):
                 value = str(first_column).strip()
                 if value:
                     return self._clean_filename(value)
@@ -104,3 +335,27 @@ class ExcelProcessor:
             return f"{int(filename):04d}"
 
         return filename
+
+
+def resolve_collision(name, seen):
+    """Имя с суффиксом для повторов: name, name_2, name_3, ...
+
+    seen - словарь имя -> число вхождений, обновляется. Совпадает с
+    разрешением повторов в плане (RunPlanner).
+    """
+    seen[name] = seen.get(name, 0) + 1
+    return name if seen[name] == 1 else f"{name}_{seen[name]}"
+
+
+def _is_missing(value):
+    """Пустое значение по правилам pandas.isna
+
+    pandas используется, только если уже загружен: без него значения
+    приходят из openpyxl или кода и бывают только None и NaN.
+    """
+    if value is None:
+        return True
+    pandas = sys.modules.get('pandas')
+    if pandas is not None:
+        return bool(pandas.isna(value))
+    return isinstance(value, float) and math.isnan(value)
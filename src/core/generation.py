@@ -0,0 +1,268 @@
+"""
+Генерация документов по строкам данных: последовательно или в пуле процессов
+"""
+import io
+import itertools
+import signal
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+from src.utils.logger import setup_logger, logger_options, worker_logging, log_info, log_error, log_warning
+from src.utils.metrics import profile_row
+
+_worker_word_processor = None
+_worker_pdf_converter = None
+_worker_config = None
+_timeout_warned = False
+
+
+def new_result(job, error=None):
+    """Пустой результат обработки строки"""
+    position, row_index, filename, _ = job
+    return {
+        'position': position,
+        'row_index': row_index,
+        'filename': filename,
+        'success': False,
+        'error': error,
+        'text_replacements': 0,
+        'image_insertions': 0,
+        'images_requested': 0,
+        'image_cache_hits': 0,
+        'image_cache_misses': 0,
+        'pdf_created': False,
+        'render_seconds': 0.0,
+        'pdf_seconds': 0.0,
+        'timings': None
+    }
+
+
+def output_paths(config, filename):
+    """Пути к Word и PDF документам строки"""
+    word_output = Path(config['output']['word_folder']) / f"{filename}.docx"
+    pdf_output = Path(config['output']['pdf_folder']) / f"{filename}.pdf"
+    return word_output, pdf_output
+
+
+def process_row(word_processor, pdf_converter, config, job, convert_pdf=True):
+    """Создание документов для одной строки, результат в виде словаря
+
+    job - кортеж (позиция, индекс строки, имя файла, данные строки).
+    Исключения не выходят наружу и попадают в поле error. При
+    convert_pdf=False PDF создает вызывающий код.
+    """
+    _, row_index, filename, row_data = job
+    result = new_result(job)
+
+    log_info(f"📄 ФАЙЛ {row_index + 1:04d}:", detail=True)
+
+    word_output, _ = output_paths(config, filename)
+
+    with profile_row(config, result):
+        try:
+            started = time.perf_counter()
+            if archive_enabled(config):
+                buffer = io.BytesIO()
+                doc_stats = word_processor.create_document_from_template(row_data, buffer)
+                result['word_data'] = buffer.getvalue()
+            else:
+                # Файл мог быть жесткой ссылкой повтора (dedup): запись не должна менять другие документы
+                word_output.unlink(missing_ok=True)
+                doc_stats = word_processor.create_document_from_template(row_data, str(word_output))
+            result.update(doc_stats)
+            result['render_seconds'] = time.perf_counter() - started
+
+            if not config['processing']['create_pdf']:
+                log_info("   📄 Word документ создан", detail=True)
+            elif convert_pdf:
+                convert_row_pdf(pdf_converter, config, result)
+
+            result['success'] = True
+
+        except Exception as e:
+            result['error'] = str(e) or type(e).__name__
+            log_error(f"Ошибка создания документа {filename}: {result['error']}")
+
+    return result
+
+
+def archive_enabled(config):
+    """Документы пишутся в архивы, а не отдельными файлами"""
+    return config['output'].get('archive', {}).get('enabled', False)
+
+
+def convert_row_pdf(pdf_converter, config, result):
+    """PDF конвертация документа строки
+
+    В режиме архива документ передается в байтах (word_data), конвертируется
+    через временные файлы, PDF возвращается в pdf_data.
+    """
+    started = time.perf_counter()
+
+    if 'word_data' in result:
+        with tempfile.TemporaryDirectory(prefix='docgen_pdf_') as folder:
+            word_output = Path(folder) / 'document.docx'
+            pdf_output = Path(folder) / 'document.pdf'
+            word_output.write_bytes(result['word_data'])
+            pdf_success = pdf_converter.convert_word_to_pdf(str(word_output), str(pdf_output))
+            if pdf_success:
+                result['pdf_data'] = pdf_output.read_bytes()
+    else:
+        word_output, pdf_output = output_paths(config, result['filename'])
+        pdf_output.unlink(missing_ok=True)
+        pdf_success = pdf_converter.convert_word_to_pdf(str(word_output), str(pdf_output))
+
+    result['pdf_seconds'] = time.perf_counter() - started
+    report_pdf(result, pdf_success)
+    return pdf_success
+
+
+def report_pdf(result, pdf_success):
+    """Учет результата PDF конвертации строки"""
+    result['pdf_created'] = pdf_success
+    if pdf_success:
+        log_info(f"   📑 PDF создан: {result['filename']}.pdf", detail=True)
+    else:
+        log_info(f"   📄 Word документ создан, PDF не создан: {result['filename']}", detail=True)
+
+
+@contextmanager
+def row_timeout(seconds):
+    """Ограничение времени обработки строки через SIGALRM (где он доступен)
+
+    Обработчик сигнала можно установить только в главном потоке: в других
+    потоках (задания сервиса генерации) ограничение не действует, о чем
+    выводится одно предупреждение. В процессах пула ограничение работает.
+    """
+    global _timeout_warned
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+    if threading.current_thread() is not threading.main_thread():
+        if not _timeout_warned:
+            _timeout_warned = True
+            log_warning("Ограничение времени строки (row_timeout_seconds) не действует вне главного потока, "
+                        "используйте workers > 1")
+        yield
+        return
+
+    def _on_timeout(signum, frame):
+        raise TimeoutError(f"Превышено время обработки строки: {seconds} с")
+
+    previous = signal.signal(signal.SIGALRM, _on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def generate_sequential(word_processor, pdf_converter, config, jobs, timeout=None, convert_pdf=True):
+    """Последовательная обработка строк в текущем процессе"""
+    for job in jobs:
+        with row_timeout(timeout):
+            result = process_row(word_processor, pdf_converter, config, job, convert_pdf)
+        yield result
+
+
+def _init_worker(config, log_options, log_queue):
+    """Инициализация процесса: шаблон загружается один раз на процесс
+
+    Сообщения процесса уходят в очередь главного процесса.
+    """
+    global _worker_word_processor, _worker_pdf_converter, _worker_config
+
+    from src.core.pdf_converter import PDFConverter
+    from src.core.word_processor import WordProcessor
+
+    setup_logger(log_options, log_queue)
+    _worker_config = config
+    _worker_word_processor = WordProcessor(config)
+    _worker_word_processor.load_template(config['input']['word_template'])
+    _worker_pdf_converter = PDFConverter(config)
+
+
+def _process_chunk(jobs, timeout, convert_pdf):
+    """Обработка пачки строк в процессе пула"""
+    return list(generate_sequential(
+        _worker_word_processor, _worker_pdf_converter, _worker_config, jobs, timeout, convert_pdf
+    ))
+
+
+def generate_parallel(config, jobs, workers, chunk_size=None, timeout=None, convert_pdf=True):
+    """Обработка строк в пуле процессов
+
+    jobs может быть генератором: строки читаются пачками по мере отправки,
+    в работе одновременно не больше 2 * workers пачек, результаты
+    возвращаются в порядке строк. Если процесс пула падает, строки из
+    незавершенных пачек перезапускаются по одной, пока упавшая строка не
+    будет найдена; остальные строки не теряются.
+    """
+    if not chunk_size:
+        chunk_size = max(1, min(64, len(jobs) // (workers * 4))) if hasattr(jobs, '__len__') else 16
+
+    if timeout and not hasattr(signal, 'SIGALRM'):
+        log_warning("Ограничение времени обработки строки недоступно на этой платформе")
+
+    jobs = iter(jobs)
+    suspects = deque()
+    order = deque()
+    completed = {}
+
+    def next_chunk():
+        chunk = list(itertools.islice(jobs, chunk_size))
+        order.extend(job[0] for job in chunk)
+        return chunk
+
+    def ready_results():
+        while order and order[0] in completed:
+            yield completed.pop(order.popleft())
+
+    with worker_logging() as log_queue:
+        initargs = (config, logger_options(), log_queue)
+        chunk = next_chunk()
+        while chunk or suspects:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+                in_flight = deque()
+
+                while chunk or suspects or in_flight:
+                    if suspects:
+                        if not in_flight:
+                            isolated = [suspects.popleft()]
+                            in_flight.append((isolated, executor.submit(_process_chunk, isolated, timeout, convert_pdf), True))
+                    else:
+                        while chunk and len(in_flight) < workers * 2:
+                            in_flight.append((chunk, executor.submit(_process_chunk, chunk, timeout, convert_pdf), False))
+                            chunk = next_chunk()
+
+                    done_chunk, future, isolated = in_flight.popleft()
+                    try:
+                        chunk_results = future.result()
+                    except BrokenProcessPool:
+                        if isolated:
+                            job = done_chunk[0]
+                            completed[job[0]] = new_result(job, "Процесс обработчика аварийно завершился")
+                            log_error(f"Процесс обработчика аварийно завершился на строке {job[1] + 1}")
+                        else:
+                            suspects.extend(done_chunk)
+                            for other_chunk, other_future, _ in in_flight:
+                                if other_future.done() and other_future.exception() is None:
+                                    for result in other_future.result():
+                                        completed[result['position']] = result
+                                else:
+                                    suspects.extend(other_chunk)
+                            log_warning(f"Процесс обработчика аварийно завершился, перезапуск {len(suspects)} строк по одной")
+                        yield from ready_results()
+                        break
+
+                    for result in chunk_results:
+                        completed[result['position']] = result
+                    yield from ready_results()
+
+            yield from ready_results()
@@ -0,0 +1,51 @@
+"""
+Кэш загруженных изображений
+"""
+import os
+from collections import OrderedDict
+from docx.image.image import Image
+
+
+class ImageCache:
+    """LRU кэш изображений: содержимое, размеры и SHA1 по пути и mtime файла
+
+    Один экземпляр используется для всех документов запуска, поэтому
+    повторяющиеся изображения читаются и разбираются с диска один раз.
+    """
+
+    def __init__(self, max_items=128, max_bytes=256 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_path):
+        """Изображение (docx Image) по пути к файлу"""
+        image_path = str(image_path)
+        stat = os.stat(image_path)
+        key = (image_path, stat.st_mtime_ns, stat.st_size)
+
+        image = self.entries.get(key)
+        if image is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = Image.from_file(image_path)
+        # SHA1 вычисляется один раз и сохраняется в объекте Image
+        image.sha1
+
+        self.entries[key] = image
+        self.total_bytes += len(image.blob)
+        self._evict()
+        return image
+
+    def _evict(self):
+        """Удаление давно не использованных изображений сверх лимитов"""
+        while len(self.entries) > 1 and (
+                len(self.entries) > self.max_items or self.total_bytes > self.max_bytes):
+            _, image = self.entries.popitem(last=False)
+            self.total_bytes -= len(image.blob)
@@ -0,0 +1,134 @@
+"""
+Индекс файлов изображений
+"""
+import json
+import os
+import sys
+from pathlib import Path
+from src.utils.logger import log_warning
+
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
+INDEX_VERSION = 1
+
+
+class ImageIndex:
+    """Индекс имя изображения -> путь, построенный одним обходом папок
+
+    Порядок поиска совпадает с прежним перебором файлов: подпапки в порядке
+    images_subdirectories, внутри подпапки - по приоритету расширений.
+    Если case_insensitive не задан, регистр не учитывается там, где его не
+    учитывает файловая система (Windows, macOS).
+    """
+
+    def __init__(self, config):
+        options = config['processing'].get('image_index', {})
+        self.base_path = Path(config['input']['images_folder'])
+        self.subdirectories = list(config['input']['images_subdirectories'].values())
+        self.case_insensitive = options.get('case_insensitive')
+        if self.case_insensitive is None:
+            self.case_insensitive = sys.platform in ('win32', 'darwin')
+        self.cache_file = Path(options['cache_file']) if options.get('cache_file') else None
+        self.entries = {}
+        self.folder_mtimes = {}
+
+    def load(self):
+        """Загрузка индекса из файла кэша или построение заново"""
+        if self.cache_file and self._load_cache():
+            return self
+
+        self.build()
+        if self.cache_file:
+            self._save_cache()
+        return self
+
+    def build(self):
+        """Сканирование папок изображений"""
+        self.entries = {}
+        self.folder_mtimes = {}
+        ranks = {}
+
+        for folder_rank, subdirectory in enumerate(self.subdirectories):
+            subdir_path = self.base_path / subdirectory
+            try:
+                self.folder_mtimes[subdirectory] = os.stat(subdir_path).st_mtime_ns
+                dir_entries = list(os.scandir(subdir_path))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            for entry in dir_entries:
+                stem, dot, extension = entry.name.rpartition('.')
+                if not dot or not stem:
+                    continue
+
+                extension = f".{extension.lower() if self.case_insensitive else extension}"
+                if extension not in IMAGE_EXTENSIONS or not entry.is_file():
+                    continue
+
+                key = self._key(stem)
+                rank = (folder_rank, IMAGE_EXTENSIONS.index(extension))
+                if key not in ranks or rank < ranks[key]:
+                    ranks[key] = rank
+                    self.entries[key] = subdir_path / entry.name
+
+        return self
+
+    def is_current(self):
+        """Индекс соответствует папкам: файлы не добавлялись и не удалялись"""
+        return self.folder_mtimes == self._current_mtimes()
+
+    def find(self, image_name):
+        """Путь к изображению по имени или None"""
+        return self.entries.get(self._key(str(image_name).strip()))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _key(self, name):
+        return name.casefold() if self.case_insensitive else name
+
+    def _current_mtimes(self):
+        """Текущие mtime подпапок изображений"""
+        mtimes = {}
+        for subdirectory in self.subdirectories:
+            try:
+                mtimes[subdirectory] = os.stat(self.base_path / subdirectory).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        return mtimes
+
+    def _load_cache(self):
+        """Чтение кэша индекса, если он актуален"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if (cached.get('version') != INDEX_VERSION
+                or cached.get('base_path') != str(self.base_path)
+                or cached.get('subdirectories') != self.subdirectories
+                or cached.get('case_insensitive') != self.case_insensitive
+                or cached.get('folder_mtimes') != self._current_mtimes()):
+            return False
+
+        self.folder_mtimes = cached['folder_mtimes']
+        self.entries = {key: Path(path) for key, path in cached['entries'].items()}
+        return True
+
+    def _save_cache(self):
+        """Сохранение индекса в файл кэша"""
+        cached = {
+            'version': INDEX_VERSION,
+            'base_path': str(self.base_path),
+            'subdirectories': self.subdirectories,
+            'case_insensitive': self.case_insensitive,
+            'folder_mtimes': self.folder_mtimes,
+            'entries': {key: str(path) for key, path in self.entries.items()}
+        }
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(cached, f, ensure_ascii=False)
+        except OSError as e:
+            log_warning(f"Не удалось сохранить индекс изображений: {e}")
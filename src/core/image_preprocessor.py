@@ -0,0 +1,115 @@
+"""
+Предварительная подготовка изображений к вставке
+"""
+import hashlib
+import io
+import os
+import uuid
+from pathlib import Path
+from src.utils.logger import log_info, log_warning
+
+
+PREPROCESSOR_VERSION = 1
+# Метка в кэше: уменьшение не дает выигрыша, используется исходный файл
+ORIGINAL_MARKER = 'ORIGINAL'
+
+
+class ImagePreprocessor:
+    """Уменьшение изображений до нужного разрешения с кэшем на диске
+
+    Каждое исходное изображение уменьшается один раз до высоты
+    image_height_inches * dpi пикселей и пересжимается. Результат хранится в
+    кэше, адресуемом по содержимому исходника и параметрам обработки, поэтому
+    повторные запуски и параллельные процессы используют готовые файлы.
+    """
+
+    def __init__(self, config):
+        options = config['processing'].get('image_preprocessing', {})
+        self.enabled = options.get('enabled', False)
+        self.dpi = options.get('dpi', 150)
+        self.jpeg_quality = options.get('jpeg_quality', 85)
+        self.cache_folder = Path(options.get('cache_folder', 'output/.image_cache'))
+        self.target_height = round(config['processing']['image_height_inches'] * self.dpi)
+        self.prepared = {}
+
+        if self.enabled:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                log_warning("Подготовка изображений требует Pillow (uv sync --extra images), вставляются оригиналы")
+                self.enabled = False
+
+    def prepare(self, image_path):
+        """Путь к подготовленному изображению (или к исходному, если обработка не нужна)"""
+        if not self.enabled:
+            return image_path
+
+        stat = os.stat(image_path)
+        key = (str(image_path), stat.st_mtime_ns, stat.st_size)
+        if key not in self.prepared:
+            try:
+                self.prepared[key] = self._prepare(Path(image_path))
+            except Exception as e:
+                log_warning(f"Не удалось подготовить изображение {Path(image_path).name}: {e}")
+                self.prepared[key] = image_path
+        return self.prepared[key]
+
+    def _prepare(self, image_path):
+        """Поиск производного файла в кэше или его создание"""
+        source = image_path.read_bytes()
+        digest = hashlib.sha256(source)
+        digest.update(f"{PREPROCESSOR_VERSION}:{self.target_height}:{self.dpi}:{self.jpeg_quality}".encode())
+        key = digest.hexdigest()
+
+        cache_dir = self.cache_folder / key[:2] / key
+        if cache_dir.is_dir():
+            for cached in cache_dir.iterdir():
+                if cached.name == ORIGINAL_MARKER:
+                    return image_path
+                if not cached.name.startswith('.'):
+                    return cached
+
+        derivative = self._create_derivative(source)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        if derivative is None:
+            (cache_dir / ORIGINAL_MARKER).touch()
+            return image_path
+
+        data, extension = derivative
+        target = cache_dir / f"{image_path.stem}{extension}"
+        temporary = cache_dir / f".{uuid.uuid4().hex}.tmp"
+        temporary.write_bytes(data)
+        os.replace(temporary, target)
+
+        log_info(f"   🖼️ Изображение подготовлено: {image_path.name} ({len(source) // 1024} КБ -> {len(data) // 1024} КБ)", detail=True)
+        return target
+
+    def _create_derivative(self, source):
+        """Уменьшенное и пересжатое изображение: (байты, расширение) или None"""
+        from PIL import Image
+
+        with Image.open(io.BytesIO(source)) as image:
+            if image.height <= self.target_height:
+                return None
+
+            target_width = max(1, round(image.width * self.target_height / image.height))
+            if image.format == 'JPEG':
+                image.draft('RGB', (target_width, self.target_height))
+
+            resized = image.resize((target_width, self.target_height), Image.LANCZOS)
+            has_alpha = resized.mode in ('RGBA', 'LA') or (resized.mode == 'P' and 'transparency' in image.info)
+
+            buffer = io.BytesIO()
+            if has_alpha:
+                extension = '.png'
+                resized.save(buffer, 'PNG', optimize=True, dpi=(self.dpi, self.dpi))
+            else:
+                extension = '.jpg'
+                resized.convert('RGB').save(
+                    buffer, 'JPEG', quality=self.jpeg_quality, optimize=True, dpi=(self.dpi, self.dpi)
+                )
+
+        if buffer.tell() >= len(source):
+            return None
+        return buffer.getvalue(), extension
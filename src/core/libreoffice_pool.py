@@ -0,0 +1,275 @@
+"""
+Пул процессов LibreOffice для конвертации Word в PDF
+"""
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from src.utils.logger import log_warning
+
+
+WORKER_SCRIPT = Path(__file__).with_name('libreoffice_worker.py')
+
+SOFFICE_CANDIDATES = [
+    'soffice',
+    'libreoffice',
+    r'C:\Program Files\LibreOffice\program\soffice.exe',
+    r'C:\Program Files (x86)\LibreOffice\program\soffice.exe',
+    '/Applications/LibreOffice.app/Contents/MacOS/soffice',
+    '/usr/lib/libreoffice/program/soffice',
+    '/opt/libreoffice/program/soffice',
+]
+
+
+class WorkerError(RuntimeError):
+    """Сбой процесса LibreOffice, после которого он перезапускается"""
+
+
+class WorkerTimeout(WorkerError):
+    """Превышено время конвертации документа"""
+
+
+def find_soffice(configured=None):
+    """Путь к soffice: из настроек, из PATH или из стандартных мест установки"""
+    for candidate in [configured] if configured else SOFFICE_CANDIDATES:
+        found = shutil.which(candidate)
+        if found:
+            return found
+    return None
+
+
+def find_uno_python(soffice, configured=None):
+    """Интерпретатор Python, в котором доступен модуль uno"""
+    program_dir = Path(soffice).resolve().parent
+    candidates = [configured] if configured else [
+        sys.executable,
+        str(program_dir / 'python.exe'),
+        str(program_dir / 'python'),
+        str(program_dir.parent / 'Resources' / 'python'),
+        'python3',
+    ]
+
+    for candidate in candidates:
+        executable = shutil.which(candidate)
+        if not executable:
+            continue
+        try:
+            check = subprocess.run(
+                [executable, '-c', 'import uno'],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if check.returncode == 0:
+            return executable
+    return None
+
+
+def validate_pdf(path):
+    """Проверка, что файл похож на целый PDF документ"""
+    size = os.path.getsize(path)
+    if size == 0:
+        raise RuntimeError("Создан пустой PDF")
+
+    with open(path, 'rb') as f:
+        header = f.read(5)
+        f.seek(max(0, size - 1024))
+        tail = f.read()
+
+    if header != b'%PDF-' or b'%%EOF' not in tail:
+        raise RuntimeError("Создан поврежденный PDF")
+
+
+class LibreOfficeWorker:
+    """Один долгоживущий процесс LibreOffice под управлением посредника"""
+
+    def __init__(self, command, profile_dir, startup_timeout):
+        self.command = command
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.responses = None
+
+    def start(self):
+        """Запуск посредника и LibreOffice, ожидание готовности"""
+        session = {'start_new_session': True} if os.name == 'posix' else {
+            'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW
+        }
+        self.process = subprocess.Popen(
+            [*self.command, str(self.profile_dir)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding='utf-8', **session
+        )
+        self.responses = queue.Queue()
+        threading.Thread(target=self._read, args=(self.process, self.responses), daemon=True).start()
+
+        try:
+            message = self._receive(self.startup_timeout)
+        except WorkerError as e:
+            self.kill()
+            raise RuntimeError(f"LibreOffice не запустился: {e}")
+        if not message.get('ready'):
+            self.kill()
+            raise RuntimeError(f"LibreOffice не запустился: {message.get('error')}")
+
+    def restart(self):
+        self.kill()
+        self.start()
+
+    def convert(self, source, target, timeout):
+        """Конвертация одного документа; WorkerError при сбое процесса"""
+        try:
+            self.process.stdin.write(json.dumps({'source': str(source), 'target': str(target)}) + '\n')
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            raise WorkerError("Процесс LibreOffice недоступен")
+
+        message = self._receive(timeout)
+        if not message.get('ok'):
+            error_type = WorkerError if message.get('fatal') else RuntimeError
+            raise error_type(message.get('error') or "Ошибка конвертации")
+
+    def _receive(self, timeout):
+        """Следующий ответ посредника"""
+        try:
+            message = self.responses.get(timeout=timeout)
+        except queue.Empty:
+            raise WorkerTimeout(f"Превышено время ожидания LibreOffice: {timeout} с")
+        if message is None:
+            raise WorkerError("Процесс LibreOffice аварийно завершился")
+        return message
+
+    @staticmethod
+    def _read(process, responses):
+        """Чтение ответов посредника в отдельном потоке"""
+        try:
+            for line in process.stdout:
+                try:
+                    responses.put(json.loads(line))
+                except ValueError:
+                    continue
+        finally:
+            responses.put(None)
+
+    def stop(self, timeout=15):
+        """Штатное завершение: закрытие stdin завершает LibreOffice"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self):
+        """Принудительное завершение посредника вместе с LibreOffice"""
+        if self.process is None or self.process.poll() is not None:
+            return
+        try:
+            if os.name == 'posix':
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                subprocess.run(
+                    ['taskkill', '/F', '/T', '/PID', str(self.process.pid)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+        except OSError:
+            self.process.kill()
+        self.process.wait()
+
+
+class LibreOfficePool:
+    """Пул прогретых процессов LibreOffice
+
+    У каждого процесса свой профиль, поэтому они работают параллельно.
+    Упавший или зависший процесс перезапускается; документ, на котором
+    процесс упал, конвертируется повторно до retries раз.
+    """
+
+    def __init__(self, soffice, uno_python, size=2, timeout=120, startup_timeout=60, retries=1):
+        self.command = [uno_python, str(WORKER_SCRIPT), soffice]
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.retries = retries
+        self.profile_root = None
+        self.workers = []
+        self.idle = queue.Queue()
+
+    def start(self):
+        """Параллельный запуск всех процессов пула"""
+        self.profile_root = Path(tempfile.mkdtemp(prefix='docgen_libreoffice_'))
+        self.workers = [
+            LibreOfficeWorker(self.command, self.profile_root / f"worker_{index}", self.startup_timeout)
+            for index in range(self.size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            errors = [error for error in executor.map(self._start_worker, self.workers) if error]
+        if errors:
+            self.close()
+            raise RuntimeError(errors[0])
+
+        for worker in self.workers:
+            self.idle.put(worker)
+        return self
+
+    @staticmethod
+    def _start_worker(worker):
+        try:
+            worker.start()
+        except Exception as e:
+            return str(e)
+        return None
+
+    def convert(self, source, target):
+        """Конвертация документа свободным процессом пула"""
+        target = Path(target)
+        worker = self.idle.get()
+        try:
+            for attempt in range(self.retries + 1):
+                temporary = target.with_name(f".{target.stem}.{uuid.uuid4().hex}.pdf")
+                try:
+                    worker.convert(source, temporary, self.timeout)
+                    validate_pdf(temporary)
+                    os.replace(temporary, target)
+                    return
+                except WorkerError as e:
+                    log_warning(f"Перезапуск процесса LibreOffice: {e}")
+                    worker.restart()
+                    if isinstance(e, WorkerTimeout) or attempt == self.retries:
+                        raise
+                finally:
+                    if temporary.exists():
+                        temporary.unlink()
+        finally:
+            self.idle.put(worker)
+
+    def convert_batch(self, pairs):
+        """Параллельная конвертация пар (docx, pdf): {pdf: None или текст ошибки}"""
+        def convert_pair(pair):
+            try:
+                self.convert(*pair)
+            except Exception as e:
+                return str(pair[1]), str(e) or type(e).__name__
+            return str(pair[1]), None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return dict(executor.map(convert_pair, pairs))
+
+    def close(self):
+        """Остановка процессов и удаление временных профилей"""
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+        if self.profile_root is not None:
+            shutil.rmtree(self.profile_root, ignore_errors=True)
+            self.profile_root = None
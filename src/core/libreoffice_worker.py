@@ -0,0 +1,127 @@
+"""
+Процесс-посредник между пулом конвертации и одним экземпляром LibreOffice
+
+Запускается интерпретатором, в котором доступен модуль uno (Python из
+поставки LibreOffice или системный python3-uno), поэтому использует только
+стандартную библиотеку. Запускает soffice с отдельным профилем, подключается
+к нему через UNO и выполняет команды из stdin: одна JSON строка
+{"source": ..., "target": ...} на документ, ответ - одна JSON строка в stdout.
+При закрытии stdin LibreOffice завершается вместе с процессом.
+
+    python libreoffice_worker.py <soffice> <profile_dir>
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import uno
+from com.sun.star.beans import PropertyValue
+from com.sun.star.connection import NoConnectException
+
+
+CONNECT_TIMEOUT = 60
+
+
+def properties(**values):
+    """Кортеж PropertyValue для вызовов UNO"""
+    result = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        result.append(prop)
+    return tuple(result)
+
+
+def start_office(soffice, profile_dir):
+    """Запуск soffice и подключение к нему, результат (процесс, Desktop)"""
+    pipe_name = f"docgen_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+    office = subprocess.Popen([
+        soffice,
+        '--headless', '--invisible', '--nologo', '--nodefault',
+        '--norestore', '--nolockcheck',
+        f"-env:UserInstallation={uno.systemPathToFileUrl(os.path.abspath(profile_dir))}",
+        f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext"
+    ], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        'com.sun.star.bridge.UnoUrlResolver', local_context
+    )
+
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while True:
+        if office.poll() is not None:
+            raise RuntimeError(f"soffice завершился с кодом {office.returncode}")
+        try:
+            context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+            break
+        except NoConnectException:
+            if time.monotonic() > deadline:
+                office.kill()
+                raise RuntimeError("LibreOffice не отвечает")
+            time.sleep(0.2)
+
+    desktop = context.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', context)
+    return office, desktop
+
+
+def convert(desktop, source, target):
+    """Конвертация одного документа в PDF"""
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(source)), '_blank', 0,
+        properties(Hidden=True, ReadOnly=True, UpdateDocMode=0)
+    )
+    if document is None:
+        raise RuntimeError("LibreOffice не смог открыть документ")
+    try:
+        document.storeToURL(
+            uno.systemPathToFileUrl(os.path.abspath(target)),
+            properties(FilterName='writer_pdf_Export')
+        )
+    finally:
+        document.close(True)
+
+
+def reply(**message):
+    sys.stdout.write(json.dumps(message, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
+def main():
+    soffice, profile_dir = sys.argv[1], sys.argv[2]
+    try:
+        office, desktop = start_office(soffice, profile_dir)
+    except Exception as e:
+        reply(ready=False, error=str(e))
+        return 1
+
+    reply(ready=True)
+    try:
+        for line in sys.stdin:
+            request = json.loads(line)
+            try:
+                convert(desktop, request['source'], request['target'])
+                reply(ok=True)
+            except Exception as e:
+                fatal = office.poll() is not None
+                reply(ok=False, error=str(e) or type(e).__name__, fatal=fatal)
+                if fatal:
+                    return 1
+    finally:
+        try:
+            desktop.terminate()
+        except Exception:
+            pass
+        try:
+            office.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            office.kill()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
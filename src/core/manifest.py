@@ -0,0 +1,182 @@
+"""
+Манифест выходных файлов для инкрементальных запусков
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from src.utils.logger import log_info, log_warning
+
+
+MANIFEST_VERSION = 1
+# Настройки обработки, от которых зависит содержимое документов
+OUTPUT_SETTINGS = ['image_height_inches', 'create_pdf', 'render_mode', 'image_preprocessing']
+
+
+class Manifest:
+    """Хэши входных данных каждого выходного файла
+
+    Хэш документа складывается из значений строки, байтов шаблона,
+    влияющих на результат настроек и содержимого найденных изображений.
+    Документы с неизменным хэшем пропускаются, если файлы на месте (при
+    require_pdf - и PDF). Манифест сохраняется по ходу работы, поэтому
+    прерванный запуск продолжается с места остановки.
+    """
+
+    def __init__(self, config, word_processor, require_pdf=False):
+        options = config['processing'].get('incremental', {})
+        self.config = config
+        self.word_processor = word_processor
+        self.remove_orphans = options.get('remove_orphans', False)
+        self.save_interval = options.get('save_interval_seconds', 5)
+        self.word_folder = Path(config['output']['word_folder'])
+        self.pdf_folder = Path(config['output']['pdf_folder'])
+        self.require_pdf = require_pdf
+        if options.get('manifest_file'):
+            self.path = Path(options['manifest_file'])
+        else:
+            self.path = self.word_folder.parent / 'manifest.json'
+
+        self.base_hash = None
+        self.entries = {}
+        self.pending = {}
+        self.seen = set()
+        self.file_hashes = {}
+        self.last_save = time.monotonic()
+        self.skipped = 0
+        self.regenerated = 0
+        self.removed = 0
+
+    def load(self, force=False):
+        """Чтение манифеста; при force все документы создаются заново"""
+        self.base_hash = self._base_hash()
+        if force:
+            log_info("   🔁 Полная перегенерация: манифест не учитывается")
+            return self
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            log_warning(f"Манифест поврежден и будет создан заново: {e}")
+            return self
+
+        if stored.get('version') == MANIFEST_VERSION:
+            self.entries = stored.get('files', {})
+        log_info(f"   📒 Манифест: {len(self.entries)} документов из прошлых запусков")
+        return self
+
+    def pending_jobs(self, jobs):
+        """Задания для документов, входные данные которых изменились"""
+        for job in jobs:
+            position, _, filename, row_data = job
+            digest = self.row_hash(row_data)
+            self.seen.add(filename)
+
+            entry = self.entries.get(filename)
+            if entry is not None and entry['hash'] == digest and self._outputs_exist(filename, entry):
+                self.skipped += 1
+                continue
+
+            self.pending[position] = (filename, digest, entry is not None)
+            yield job
+
+    def record(self, result):
+        """Учет результата обработки строки"""
+        filename, digest, existed = self.pending.pop(result['position'])
+
+        if result['success']:
+            self.entries[filename] = {'hash': digest, 'pdf': result['pdf_created']}
+            if existed:
+                self.regenerated += 1
+        else:
+            self.entries.pop(filename, None)
+
+        if time.monotonic() - self.last_save >= self.save_interval:
+            self.save()
+
+    def finish(self):
+        """Удаление документов, строк для которых больше нет, и сохранение"""
+        orphans = [filename for filename in self.entries if filename not in self.seen]
+
+        if orphans and self.remove_orphans:
+            for filename in orphans:
+                for path in (self._word_path(filename), self._pdf_path(filename)):
+                    path.unlink(missing_ok=True)
+                del self.entries[filename]
+                self.removed += 1
+            log_info(f"   🗑️ Удалено устаревших документов: {self.removed}")
+        elif orphans:
+            log_info(f"   📒 Документов без строк в данных: {len(orphans)} (remove_orphans выключен)")
+
+        self.save()
+
+    def save(self):
+        """Атомарная запись манифеста"""
+        stored = {
+            'version': MANIFEST_VERSION,
+            'files': self.entries
+        }
+        temporary = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(stored, f, ensure_ascii=False)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            temporary.unlink(missing_ok=True)
+            log_warning(f"Не удалось сохранить манифест: {e}")
+        self.last_save = time.monotonic()
+
+    def row_hash(self, row_data):
+        """Хэш входных данных документа для строки"""
+        digest = hashlib.sha256(self.base_hash.encode())
+        values = {str(column): str(value) for column, value in row_data.items()}
+        digest.update(json.dumps(values, sort_keys=True, ensure_ascii=False).encode())
+
+        for image_name, image_path in self.word_processor.referenced_images(row_data):
+            image_hash = self._file_hash(image_path) if image_path else 'missing'
+            digest.update(f"\0{image_name}\0{image_hash}".encode())
+
+        template_path = self.word_processor.template_for(row_data)
+        if template_path != self.word_processor.template_path:
+            template_hash = self._file_hash(template_path) if template_path.exists() else 'missing'
+            digest.update(f"\0template\0{template_hash}".encode())
+
+        return digest.hexdigest()
+
+    def _base_hash(self):
+        """Хэш шаблона и настроек, общих для всех документов"""
+        processing = self.config['processing']
+        settings = {
+            'version': MANIFEST_VERSION,
+            'placeholders': self.config['placeholders'],
+            'processing': {name: processing.get(name) for name in OUTPUT_SETTINGS}
+        }
+        digest = hashlib.sha256(json.dumps(settings, sort_keys=True, ensure_ascii=False).encode())
+        digest.update(Path(self.config['input']['word_template']).read_bytes())
+        return digest.hexdigest()
+
+    def _file_hash(self, path):
+        """Хэш содержимого изображения или шаблона, вычисляется один раз за запуск"""
+        stat = os.stat(path)
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        if key not in self.file_hashes:
+            self.file_hashes[key] = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        return self.file_hashes[key]
+
+    def _outputs_exist(self, filename, entry):
+        """Файлы документа из манифеста на месте: PDF проверяется, если он будет создаваться"""
+        if not self._word_path(filename).exists():
+            return False
+        return not self.require_pdf or (entry.get('pdf', False) and self._pdf_path(filename).exists())
+
+    def _word_path(self, filename):
+        return self.word_folder / f"{filename}.docx"
+
+    def _pdf_path(self, filename):
+        return self.pdf_folder / f"{filename}.pdf"
@@ -1,30 +1,92 @@
 """
-PDF конвертер (демо-версия)
+PDF конвертер
 """
 from pathlib import Path
-from src.utils.logger import log_info, log_warning
+from src.core.libreoffice_pool import LibreOfficePool, find_soffice, find_uno_python
+from src.utils.logger import log_info, log_success, log_warning, log_error
+from src.utils.metrics import timed
 
 
 class PDFConverter:
-    """Класс для конвертации Word в PDF (демо-версия)"""
+    """Класс для конвертации Word в PDF через пул LibreOffice
+
+    Пул запускается при первой конвертации или проверке доступности.
+    """
 
     def __init__(self, config):
         self.config = config
+        self.options = config['processing'].get('pdf', {})
+        self.pool = None
+        self.status = None
 
-    def convert_word_to_pdf(self, word_path: str, pdf_path: str):
-        """Конвертация Word документа в PDF (заглушка для демо)"""
+    @property
+    def pool_size(self):
+        return self.pool.size if self.pool else 0
 
-        # NOTE: В полной версии здесь будет реализована логика:
-        # - Конвертация через docx2pdf
-        # - Кроссплатформенное скрытие окон Word
-        # - Обработка ошибок конвертации
-        # - Валидация созданных PDF файлов
+    def convert_word_to_pdf(self, word_path: str, pdf_path: str):
+        """Конвертация Word документа в PDF"""
+        if not self.is_available():
+            return False
 
-        log_warning("PDF конвертация доступна только в полной версии")
-        log_info(f"Для создания PDF из {Path(word_path).name} используйте полную версию")
+        try:
+            self.pool.convert(word_path, pdf_path)
+            return True
+        except Exception as e:
+            log_error(f"Ошибка PDF конвертации {Path(word_path).name}: {e}")
+            return False
 
-        return False
+    def convert_batch(self, pairs):
+        """Параллельная конвертация пар (docx, pdf): {pdf: None или текст ошибки}"""
+        if not self.is_available():
+            return {str(pdf_path): self.status for _, pdf_path in pairs}
+        return self.pool.convert_batch(pairs)
 
     def is_available(self):
         """Проверка доступности PDF конвертации"""
-        return False
+        if self.status is None:
+            self._start()
+        return self.pool is not None
+
+    def _start(self):
+        """Поиск LibreOffice и запуск пула"""
+        backend = self.options.get('backend', 'libreoffice')
+        if backend != 'libreoffice':
+            self._unavailable(f"неизвестный backend {backend}")
+            return
+
+        soffice = find_soffice(self.options.get('soffice_path'))
+        if soffice is None:
+            self._unavailable("LibreOffice (soffice) не найден")
+            return
+
+        uno_python = find_uno_python(soffice, self.options.get('uno_python'))
+        if uno_python is None:
+            self._unavailable("не найден Python с модулем uno (python3-uno)")
+            return
+
+        try:
+            with timed('pdf_startup'):
+                self.pool = LibreOfficePool(
+                    soffice, uno_python,
+                    size=self.options.get('pool_size', 2),
+                    timeout=self.options.get('timeout_seconds', 120),
+                    startup_timeout=self.options.get('startup_timeout_seconds', 60),
+                    retries=self.options.get('retries', 1)
+                ).start()
+        except Exception as e:
+            self._unavailable(str(e))
+            return
+
+        self.status = 'ok'
+        log_success(f"PDF конвертация: запущено процессов LibreOffice: {self.pool.size}")
+
+    def _unavailable(self, reason):
+        self.status = reason
+        log_warning(f"PDF конвертация недоступна: {reason}")
+        log_info("   Установите LibreOffice или отключите processing.create_pdf")
+
+    def close(self):
+        """Остановка пула LibreOffice"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
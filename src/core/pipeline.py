@@ -0,0 +1,232 @@
+"""
+Конвейер генерации: чтение строк -> Word -> PDF -> сбор результатов
+"""
+import queue
+import threading
+import time
+from src.core.generation import convert_row_pdf, generate_parallel, process_row, row_timeout
+
+
+_DONE = object()
+
+
+class StageStats:
+    """Счетчики этапа конвейера: обработанные элементы, время работы, глубина входной очереди"""
+
+    def __init__(self, name, workers, queue_size=None):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.max_depth = 0
+        self.lock = threading.Lock()
+
+    def add_item(self, seconds):
+        with self.lock:
+            self.items += 1
+            self.busy_seconds += seconds
+
+    def sample_queue(self, depth):
+        with self.lock:
+            self.depth_total += depth
+            self.depth_samples += 1
+            self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'busy_seconds': self.busy_seconds,
+            'queue_size': self.queue_size,
+            'queue_max_depth': self.max_depth,
+            'queue_mean_depth': self.depth_total / self.depth_samples if self.depth_samples else 0.0
+        }
+
+
+class Pipeline:
+    """Этапы генерации, связанные ограниченными очередями
+
+    Строки читаются в отдельном потоке, Word документы создаются в текущем
+    потоке (или в пуле процессов при workers > 1), PDF конвертируются
+    несколькими потоками, результаты передаются в on_result в порядке строк
+    отдельным потоком. Заполненная очередь останавливает предыдущий этап,
+    поэтому время работы приближается ко времени самого медленного этапа.
+    """
+
+    def __init__(self, config, word_processor, pdf_converter, workers=1, timeout=None):
+        options = config['processing'].get('pipeline', {})
+        self.config = config
+        self.word_processor = word_processor
+        self.pdf_converter = pdf_converter
+        self.workers = workers
+        self.timeout = timeout
+        self.queue_size = options.get('queue_size', 64)
+
+        self.convert_pdf = config['processing']['create_pdf'] and pdf_converter.is_available()
+        self.pdf_workers = options.get('pdf_workers') or max(1, pdf_converter.pool_size)
+
+        self.ingest_stage = StageStats('Чтение строк', 1)
+        self.render_stage = StageStats('Создание Word', workers, self.queue_size)
+        self.pdf_stage = StageStats('Конвертация PDF', self.pdf_workers, self.queue_size) if self.convert_pdf else None
+        self.collect_stage = StageStats('Сбор результатов', 1, self.queue_size)
+
+        self.rows = queue.Queue(self.queue_size)
+        self.rendered = queue.Queue(self.queue_size) if self.convert_pdf else None
+        self.done = queue.Queue(self.queue_size)
+        self.stop = threading.Event()
+        self.error = None
+        self.wall_seconds = 0.0
+
+    @property
+    def stages(self):
+        return [stage for stage in (self.ingest_stage, self.render_stage, self.pdf_stage, self.collect_stage) if stage]
+
+    def run(self, jobs, on_result):
+        """Обработка заданий; on_result вызывается для каждого результата"""
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._ingest, args=(jobs,), daemon=True)]
+        if self.convert_pdf:
+            threads += [threading.Thread(target=self._convert, daemon=True) for _ in range(self.pdf_workers)]
+        threads.append(threading.Thread(target=self._collect, args=(on_result,), daemon=True))
+
+        for thread in threads:
+            thread.start()
+        try:
+            self._render()
+            for thread in threads:
+                thread.join()
+        except BaseException:
+            self.stop.set()
+            raise
+        finally:
+            self.wall_seconds = time.perf_counter() - started
+
+        if self.error is not None:
+            raise self.error
+
+    def _ingest(self, jobs):
+        """Этап чтения строк"""
+        try:
+            iterator = iter(jobs)
+            while not self.stop.is_set():
+                started = time.perf_counter()
+                job = next(iterator, _DONE)
+                if job is _DONE:
+                    break
+                self.ingest_stage.add_item(time.perf_counter() - started)
+                self._put(self.rows, job)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(self.rows, _DONE)
+
+    def _render(self):
+        """Этап создания Word документов в текущем потоке"""
+        target = self.rendered if self.convert_pdf else self.done
+        jobs = self._drain(self.rows, self.render_stage)
+
+        if self.workers > 1:
+            results = generate_parallel(
+                self.config, jobs, self.workers,
+                chunk_size=self.config['processing'].get('chunk_size'),
+                timeout=self.timeout,
+                convert_pdf=False
+            )
+        else:
+            results = self._render_sequential(jobs)
+
+        try:
+            for sequence, result in enumerate(results):
+                self.render_stage.add_item(result['render_seconds'])
+                if not self._put(target, (sequence, result)):
+                    break
+        finally:
+            for _ in range(self.pdf_workers if self.convert_pdf else 1):
+                self._put(target, _DONE)
+
+    def _render_sequential(self, jobs):
+        for job in jobs:
+            with row_timeout(self.timeout):
+                result = process_row(self.word_processor, self.pdf_converter, self.config, job, convert_pdf=False)
+            yield result
+
+    def _convert(self):
+        """Этап конвертации в PDF"""
+        try:
+            for sequence, result in self._drain(self.rendered, self.pdf_stage):
+                if result['success']:
+                    convert_row_pdf(self.pdf_converter, self.config, result)
+                    self.pdf_stage.add_item(result['pdf_seconds'])
+                if not self._put(self.done, (sequence, result)):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(self.done, _DONE)
+
+    def _collect(self, on_result):
+        """Этап сбора результатов: передача в on_result в порядке строк"""
+        producers = self.pdf_workers if self.convert_pdf else 1
+        pending = {}
+        next_sequence = 0
+        try:
+            while producers:
+                item = self._get(self.done, self.collect_stage)
+                if item is _DONE:
+                    producers -= 1
+                    continue
+
+                sequence, result = item
+                pending[sequence] = result
+                while next_sequence in pending:
+                    started = time.perf_counter()
+                    on_result(pending.pop(next_sequence))
+                    self.collect_stage.add_item(time.perf_counter() - started)
+                    next_sequence += 1
+        except BaseException as e:
+            self._fail(e)
+
+    def _drain(self, source, stage):
+        """Элементы очереди до метки завершения"""
+        while True:
+            item = self._get(source, stage)
+            if item is _DONE:
+                return
+            yield item
+
+    def _get(self, source, stage):
+        while True:
+            try:
+                item = source.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop.is_set():
+                    return _DONE
+                continue
+            if item is not _DONE:
+                stage.sample_queue(source.qsize())
+            return item
+
+    def _put(self, target, item):
+        while not self.stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(self, error):
+        if self.error is None:
+            self.error = error
+        self.stop.set()
+
+    def summary(self):
+        """Статистика этапов для отчета"""
+        return {
+            'wall_seconds': self.wall_seconds,
+            'stages': [stage.as_dict() for stage in self.stages]
+        }
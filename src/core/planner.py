@@ -0,0 +1,221 @@
+"""
+Предварительный план генерации (--plan)
+"""
+import os
+import pandas as pd
+from pathlib import Path
+from src.utils.logger import log_info, log_success, log_warning, log_error
+
+
+INVALID_FILENAME_PATTERN = r'[<>:"/\\|?*]'
+
+
+class RunPlan:
+    """Результат планирования: таблица по строкам и найденные проблемы"""
+
+    def __init__(self, rows, blocking, warnings):
+        self.rows = rows
+        self.blocking = blocking
+        self.warnings = warnings
+
+    def save(self, path):
+        """Запись плана в CSV"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.rows.to_csv(path, index=False, encoding='utf-8-sig')
+        return path
+
+    def log_summary(self):
+        """Вывод итогов плана"""
+        log_info(f"   📄 Документов в плане: {len(self.rows)}")
+        log_info(f"   📝 Замен текста: {int(self.rows['text_replacements'].sum())}")
+        log_info(f"   🖼️ Изображений: {int(self.rows['images_found'].sum())} найдено, "
+                 f"{int(self.rows['images_missing'].sum())} не найдено")
+        log_info(f"   💾 Оценка объема: {self.rows['estimated_bytes'].sum() / 1024 / 1024:.1f} МБ")
+
+        for message in self.warnings:
+            log_warning(message)
+        for message in self.blocking:
+            log_error(message)
+
+        if self.blocking:
+            log_error(f"План содержит блокирующие проблемы: {len(self.blocking)}")
+        else:
+            log_success("План проверен: блокирующих проблем нет")
+
+
+class RunPlanner:
+    """Построение плана по загруженной таблице векторными операциями pandas
+
+    Имена файлов вычисляются по тем же правилам, что и
+    ExcelProcessor.get_naming_column_value, изображения ищутся по индексу
+    один раз на уникальное имя.
+    """
+
+    def __init__(self, config, word_processor):
+        self.config = config
+        self.word_processor = word_processor
+        options = config['processing'].get('plan', {})
+        self.allow_missing_images = options.get('allow_missing_images', False)
+        self.resolve_collisions = config['output'].get('resolve_collisions', False)
+
+    def build(self, data):
+        """План для очищенных данных ExcelProcessor.data"""
+        plan = pd.DataFrame({'row': data.index + 1})
+        plan.index = data.index
+        blocking = []
+        warnings = []
+
+        plan['filename'], plan['naming_source'] = self._filenames(data)
+        fallback_rows = int((plan['naming_source'] == 'row_number').sum())
+        if fallback_rows:
+            warnings.append(f"Пустое имя файла, используется номер строки (строк: {fallback_rows})")
+
+        plan['output_name'] = self._resolve_collisions(plan['filename'])
+        duplicated = plan['filename'].duplicated(keep=False)
+        if duplicated.any():
+            names = plan.loc[duplicated, 'filename'].unique()
+            message = f"Повторяющиеся имена файлов: {len(names)} ({', '.join(map(str, names[:5]))})"
+            if self.resolve_collisions:
+                warnings.append(f"{message}, добавлены суффиксы _2, _3, ...")
+            else:
+                blocking.append(f"{message}: документы перезапишут друг друга (output.resolve_collisions)")
+        if self.resolve_collisions and plan['output_name'].duplicated().any():
+            blocking.append("Не удалось разрешить повторы имен файлов: суффикс совпадает с другим именем")
+
+        plan['template'] = self._templates(data)
+        work = []
+        for template_path in plan['template'].unique():
+            rows = plan['template'] == template_path
+            try:
+                compiled_template = self.word_processor.compiled_template_for(template_path)
+            except Exception as e:
+                blocking.append(f"Шаблон недоступен для строк: {int(rows.sum())} ({e})")
+                compiled_template = None
+            work.append(self._plan_work(data[rows], compiled_template, template_path))
+        plan = plan.join(pd.concat(work))
+
+        missing_rows = int((plan['images_missing'] > 0).sum())
+        if missing_rows:
+            message = f"Изображения не найдены: {int(plan['images_missing'].sum())} в {missing_rows} строках"
+            (warnings if self.allow_missing_images else blocking).append(message)
+
+        plan['issues'] = self._row_issues(plan, duplicated)
+        return RunPlan(plan.reset_index(drop=True), blocking, warnings)
+
+    def filenames(self, data):
+        """Имена документов строк без разрешения повторов"""
+        return self._filenames(data)[0]
+
+    def _filenames(self, data):
+        """Имена файлов и источник имени: column, first_column или row_number"""
+        naming_column = self.config['excel_columns']['naming_column']
+        empty = pd.Series('', index=data.index, dtype=object)
+
+        naming = self._name_candidates(data[naming_column]) if naming_column in data.columns else empty
+        first = self._name_candidates(data.iloc[:, 0]) if len(data.columns) else empty
+        row_numbers = pd.Series([f"{index + 1:04d}" for index in data.index], index=data.index, dtype=object)
+
+        filenames = naming.where(naming != '', first.where(first != '', row_numbers))
+        source = pd.Series('row_number', index=data.index, dtype=object)
+        source = source.mask(first != '', 'first_column').mask(naming != '', 'column')
+        return self._clean_filenames(filenames), source
+
+    @staticmethod
+    def _name_candidates(column):
+        """Значения колонки как строки, пустые и NaN -> ''"""
+        values = column.astype(object).where(column.notna(), '')
+        return values.map(str).str.strip().astype(object)
+
+    @staticmethod
+    def _clean_filenames(filenames):
+        """Векторный аналог ExcelProcessor._clean_filename"""
+        cleaned = filenames.str.replace(INVALID_FILENAME_PATTERN, '_', regex=True).str.replace(' ', '_')
+        digits = cleaned.str.isdigit()
+        cleaned = cleaned.astype(object)
+        cleaned[digits] = cleaned[digits].map(lambda value: f"{int(value):04d}")
+        return cleaned
+
+    def _resolve_collisions(self, filenames):
+        if not self.resolve_collisions:
+            return filenames
+        occurrence = filenames.groupby(filenames).cumcount() + 1
+        return filenames.where(occurrence == 1, filenames + '_' + occurrence.astype(str))
+
+    def _templates(self, data):
+        """Шаблон каждой строки, векторный аналог TemplateRouter.select"""
+        router = self.word_processor.router
+        templates = pd.Series(str(router.default), index=data.index, dtype=object)
+        if not router.enabled:
+            return templates
+
+        empty = pd.Series('', index=data.index, dtype=object)
+        for column, test, template in reversed(router.rules):
+            values = self._name_candidates(data[column]) if column in data.columns else empty
+            matched = values.map({value: test(value) for value in values.unique()}).astype(bool)
+            templates = templates.mask(matched, str(router.resolve(template)))
+
+        if router.column in data.columns:
+            values = self._name_candidates(data[router.column])
+            paths = values.map({value: str(router.resolve(value)) for value in values.unique() if value})
+            templates = templates.mask(values != '', paths)
+        return templates
+
+    def _plan_work(self, data, compiled_template, template_path):
+        """Оценка работы по строкам одного шаблона: замены текста, изображения, объем"""
+        counts = compiled_template.placeholder_counts() if compiled_template is not None else {}
+        template_size = os.path.getsize(template_path) if compiled_template is not None else 0
+
+        plan = pd.DataFrame(index=data.index)
+        plan['text_replacements'] = 0
+        plan['images_found'] = 0
+        plan['images_missing'] = 0
+        plan['estimated_bytes'] = template_size
+        missing_names = pd.Series('', index=data.index, dtype=object)
+
+        for placeholder, config_data in self.config['placeholders'].items():
+            column_name = config_data['column']
+            occurrences = counts.get(placeholder, 0)
+            if column_name not in data.columns or not occurrences:
+                continue
+
+            if config_data['type'] == 'text':
+                plan['text_replacements'] += occurrences
+                continue
+
+            names = self._name_candidates(data[column_name])
+            requested = names != ''
+            sizes = {name: self._image_size(name) for name in names[requested].unique()}
+            image_sizes = names.map(sizes)
+            found = requested & image_sizes.notna()
+            missing = requested & image_sizes.isna()
+
+            plan['images_found'] += found.astype(int) * occurrences
+            plan['images_missing'] += missing.astype(int) * occurrences
+            plan['estimated_bytes'] += image_sizes.fillna(0).astype('int64') * occurrences
+            separator = missing_names.where(missing_names == '', missing_names + '; ')
+            missing_names = missing_names.where(~missing, separator + names)
+
+        plan['missing_images'] = missing_names
+        return plan
+
+    def _image_size(self, name):
+        """Размер файла изображения или None, если изображение не найдено"""
+        path = self.word_processor.image_index.find(name)
+        if path is None:
+            return None
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+    def _row_issues(self, plan, duplicated):
+        """Текстовое описание проблем строки"""
+        issues = pd.Series('', index=plan.index, dtype=object)
+        issues = issues.mask(duplicated, 'повтор имени')
+        missing = plan['images_missing'] > 0
+        with_separator = issues.where(issues == '', issues + '; ')
+        issues = issues.mask(missing, with_separator + 'нет изображений')
+        fallback = plan['naming_source'] == 'row_number'
+        with_separator = issues.where(issues == '', issues + '; ')
+        return issues.mask(fallback, with_separator + 'имя по номеру строки')
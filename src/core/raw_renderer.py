@@ -0,0 +1,176 @@
+"""
+Быстрый рендеринг текстовых шаблонов на уровне zip архива
+"""
+import io
+import re
+import struct
+import zipfile
+import zlib
+
+
+LOCAL_HEADER_SIZE = 30
+CENTRAL_DIR_STRUCT = '<4s4B4HL2L5H2L'
+CENTRAL_DIR_SIGNATURE = b'PK\x01\x02'
+END_RECORD_STRUCT = '<4s4H2LH'
+END_RECORD_SIGNATURE = b'PK\x05\x06'
+
+# Разметка, которую SubstitutionEngine создает для перевода строки и табуляции
+LINE_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+TAB = '</w:t><w:tab/><w:t xml:space="preserve">'
+MARKER_OPEN = '\ue000'
+MARKER_CLOSE = '\ue001'
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _marker(index):
+    """Метка плейсхолдера в тексте шаблона (символы из области частного использования)"""
+    return f'{MARKER_OPEN}{index}{MARKER_CLOSE}'
+
+
+def _escape(value):
+    """Экранирование значения так же, как его сериализует lxml"""
+    if INVALID_XML_CHARS.search(value):
+        raise ValueError(f"Недопустимые символы XML в значении: {value!r}")
+
+    value = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\r', '&#13;')
+    return value.replace('\n', LINE_BREAK).replace('\t', TAB).encode('utf-8')
+
+
+class _Member:
+    """Элемент архива: готовые сжатые байты или токенизированный XML"""
+
+    def __init__(self, info, raw=None, tokens=None):
+        self.info = info
+        self.raw = raw
+        self.tokens = tokens
+
+
+class RawXmlRenderer:
+    """Рендерер документов без python-docx для шаблонов только с текстовыми плейсхолдерами
+
+    Шаблон один раз проходит через тот же SubstitutionEngine, что и обычный
+    путь, но вместо значений подставляются метки. Неизменяемые части архива
+    копируются в каждый документ уже сжатыми, а XML частей с плейсхолдерами
+    собирается из байтовых фрагментов и экранированных значений.
+    """
+
+    def __init__(self, compiled_template, substitution, placeholders):
+        self.placeholders = list(placeholders)
+        self.members = []
+        self._compile(compiled_template, substitution)
+
+    def _compile(self, compiled_template, substitution):
+        """Подготовка фрагментов XML и сжатых элементов архива"""
+        markers = {placeholder: _marker(index) for index, placeholder in enumerate(self.placeholders)}
+
+        doc, paragraphs = compiled_template.clone()
+        for paragraph in paragraphs.values():
+            substitution.substitute(paragraph._p, markers)
+
+        buffer = io.BytesIO()
+        doc.save(buffer)
+
+        marker_pattern = re.compile(f'{MARKER_OPEN}(\\d+){MARKER_CLOSE}'.encode('utf-8'))
+
+        with zipfile.ZipFile(buffer) as archive:
+            for info in archive.infolist():
+                data = archive.read(info)
+                if marker_pattern.search(data):
+                    parts = marker_pattern.split(data)
+                    tokens = [
+                        int(part) if index % 2 else part
+                        for index, part in enumerate(parts)
+                    ]
+                    self.members.append(_Member(info, tokens=tokens))
+                else:
+                    self.members.append(_Member(info, raw=self._read_raw(buffer, info)))
+
+    @staticmethod
+    def _read_raw(buffer, info):
+        """Локальный заголовок и сжатые данные элемента архива как есть"""
+        buffer.seek(info.header_offset)
+        header = buffer.read(LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack('<2H', header[26:30])
+        return header + buffer.read(name_length + extra_length + info.compress_size)
+
+    def render(self, values, output):
+        """Запись документа в файл или поток
+
+        values - текстовые значения по плейсхолдерам. Плейсхолдеры без
+        значения остаются в тексте. Возвращает количество замен.
+        """
+        if isinstance(output, (str, bytes)) or hasattr(output, '__fspath__'):
+            with open(output, 'wb') as stream:
+                return self.render(values, stream)
+
+        escaped = [
+            _escape(values[placeholder] if placeholder in values else placeholder)
+            for placeholder in self.placeholders
+        ]
+        replacements = 0
+        entries = []
+
+        offset = 0
+        for member in self.members:
+            info = member.info
+            if member.tokens is None:
+                output.write(member.raw)
+                entries.append((info, offset))
+                offset += len(member.raw)
+                continue
+
+            chunks = []
+            for index, token in enumerate(member.tokens):
+                if index % 2:
+                    chunks.append(escaped[token])
+                    if self.placeholders[token] in values:
+                        replacements += 1
+                else:
+                    chunks.append(token)
+            data = b''.join(chunks)
+
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            compressed = compressor.compress(data) + compressor.flush()
+
+            new_info = zipfile.ZipInfo(info.filename, info.date_time)
+            new_info.compress_type = zipfile.ZIP_DEFLATED
+            new_info.external_attr = info.external_attr
+            new_info.create_system = info.create_system
+            new_info.CRC = zlib.crc32(data)
+            new_info.compress_size = len(compressed)
+            new_info.file_size = len(data)
+
+            header = new_info.FileHeader(zip64=False)
+            output.write(header)
+            output.write(compressed)
+            entries.append((new_info, offset))
+            offset += len(header) + len(compressed)
+
+        self._write_central_directory(output, entries, offset)
+        return replacements
+
+    @staticmethod
+    def _write_central_directory(output, entries, offset):
+        """Центральный каталог и завершающая запись архива"""
+        directory_start = offset
+        for info, header_offset in entries:
+            year, month, day, hour, minute, second = info.date_time
+            dosdate = (year - 1980) << 9 | month << 5 | day
+            dostime = hour << 11 | minute << 5 | second // 2
+            filename = info.filename.encode('ascii' if info.filename.isascii() else 'utf-8')
+            flag_bits = info.flag_bits | (0 if info.filename.isascii() else 0x800)
+
+            record = struct.pack(
+                CENTRAL_DIR_STRUCT, CENTRAL_DIR_SIGNATURE,
+                info.create_version, info.create_system, info.extract_version, info.reserved,
+                flag_bits, info.compress_type, dostime, dosdate,
+                info.CRC, info.compress_size, info.file_size,
+                len(filename), 0, 0, 0, info.internal_attr, info.external_attr, header_offset
+            )
+            output.write(record + filename)
+            offset += len(record) + len(filename)
+
+        output.write(struct.pack(
+            END_RECORD_STRUCT, END_RECORD_SIGNATURE, 0, 0,
+            len(entries), len(entries), offset - directory_start, directory_start, 0
+        ))
@@ -0,0 +1,129 @@
+"""
+Отчет по строкам запуска (output.report_file)
+"""
+import csv
+import json
+import os
+from pathlib import Path
+from src.utils.logger import log_info, log_warning
+
+# Колонки отчета: ключ записи (CSV, JSONL) и заголовок в Excel
+REPORT_COLUMNS = [
+    ('row', 'Строка'),
+    ('filename', 'Файл'),
+    ('status', 'Статус'),
+    ('error', 'Ошибка'),
+    ('text_replacements', 'Замен текста'),
+    ('images_inserted', 'Изображений вставлено'),
+    ('images_missing', 'Изображений не найдено'),
+    ('pdf_created', 'PDF создан'),
+    ('render_ms', 'Создание, мс'),
+    ('save_ms', 'Сохранение, мс'),
+    ('pdf_ms', 'PDF, мс')
+]
+SIBLING_FORMATS = ('csv', 'jsonl')
+
+# Строк между сбросом буфера CSV/JSONL на диск
+FLUSH_ROWS = 1000
+
+
+def report_enabled(config):
+    """Отчет по строкам включен (output.report.enabled)"""
+    return bool(config['output'].get('report_file')) and config['output'].get('report', {}).get('enabled', True)
+
+
+class ReportGenerator:
+    """Потоковая запись отчета: одна запись на обработанную строку
+
+    Excel книга создается в режиме write_only (строки сразу уходят во
+    временный файл, память не растет с числом строк) и сохраняется в
+    close(). CSV или JSONL копия (output.report.sibling) пишется по мере
+    обработки и доступна во время запуска. Результаты приходят в главный
+    процесс, поэтому отчет работает и с пулом процессов.
+    """
+
+    def __init__(self, config):
+        self.path = Path(config['output']['report_file'])
+        self.sibling_format = config['output'].get('report', {}).get('sibling')
+        if self.sibling_format not in (None, *SIBLING_FORMATS):
+            raise ValueError(f"Неизвестный формат копии отчета: {self.sibling_format}")
+
+        self.rows = 0
+        self.errors = 0
+        self.sibling_path = None
+        self.sibling_file = None
+        self.sibling_writer = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        from openpyxl import Workbook
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet('Отчет')
+        self.sheet.freeze_panes = 'A2'
+        self.sheet.append([title for _, title in REPORT_COLUMNS])
+
+        if self.sibling_format:
+            self.sibling_path = self.path.with_suffix(f".{self.sibling_format}")
+            self.sibling_file = open(
+                self.sibling_path, 'w', encoding='utf-8-sig' if self.sibling_format == 'csv' else 'utf-8', newline=''
+            )
+            if self.sibling_format == 'csv':
+                self.sibling_writer = csv.writer(self.sibling_file)
+                self.sibling_writer.writerow([key for key, _ in REPORT_COLUMNS])
+
+    def add_result(self, result):
+        """Запись строки отчета по результату обработки строки"""
+        record = self.record(result)
+        self.sheet.append([record[key] for key, _ in REPORT_COLUMNS])
+
+        if self.sibling_format == 'csv':
+            self.sibling_writer.writerow([record[key] for key, _ in REPORT_COLUMNS])
+        elif self.sibling_format == 'jsonl':
+            self.sibling_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        self.rows += 1
+        self.errors += not result['success']
+        if self.sibling_file and self.rows % FLUSH_ROWS == 0:
+            self.sibling_file.flush()
+
+    @staticmethod
+    def record(result):
+        """Запись отчета для результата строки"""
+        wall = (result.get('timings') or {}).get('wall', {})
+        save_seconds = wall.get('save', wall.get('raw_render'))
+        return {
+            'row': result['row_index'] + 1,
+            'filename': result['filename'],
+            'status': ('duplicate' if result.get('deduplicated') else 'ok') if result['success'] else 'error',
+            'error': result['error'] or '',
+            'text_replacements': result['text_replacements'],
+            'images_inserted': result['image_insertions'],
+            'images_missing': result['images_requested'] - result['image_insertions'],
+            'pdf_created': result['pdf_created'],
+            'render_ms': round(result['render_seconds'] * 1000, 1),
+            'save_ms': round(save_seconds * 1000, 1) if save_seconds is not None else None,
+            'pdf_ms': round(result['pdf_seconds'] * 1000, 1) if result['pdf_seconds'] else None
+        }
+
+    def close(self):
+        """Сохранение книги через временный файл и закрытие копии отчета"""
+        if self.sibling_file:
+            self.sibling_file.close()
+            self.sibling_file = None
+        if self.workbook is None:
+            return
+
+        temporary = self.path.with_name(f".{self.path.name}.tmp")
+        try:
+            self.workbook.save(temporary)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            temporary.unlink(missing_ok=True)
+            log_warning(f"Не удалось сохранить отчет: {e}")
+            return
+        finally:
+            self.workbook = None
+
+        message = f"📋 Отчет: {self.path}, строк {self.rows}, ошибок {self.errors}"
+        if self.sibling_path:
+            message += f" (копия {self.sibling_path})"
+        log_info(message)
@@ -0,0 +1,66 @@
+"""
+Связывание плейсхолдеров с колонками данных
+"""
+
+# Значение отсутствующей колонки
+MISSING = object()
+
+# Типы колонок, которые заранее переводятся в строки (целые, вещественные, логические)
+NUMERIC_KINDS = 'iufb'
+
+
+class RowBinding:
+    """Плейсхолдеры, разобранные по типам один раз на запуск
+
+    text и images - пары (плейсхолдер, колонка) в порядке конфигурации;
+    в цикле по строкам не нужно заново читать настройки плейсхолдеров.
+    """
+
+    def __init__(self, placeholders):
+        self.text = []
+        self.images = []
+        for placeholder, config_data in placeholders.items():
+            if config_data['type'] == 'text':
+                self.text.append((placeholder, config_data['column']))
+            elif config_data['type'] == 'image':
+                self.images.append((placeholder, config_data['column']))
+
+    @property
+    def text_columns(self):
+        """Колонки текстовых плейсхолдеров без повторов"""
+        return list(dict.fromkeys(column for _, column in self.text))
+
+    def text_values(self, row_data):
+        """Значения текстовых плейсхолдеров и список отсутствующих колонок"""
+        values = {}
+        missing = []
+        for placeholder, column in self.text:
+            value = row_data.get(column, MISSING)
+            if value is MISSING:
+                missing.append(column)
+            elif value.__class__ is str:
+                values[placeholder] = value
+            else:
+                values[placeholder] = '' if value is None else str(value)
+        return values, missing
+
+    def image_values(self, row_data):
+        """Тройки (плейсхолдер, колонка, значение) изображений строки, MISSING для отсутствующих колонок"""
+        return [(placeholder, column, row_data.get(column, MISSING)) for placeholder, column in self.images]
+
+    def stringify(self, data):
+        """Копия таблицы с числовыми колонками текстовых плейсхолдеров в виде строк
+
+        Преобразование векторное, результат совпадает с str() значения
+        строки, поэтому в цикле по строкам значения берутся как есть.
+        """
+        columns = [
+            column for column in self.text_columns
+            if column in data.columns and data[column].dtype.kind in NUMERIC_KINDS
+        ]
+        if not columns:
+            return data
+        data = data.copy(deep=False)
+        for column in columns:
+            data[column] = data[column].astype(str)
+        return data
@@ -0,0 +1,309 @@
+"""
+Разделение строк между запусками (--shard, --rows) и объединение их результатов (--merge)
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from src.utils.logger import log_info, log_success, log_warning, log_error
+from src.utils.metrics import QUANTILES, quantile
+
+RESULT_VERSION = 1
+MERGED_FILE = 'merged.json'
+
+
+def shard_of(name, count):
+    """Номер шарда (с 1) для имени документа, не зависит от порядка строк и машины"""
+    digest = hashlib.sha1(str(name).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def results_folder(config):
+    """Папка файлов результатов шардов (output.shards.folder)"""
+    return Path(config['output'].get('shards', {}).get('folder', 'output/shards'))
+
+
+class RowSelection:
+    """Строки этого запуска: диапазон номеров (--rows start:end) и шард (--shard i/N)
+
+    Номера строк - как в колонке row плана: с 1, конец диапазона
+    включается. Шард определяется по имени документа (naming_column),
+    поэтому строка попадает в тот же шард при повторных запусках и после
+    вставки строк, а повторы имени - в один шард.
+    """
+
+    def __init__(self, shard=None, rows=None):
+        self.shard = self._parse_shard(shard) if shard else None
+        self.rows = self._parse_rows(rows) if rows else None
+
+    @staticmethod
+    def _parse_shard(text):
+        try:
+            index, count = (int(part) for part in text.split('/'))
+        except ValueError:
+            raise ValueError(f"Некорректный шард: {text} (ожидается i/N, например 2/4)")
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Некорректный шард: {text} (нужно 1 <= i <= N)")
+        return index, count
+
+    @staticmethod
+    def _parse_rows(text):
+        try:
+            start, end = text.split(':')
+            start = int(start) if start else 1
+            end = int(end) if end else None
+        except ValueError:
+            raise ValueError(f"Некорректный диапазон строк: {text} (ожидается start:end, например 1:1000)")
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"Некорректный диапазон строк: {text}")
+        return start, end
+
+    @property
+    def enabled(self):
+        return self.shard is not None or self.rows is not None
+
+    @property
+    def label(self):
+        """Имя запуска для файлов: shard-2-of-4, rows-1-1000"""
+        parts = []
+        if self.shard:
+            parts.append(f"shard-{self.shard[0]}-of-{self.shard[1]}")
+        if self.rows:
+            parts.append(f"rows-{self.rows[0]}-{self.rows[1] or 'end'}")
+        return '.'.join(parts)
+
+    def describe(self):
+        parts = []
+        if self.shard:
+            parts.append(f"шард {self.shard[0]} из {self.shard[1]}")
+        if self.rows:
+            parts.append(f"строки {self.rows[0]}-{self.rows[1] or 'конец'}")
+        return ', '.join(parts)
+
+    def contains(self, number, name):
+        """Строка с номером number и именем документа name относится к запуску"""
+        if self.rows and (number < self.rows[0] or (self.rows[1] is not None and number > self.rows[1])):
+            return False
+        return self.shard is None or shard_of(name, self.shard[1]) == self.shard[0]
+
+    def filter_data(self, data, names):
+        """Строки загруженной таблицы; names - имена документов строк (RunPlanner.filenames)"""
+        numbers = data.index + 1
+        mask = numbers >= 1
+        if self.rows:
+            mask &= numbers >= self.rows[0]
+            if self.rows[1] is not None:
+                mask &= numbers <= self.rows[1]
+        if self.shard:
+            index, count = self.shard
+            shards = {name: shard_of(name, count) for name in names[mask].unique()}
+            mask &= (names.map(shards) == index).to_numpy()
+        return data[mask]
+
+    def filter_records(self, records, filename):
+        """Строки потока записей; filename(строка, номер) - имя документа"""
+        for row_index, row_data in records:
+            if self.contains(row_index + 1, filename(row_data, row_index + 1)):
+                yield row_index, row_data
+
+    def apply(self, config):
+        """Копия конфигурации с отдельными для запуска манифестом, метриками, планом и отчетом"""
+        config = json.loads(json.dumps(config))
+        incremental = config['processing'].setdefault('incremental', {})
+        manifest = incremental.get('manifest_file') or Path(config['output']['word_folder']).parent / 'manifest.json'
+        incremental['manifest_file'] = str(self._suffixed(manifest))
+
+        metrics = config['output'].get('metrics', {})
+        for key in ('json_file', 'prometheus_file'):
+            if metrics.get(key):
+                metrics[key] = str(self._suffixed(metrics[key]))
+        config['output']['plan_file'] = str(self._suffixed(config['output'].get('plan_file', 'output/plan.csv')))
+        if config['output'].get('report_file'):
+            config['output']['report_file'] = str(self._suffixed(config['output']['report_file']))
+        return config
+
+    def _suffixed(self, path):
+        path = Path(path)
+        return path.with_name(f"{path.stem}.{self.label}{path.suffix}")
+
+    def save_result(self, config, stats, outputs):
+        """Запись результата запуска для --merge: сводка, метрики и имена документов"""
+        path = results_folder(config) / f"{self.label}.json"
+        result = {
+            'version': RESULT_VERSION,
+            'label': self.label,
+            'shard': list(self.shard) if self.shard else None,
+            'rows': list(self.rows) if self.rows else None,
+            'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'summary': stats.get_summary(),
+            'metrics': stats.metrics.as_dict(),
+            'latencies': [round(value, 6) for value in stats.metrics.latencies],
+            'outputs': outputs
+        }
+        _write_json(path, result)
+        log_info(f"🧩 Результат запуска: {path}")
+        return path
+
+
+def merge_results(config, paths=None):
+    """Объединение результатов запусков в одну сводку
+
+    paths - файлы результатов, по умолчанию файлы папки
+    output.shards.folder; из папки берутся только шарды последнего по
+    времени разбиения на N. Проверяются совпадения имен документов и строк
+    между запусками, разное число шардов и пропущенные шарды. Результат -
+    код завершения.
+    """
+    folder = results_folder(config)
+    explicit = bool(paths)
+    paths = [Path(path) for path in paths] if paths else sorted(
+        path for path in folder.glob('*.json') if path.name != MERGED_FILE
+    )
+    if not paths:
+        log_error(f"Нет результатов запусков для объединения: {folder}")
+        return 1
+
+    results = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        if result.get('version') != RESULT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия результата: {path}")
+        results.append(result)
+    if not explicit:
+        results = _latest_split(results)
+    log_info(f"🧩 Объединение результатов: {len(results)} ({', '.join(result['label'] for result in results)})")
+
+    owners = {}
+    row_owners = {}
+    collisions = {}
+    overlapping_rows = 0
+    for result in results:
+        for row, name in result['outputs']:
+            owner = owners.setdefault(name, result['label'])
+            if owner != result['label']:
+                collisions.setdefault(name, {owner}).add(result['label'])
+            if row_owners.setdefault(row, result['label']) != result['label']:
+                overlapping_rows += 1
+
+    problems = []
+    counts = {result['shard'][1] for result in results if result['shard']}
+    if len(counts) > 1:
+        problems.append(f"Запуски разделены на разное число шардов: {', '.join(map(str, sorted(counts)))}")
+    for name, labels in list(collisions.items())[:10]:
+        problems.append(f"Имя документа {name} в нескольких запусках: {', '.join(sorted(labels))}")
+    if len(collisions) > 10:
+        problems.append(f"... всего повторяющихся имен: {len(collisions)}")
+    if overlapping_rows:
+        problems.append(f"Строки обработаны в нескольких запусках: {overlapping_rows}")
+
+    warnings = _missing_shards(results)
+    merged = {
+        'version': RESULT_VERSION,
+        'runs': [result['label'] for result in results],
+        'summary': _sum_summaries(results),
+        'metrics': _merge_metrics(results),
+        'collisions': {name: sorted(labels) for name, labels in collisions.items()},
+        'overlapping_rows': overlapping_rows,
+        'warnings': warnings
+    }
+    merged_path = folder / MERGED_FILE
+    _write_json(merged_path, merged)
+
+    _log_merged(merged)
+    for message in warnings:
+        log_warning(message)
+    for message in problems:
+        log_error(message)
+    log_info(f"🧩 Сводка сохранена: {merged_path}")
+
+    if problems:
+        log_error("Результаты запусков несовместимы")
+        return 1
+    log_success(f"Результаты объединены: {len(owners)} документов")
+    return 0 if merged['summary'].get('errors', 0) == 0 else 1
+
+
+def _latest_split(results):
+    """Результаты последнего разбиения: шарды с другим N - от прошлых запусков"""
+    sharded = [result for result in results if result['shard']]
+    if len({result['shard'][1] for result in sharded}) < 2:
+        return results
+
+    count = max(sharded, key=lambda result: result['finished'])['shard'][1]
+    stale = [result['label'] for result in sharded if result['shard'][1] != count]
+    log_warning(f"Пропущены результаты прошлого разбиения (не {count} шардов): {', '.join(stale)}")
+    return [result for result in results if not result['shard'] or result['shard'][1] == count]
+
+
+def _missing_shards(results):
+    counts = {result['shard'][1] for result in results if result['shard']}
+    if len(counts) != 1 or any(result['rows'] for result in results):
+        return []
+    count = counts.pop()
+    present = {result['shard'][0] for result in results if result['shard']}
+    missing = [f"{index}/{count}" for index in range(1, count + 1) if index not in present]
+    return [f"Нет результатов шардов: {', '.join(missing)}"] if missing else []
+
+
+def _sum_summaries(results):
+    summary = {}
+    for result in results:
+        for key, value in result['summary'].items():
+            summary[key] = summary.get(key, 0) + value
+    return summary
+
+
+def _merge_metrics(results):
+    """Метрики объединенного запуска: запуски шли параллельно, время - максимум"""
+    metrics = [result['metrics'] for result in results]
+    latencies = [value for result in results for value in result['latencies']]
+    documents = sum(item['documents'] for item in metrics)
+    wall_seconds = max(item['wall_seconds'] for item in metrics)
+
+    stages = {}
+    for item in metrics:
+        for name, stage in item['document_stages'].items():
+            merged = stages.setdefault(name, {'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            merged['count'] += stage['count']
+            merged['wall_seconds'] += stage['wall_seconds']
+            merged['cpu_seconds'] += stage['cpu_seconds'] or 0.0
+
+    return {
+        'documents': documents,
+        'wall_seconds': wall_seconds,
+        'documents_per_second': documents / wall_seconds if wall_seconds else 0.0,
+        'document_latency_seconds': {f"p{round(q * 100)}": quantile(latencies, q) for q in QUANTILES},
+        'document_stages': stages,
+        'peak_rss_bytes': max(item['peak_rss_bytes'] or 0 for item in metrics)
+    }
+
+
+def _log_merged(merged):
+    summary, metrics = merged['summary'], merged['metrics']
+    log_info(f"📄 Документов создано: {summary.get('documents_created', 0)}")
+    log_info(f"📝 Замен текста: {summary.get('text_replacements', 0)}")
+    log_info(f"🖼️ Изображений вставлено: {summary.get('image_insertions', 0)}")
+    if summary.get('pdfs_created'):
+        log_info(f"📑 PDF создано: {summary['pdfs_created']}")
+    if summary.get('documents_skipped'):
+        log_info(f"⏭️ Пропущено без изменений: {summary['documents_skipped']}")
+    if summary.get('errors'):
+        log_info(f"⚠️ Ошибок: {summary['errors']}")
+    if metrics['documents']:
+        latency = metrics['document_latency_seconds']
+        log_info(f"⚡ Документов в секунду: {metrics['documents_per_second']:.1f} "
+                 f"(самый долгий запуск {metrics['wall_seconds']:.1f} с)")
+        log_info(f"   Время документа: p50 {latency['p50'] * 1000:.0f} мс, "
+                 f"p95 {latency['p95'] * 1000:.0f} мс, p99 {latency['p99'] * 1000:.0f} мс")
+
+
+def _write_json(path, data):
+    """Запись через временный файл: прерванная запись не портит прошлый результат"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.tmp")
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temporary, path)
@@ -0,0 +1,131 @@
+"""
+Движок подстановки плейсхолдеров за один проход
+"""
+import copy
+import re
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+TEXT_PATH = './w:r/w:t | ./w:hyperlink/w:r/w:t'
+SPECIAL_CHARS = re.compile(r'(\n|\t)')
+
+
+class SubstitutionEngine:
+    """Замена всех плейсхолдеров абзаца одним общим шаблоном
+
+    Плейсхолдер может быть разбит Word на несколько runs: текст совпадения
+    записывается в первый run, из остальных удаляется, поэтому форматирование
+    runs сохраняется.
+    """
+
+    def __init__(self, placeholders):
+        ordered = sorted(placeholders, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(placeholder) for placeholder in ordered))
+
+    def substitute(self, paragraph, values, image_placeholders=()):
+        """Подстановка значений в абзац (элемент w:p)
+
+        values - текстовые значения по плейсхолдерам, image_placeholders -
+        плейсхолдеры, заменяемые пустым run для вставки изображения.
+        Плейсхолдеры без значения остаются в тексте.
+        Возвращает количество текстовых замен и список (плейсхолдер, run).
+        """
+        nodes = paragraph.xpath(TEXT_PATH)
+        if not nodes:
+            return 0, []
+
+        texts = [node.text or '' for node in nodes]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text)
+        full_text = ''.join(texts)
+
+        matches = [
+            match for match in self.pattern.finditer(full_text)
+            if match.group() in values or match.group() in image_placeholders
+        ]
+
+        replacements = 0
+        anchors = []
+        touched = set()
+        node_index = len(nodes) - 1
+
+        for match in reversed(matches):
+            while starts[node_index] > match.start():
+                node_index -= 1
+            first = node_index
+            last = first
+            while last + 1 < len(nodes) and starts[last + 1] < match.end():
+                last += 1
+
+            placeholder = match.group()
+            prefix = texts[first][:match.start() - starts[first]]
+            suffix = texts[last][match.end() - starts[last]:]
+
+            if placeholder in image_placeholders:
+                value = ''
+            else:
+                value = values[placeholder]
+                replacements += 1
+
+            if first == last:
+                texts[first] = prefix + value + suffix
+            else:
+                texts[first] = prefix + value
+                for middle in range(first + 1, last):
+                    texts[middle] = ''
+                texts[last] = suffix
+
+            if placeholder in image_placeholders:
+                run = nodes[first].getparent()
+                if first == last and suffix:
+                    texts[first] = prefix
+                    run.addnext(self._tail_run(run, suffix))
+                anchor = OxmlElement('w:r')
+                run.addnext(anchor)
+                anchors.append((placeholder, anchor))
+
+            touched.update(range(first, last + 1))
+
+        for index in sorted(touched):
+            self._set_text(nodes[index], texts[index])
+
+        anchors.reverse()
+        return replacements, anchors
+
+    def _set_text(self, node, text):
+        """Запись текста в w:t с переводом строк и табуляцией как в Word"""
+        node.set(XML_SPACE, 'preserve')
+        if '\n' not in text and '\t' not in text:
+            node.text = text
+            return
+
+        pieces = SPECIAL_CHARS.split(text)
+        node.text = pieces[0]
+        current = node
+        for piece in pieces[1:]:
+            if piece == '\n':
+                element = OxmlElement('w:br')
+            elif piece == '\t':
+                element = OxmlElement('w:tab')
+            else:
+                element = OxmlElement('w:t')
+                element.set(XML_SPACE, 'preserve')
+                element.text = piece
+            current.addnext(element)
+            current = element
+
+    def _tail_run(self, run, text):
+        """Копия run с тем же форматированием, содержащая только текст"""
+        tail = copy.deepcopy(run)
+        for child in list(tail):
+            if child.tag != qn('w:rPr'):
+                tail.remove(child)
+        node = OxmlElement('w:t')
+        tail.append(node)
+        self._set_text(node, text)
+        return tail
@@ -0,0 +1,134 @@
+"""
+Выбор шаблона для строки и кэш скомпилированных шаблонов
+"""
+import itertools
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+
+class TemplateRouter:
+    """Шаблон строки по настройкам input.templates
+
+    column - колонка с именем шаблона (ключ files, имя файла в folder или
+    путь); rules - правила по значениям колонок, проверяются по порядку,
+    если колонка не задана или пуста. Без совпадений используется
+    input.word_template.
+    """
+
+    def __init__(self, config):
+        options = config['input'].get('templates', {})
+        self.default = Path(config['input']['word_template'])
+        self.column = options.get('column')
+        self.folder = Path(options['folder']) if options.get('folder') else None
+        self.files = options.get('files', {})
+        self.rules = [self._compile_rule(rule) for rule in options.get('rules', [])]
+        self.group_window = options.get('group_window', 10000)
+        self.enabled = bool(self.column or self.rules)
+        self.resolved = {}
+
+    @staticmethod
+    def _compile_rule(rule):
+        """Правило: column и одно из условий equals, in, matches (регулярное выражение)"""
+        if 'matches' in rule:
+            pattern = re.compile(rule['matches'])
+            test = lambda value: pattern.search(value) is not None
+        elif 'in' in rule:
+            allowed = {str(value) for value in rule['in']}
+            test = lambda value: value in allowed
+        elif 'equals' in rule:
+            expected = str(rule['equals'])
+            test = lambda value: value == expected
+        else:
+            raise ValueError(f"Правило выбора шаблона без условия: {rule}")
+        return rule['column'], test, rule['template']
+
+    def select(self, row_data):
+        """Путь к шаблону для строки"""
+        if not self.enabled:
+            return self.default
+
+        if self.column:
+            value = self._text(row_data.get(self.column))
+            if value:
+                return self.resolve(value)
+
+        for column, test, template in self.rules:
+            if test(self._text(row_data.get(column))):
+                return self.resolve(template)
+
+        return self.default
+
+    @staticmethod
+    def _text(value):
+        if value is None or (isinstance(value, float) and value != value):
+            return ''
+        return str(value).strip()
+
+    def resolve(self, name):
+        """Путь к шаблону по ключу files, имени файла или пути"""
+        path = self.resolved.get(name)
+        if path is None:
+            path = Path(self.files.get(name, name))
+            if not path.suffix:
+                path = path.with_suffix('.docx')
+            if self.folder and name not in self.files and not path.is_absolute():
+                path = self.folder / path
+            self.resolved[name] = path
+        return path
+
+
+class TemplateCache:
+    """LRU кэш скомпилированных шаблонов по пути, mtime и размеру файла
+
+    load(path) компилирует шаблон при промахе; измененный на диске
+    шаблон компилируется заново.
+    """
+
+    def __init__(self, load, max_items=8):
+        self.load = load
+        self.max_items = max_items
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template_path):
+        template_path = str(template_path)
+        try:
+            stat = os.stat(template_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Word шаблон не найден: {template_path}")
+        key = (template_path, stat.st_mtime_ns, stat.st_size)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = self.load(template_path)
+        self.entries[key] = entry
+        while len(self.entries) > self.max_items:
+            self.entries.popitem(last=False)
+        return entry
+
+
+def group_by_template(jobs, router, window):
+    """Задания, сгруппированные по шаблону в пределах окна из window строк
+
+    Порядок внутри группы сохраняется; память ограничена окном, поэтому
+    группировка работает и при потоковом чтении.
+    """
+    jobs = iter(jobs)
+    while True:
+        chunk = list(itertools.islice(jobs, window))
+        if not chunk:
+            return
+        keys = [str(router.select(job[3])) for job in chunk]
+        order = {}
+        for key in keys:
+            order.setdefault(key, len(order))
+        for _, job in sorted(zip(keys, chunk), key=lambda pair: order[pair[0]]):
+            yield job
@@ -0,0 +1,243 @@
+"""
+Режим отслеживания изменений (--watch)
+"""
+import os
+import time
+from pathlib import Path
+from src.core.image_index import IMAGE_EXTENSIONS
+from src.utils.logger import log_info, log_success, log_warning, log_error
+
+
+def _stat(path):
+    """(mtime, размер) файла или None, если файла нет"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Watcher:
+    """Перегенерация документов при изменении таблицы, шаблонов и изображений
+
+    Таблица, скомпилированный шаблон и индекс изображений остаются в
+    памяти. Измененная таблица сравнивается с прошлой по именам документов
+    (naming_column): создаются документы только новых и измененных строк.
+    Изменение изображения перегенерирует строки, которые на него ссылаются
+    (обратный индекс значение колонки -> документы), изменение шаблона -
+    все документы. Изменения ищутся опросом mtime и размера файлов.
+    """
+
+    def __init__(self, config, workers=1):
+        options = config['processing'].get('watch', {})
+        self.config = config
+        self.workers = workers
+        self.interval = options.get('interval_seconds', 1.0)
+        self.settle = options.get('settle_seconds', 0.5)
+        self.remove_deleted = options.get('remove_deleted', True)
+
+        self.excel_path = Path(config['input']['excel_file'])
+        self.image_folders = [
+            Path(config['input']['images_folder']) / subdirectory
+            for subdirectory in config['input']['images_subdirectories'].values()
+        ]
+        self.image_columns = [
+            config_data['column'] for config_data in config['placeholders'].values() if config_data['type'] == 'image'
+        ]
+
+        self.generator = None
+        self.pdf_converter = None
+        self.data = None
+        self.names = None
+        self.hashes = None
+        self.image_rows = {}
+        self.resolved = {}
+        self.snapshot = None
+
+    def run(self):
+        """Полный запуск, затем обработка изменений до Ctrl+C"""
+        from src.core.document_generator import DocumentGenerator
+
+        self.generator = DocumentGenerator(self.config)
+        if self.config['processing']['create_pdf']:
+            from src.core.pdf_converter import PDFConverter
+            self.pdf_converter = PDFConverter(self.config)
+
+        try:
+            self.snapshot = self._snapshot()
+            self._load_data()
+            self._render(self.data, "полный запуск")
+            log_info(f"👀 Отслеживание изменений (опрос каждые {self.interval:g} с, Ctrl+C - выход)")
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            log_info("Отслеживание изменений остановлено")
+        finally:
+            if self.pdf_converter:
+                self.pdf_converter.close()
+        return 0
+
+    def poll(self):
+        """Проверка файлов и перегенерация затронутых документов"""
+        current = self._snapshot()
+        if current == self.snapshot:
+            return
+
+        # Файлы могут еще записываться: ждем, пока они перестанут меняться
+        time.sleep(self.settle)
+        if self._snapshot() != current:
+            return
+
+        started = time.perf_counter()
+        previous, self.snapshot = self.snapshot, current
+        try:
+            rendered = self._apply_changes(previous, current)
+        except Exception as e:
+            self.snapshot = previous
+            log_error(f"Не удалось обработать изменения: {e}")
+            return
+
+        if rendered is not None:
+            log_success(f"Изменения обработаны за {time.perf_counter() - started:.1f} с, документов: {rendered}")
+
+    def _apply_changes(self, previous, current):
+        from src.core.document_generator import DocumentGenerator
+
+        if previous['templates'] != current['templates']:
+            log_info("📄 Шаблон изменился: перегенерация всех документов")
+            self.generator = DocumentGenerator(self.config)
+            if previous['excel'] != current['excel']:
+                self._load_data()
+            return self._render(self.data, "шаблон")
+
+        affected = set()
+        if previous['images'] != current['images']:
+            changed = {
+                path for path in previous['images'].keys() | current['images'].keys()
+                if previous['images'].get(path) != current['images'].get(path)
+            }
+            log_info(f"🖼️ Изменились изображения: {len(changed)}")
+            self.generator.refresh_images()
+            affected |= self._rows_for_images(changed)
+
+        if previous['excel'] != current['excel']:
+            log_info(f"📊 Таблица изменилась: {self.excel_path}")
+            affected |= self._load_data()
+
+        if not affected:
+            log_info("   Затронутых документов нет")
+            return 0
+        return self._render(self.data[self.names.isin(affected).to_numpy()], "изменения")
+
+    def _snapshot(self):
+        """Состояние отслеживаемых файлов"""
+        images = {}
+        for folder in self.image_folders:
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS and entry.is_file():
+                    stat = entry.stat()
+                    images[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+        return {
+            'excel': _stat(self.excel_path),
+            'templates': {str(path): _stat(path) for path in self._template_paths()},
+            'images': images
+        }
+
+    def _template_paths(self):
+        """Основной шаблон и шаблоны input.templates"""
+        options = self.config['input'].get('templates', {})
+        paths = [Path(self.config['input']['word_template'])]
+        paths += [Path(path) for path in options.get('files', {}).values()]
+        if options.get('folder'):
+            paths += sorted(Path(options['folder']).glob('*.docx'))
+        return paths
+
+    def _load_data(self):
+        """Загрузка таблицы; результат - имена новых и измененных документов"""
+        import pandas as pd
+        from src.core.excel_processor import ExcelProcessor
+        from src.core.planner import RunPlanner
+
+        excel_processor = ExcelProcessor(self.config)
+        excel_processor.load_file(str(self.excel_path))
+        excel_processor.validate_structure()
+        excel_processor.clean_data()
+        data = excel_processor.data
+
+        names = RunPlanner(self.config, None).filenames(data)
+        hashes = pd.Series(pd.util.hash_pandas_object(data, index=False).to_numpy(), index=names.to_numpy())
+
+        if self.hashes is None or names.duplicated().any() or self.hashes.index.duplicated().any():
+            if self.hashes is not None:
+                log_info("   Повторяющиеся имена документов: перегенерация всех строк")
+            changed = set(names)
+        else:
+            previous = self.hashes.reindex(hashes.index)
+            changed = set(hashes.index[(previous != hashes).to_numpy()])
+            self._remove_deleted(set(self.hashes.index) - set(hashes.index))
+            log_info(f"   Новых и измененных строк: {len(changed)}")
+
+        self.data, self.names, self.hashes = data, names, hashes
+        self._index_images()
+        return changed
+
+    def _remove_deleted(self, deleted):
+        """Документы строк, удаленных из таблицы"""
+        if not deleted:
+            return
+        if not self.remove_deleted:
+            log_info(f"   Строк удалено из таблицы: {len(deleted)} (документы оставлены)")
+            return
+
+        for name in deleted:
+            for path in (Path(self.config['output']['word_folder']) / f"{name}.docx",
+                         Path(self.config['output']['pdf_folder']) / f"{name}.pdf"):
+                path.unlink(missing_ok=True)
+        log_info(f"   🗑️ Удалены документы строк, которых больше нет: {len(deleted)}")
+
+    def _index_images(self):
+        """Обратный индекс: значение колонки изображения -> имена документов"""
+        self.image_rows = {}
+        for column in self.image_columns:
+            values = self.data[column].astype(str).str.strip().to_numpy()
+            for value, group in self.names.groupby(values):
+                if value:
+                    self.image_rows.setdefault(value, set()).update(group)
+
+        image_index = self.generator.word_processor.image_index
+        self.resolved = {value: image_index.find(value) for value in self.image_rows}
+
+    def _rows_for_images(self, changed_paths):
+        """Документы, изображения которых изменились, появились или пропали"""
+        image_index = self.generator.word_processor.image_index
+        affected = set()
+        for value, names in self.image_rows.items():
+            path = image_index.find(value)
+            if path != self.resolved[value] or (path is not None and str(path) in changed_paths):
+                affected |= names
+                self.resolved[value] = path
+        return affected
+
+    def _render(self, data, reason):
+        """Генерация документов для строк data"""
+        from src.core.excel_processor import ExcelProcessor
+
+        if data.empty:
+            log_warning(f"Нет строк для генерации ({reason})")
+            return 0
+
+        log_info(f"🔄 Генерация ({reason}): строк {len(data)}")
+        excel_processor = ExcelProcessor(self.config)
+        excel_processor.data = data
+        stats = self.generator.run(
+            excel_processor.iter_records(), workers=self.workers, total=len(data), pdf_converter=self.pdf_converter
+        )
+        if stats.errors:
+            log_warning(f"Ошибок: {stats.errors}")
+        return stats.documents_created
@@ -1,11 +1,24 @@
 """
 Обработчик Word документов
 """
-import re
+import itertools
 from pathlib import Path
-from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.oxml.shape import CT_Inline
+from docx.parts.image import ImagePart
 from docx.shared import Inches
+from docx.text.run import Run
+from src.core.compiled_template import CompiledTemplate
+from src.core.image_cache import ImageCache
+from src.core.image_index import ImageIndex
+from src.core.image_preprocessor import ImagePreprocessor
+from src.core.raw_renderer import RawXmlRenderer
+from src.core.row_binding import MISSING, RowBinding
+from src.core.substitution import SubstitutionEngine
+from src.core.template_router import TemplateCache, TemplateRouter
 from src.utils.logger import log_info, log_success, log_warning, log_error
+from src.utils.metrics import StageTimer, timed
 
 
 class WordProcessor:
@@ -15,159 +28,229 @@ class WordProcessor:
         self.config = config
         self.template_path = None
         self.template_doc = None
+        self.compiled_template = None
+        self.substitution = None
+        self.binding = RowBinding(config['placeholders'])
+        self.raw_renderer = None
+        self.router = None
+        self.templates = None
+        self.image_index = None
+        self.image_preprocessor = ImagePreprocessor(config)
+        image_cache = config['processing'].get('image_cache', {})
+        self.image_cache = ImageCache(
+            max_items=image_cache.get('max_items', 128),
+            max_bytes=image_cache.get('max_mb', 256) * 1024 * 1024
+        )
         self.placeholders_found = {}
+        # Колонки, об отсутствии которых уже выведено предупреждение
+        self.missing_columns = set()
 
     def load_template(self, template_path: str):
-        """Загрузка Word шаблона"""
+        """Загрузка и компиляция Word шаблона
+
+        Шаблон по умолчанию; шаблоны строк по input.templates компилируются
+        при первом использовании и хранятся в LRU кэше.
+        """
         self.template_path = Path(template_path)
 
         if not self.template_path.exists():
             raise FileNotFoundError(f"Word шаблон не найден: {template_path}")
 
         try:
-            self.template_doc = Document(self.template_path)
+            self.substitution = SubstitutionEngine(self.config['placeholders'])
+            self.compiled_template, self.raw_renderer = self._compile_template(self.template_path)
+            self.template_doc = self.compiled_template.document
             self._scan_placeholders()
+            self.router = TemplateRouter(self.config)
+            self.templates = TemplateCache(
+                self._compile_template, self.config['input'].get('templates', {}).get('cache_size', 8)
+            )
+            self.image_index = ImageIndex(self.config).load()
             log_success(f"Word шаблон загружен: {len(self.placeholders_found)} плейсхолдеров")
+            if self.router.enabled:
+                log_info("   🗂️ Шаблон выбирается для каждой строки (input.templates)")
+            log_info(f"   🖼️ Индекс изображений: {len(self.image_index)} файлов")
             return self.template_doc
         except Exception as e:
             raise RuntimeError(f"Ошибка загрузки Word шаблона: {e}")
 
+    def _compile_template(self, template_path):
+        """Компиляция шаблона: разобранный документ и быстрый рендерер, если он применим"""
+        with timed('template_compile'):
+            compiled_template = CompiledTemplate(template_path, self.config['placeholders'])
+            raw_renderer = self._raw_renderer(compiled_template)
+        if self.compiled_template is not None:
+            log_info(f"   📄 Шаблон загружен: {Path(template_path).name}, "
+                     f"{len(compiled_template.placeholder_counts())} плейсхолдеров")
+        return compiled_template, raw_renderer
+
     def _scan_placeholders(self):
         """Сканирование плейсхолдеров в шаблоне"""
-        self.placeholders_found = {}
-        placeholder_pattern = r'\{[^}]+\}'
-
-        for paragraph in self.template_doc.paragraphs:
-            placeholders = re.findall(placeholder_pattern, paragraph.text)
-            for placeholder in placeholders:
-                if placeholder in self.config['placeholders']:
-                    self.placeholders_found[placeholder] = self.placeholders_found.get(placeholder, 0) + 1
-
-        for table in self.template_doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    placeholders = re.findall(placeholder_pattern, cell.text)
-                    for placeholder in placeholders:
-                        if placeholder in self.config['placeholders']:
-                            self.placeholders_found[placeholder] = self.placeholders_found.get(placeholder, 0) + 1
-
-    def create_document_from_template(self, row_data, output_path: str):
-        """Создание документа из шаблона с заменой плейсхолдеров"""
+        self.placeholders_found = self.compiled_template.placeholder_counts()
+
+    def _raw_renderer(self, compiled_template):
+        """Рендерер по processing.render_mode: RawXmlRenderer или None для python-docx"""
+        render_mode = self.config['processing'].get('render_mode', 'docx')
+
+        if render_mode == 'docx':
+            return None
+        if render_mode != 'raw_xml':
+            raise ValueError(f"Неизвестный режим рендеринга: {render_mode}")
+
+        placeholder_types = {config_data['type'] for config_data in self.config['placeholders'].values()}
+        if placeholder_types != {'text'}:
+            if self.compiled_template is None:
+                log_warning("Режим raw_xml поддерживает только текстовые плейсхолдеры, используется python-docx")
+            return None
+
+        if self.compiled_template is None:
+            log_info("   ⚡ Включен быстрый режим рендеринга raw_xml")
+        return RawXmlRenderer(compiled_template, self.substitution, self.config['placeholders'])
+
+    def template_for(self, row_data):
+        """Путь к шаблону строки"""
+        return self.router.select(row_data)
+
+    def _template(self, row_data):
+        """Скомпилированный шаблон и рендерер для строки"""
+        template_path = self.router.select(row_data)
+        if template_path == self.template_path:
+            return self.compiled_template, self.raw_renderer
+        return self.templates.get(template_path)
+
+    def compiled_template_for(self, template_path):
+        """Скомпилированный шаблон по пути (через кэш)"""
+        if Path(template_path) == self.template_path:
+            return self.compiled_template
+        return self.templates.get(template_path)[0]
+
+    def create_document_from_template(self, row_data, output_path):
+        """Создание документа из шаблона с заменой плейсхолдеров
+
+        output_path - путь к файлу или поток для записи (BytesIO и т.п.).
+        """
         if self.template_doc is None:
             raise ValueError("Шаблон не загружен")
 
-        doc = Document(self.template_path)
-
-        text_replacements = 0
-        image_insertions = 0
-        images_requested = 0
-
-        for placeholder, config_data in self.config['placeholders'].items():
-            column_name = config_data['column']
-            placeholder_type = config_data['type']
+        timer = StageTimer()
+        with timer.stage('template'):
+            compiled_template, raw_renderer = self._template(row_data)
+        with timer.stage('values'):
+            values, images, images_requested = self._collect_row_values(row_data)
+        cache_hits, cache_misses = self.image_cache.hits, self.image_cache.misses
 
-            if column_name not in row_data:
-                log_warning(f"Колонка '{column_name}' не найдена в данных")
-                continue
-
-            value = row_data[column_name]
-
-            if placeholder_type == 'text':
-                replacements = self._replace_text_placeholder(doc, placeholder, str(value))
-                text_replacements += replacements
-            elif placeholder_type == 'image':
-                images_requested += 1
-                insertions = self._replace_image_placeholder(doc, placeholder, value)
-                image_insertions += insertions
+        if raw_renderer is not None:
+            with timer.stage('raw_render'):
+                text_replacements = raw_renderer.render(values, output_path)
+            image_insertions = 0
+        else:
+            text_replacements, image_insertions = self._render_docx(compiled_template, values, images, output_path, timer)
 
-        # NOTE: В полной версии здесь будет обработка колонтитулов
-        # self._process_headers_and_footers(doc, row_data)
-
-        doc.save(output_path)
-        log_success(f"Документ создан: {text_replacements} замен текста, {image_insertions} изображений")
+        log_success(f"Документ создан: {text_replacements} замен текста, {image_insertions} изображений", detail=True)
 
         return {
             'text_replacements': text_replacements,
             'image_insertions': image_insertions,
-            'images_requested': images_requested
+            'images_requested': images_requested,
+            'image_cache_hits': self.image_cache.hits - cache_hits,
+            'image_cache_misses': self.image_cache.misses - cache_misses,
+            'timings': timer.as_dict()
         }
 
-    def _replace_text_placeholder(self, doc, placeholder, value):
-        """Замена текстового плейсхолдера"""
-        replacements = 0
-
-        for paragraph in doc.paragraphs:
-            if placeholder in paragraph.text:
-                paragraph.text = paragraph.text.replace(placeholder, value)
-                replacements += paragraph.text.count(value)
+    def _render_docx(self, compiled_template, values, images, output_path, timer):
+        """Рендеринг копии шаблона через python-docx"""
+        with timer.stage('clone'):
+            doc, paragraphs = compiled_template.clone()
+        package = doc.part.package
+        image_parts = {
+            compiled_template.image_sha1s[part.partname]: part
+            for part in package.image_parts
+        }
 
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if placeholder in cell.text:
-                        cell.text = cell.text.replace(placeholder, value)
-                        replacements += cell.text.count(value)
+        text_replacements = 0
+        image_insertions = 0
 
-        return replacements
+        for paragraph in paragraphs.values():
+            with timer.stage('substitute'):
+                replacements, anchors = self.substitution.substitute(paragraph._p, values, images)
+            text_replacements += replacements
+            for placeholder, anchor in anchors:
+                image_path, image_name = images[placeholder]
+                with timer.stage('images'):
+                    image_insertions += self._insert_image(Run(anchor, paragraph), image_path, image_name, image_parts)
+
+        with timer.stage('save'):
+            doc.save(output_path)
+        return text_replacements, image_insertions
+
+    def _collect_row_values(self, row_data):
+        """Значения плейсхолдеров строки: текст и найденные изображения"""
+        values, missing = self.binding.text_values(row_data)
+        images = {}
+        images_requested = 0
 
-    def _replace_image_placeholder(self, doc, placeholder, image_name):
-        """Замена плейсхолдера изображением"""
-        if not image_name or str(image_name).strip() == '':
-            return 0
+        for placeholder, column_name, value in self.binding.image_values(row_data):
+            if value is MISSING:
+                missing.append(column_name)
+                continue
 
-        image_path = self._find_image_file(image_name)
-        if not image_path:
-            log_warning(f"Изображение не найдено: {image_name}")
-            return 0
+            images_requested += 1
+            if not value or str(value).strip() == '':
+                continue
 
-        insertions = 0
-
-        for paragraph in doc.paragraphs:
-            if placeholder in paragraph.text:
-                paragraph.text = paragraph.text.replace(placeholder, '')
-                try:
-                    paragraph.add_run().add_picture(
-                        str(image_path),
-                        height=Inches(self.config['processing']['image_height_inches'])
-                    )
-                    insertions += 1
-                except Exception as e:
-                    log_error(f"Ошибка вставки изображения {image_name}: {e}")
-
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        if placeholder in paragraph.text:
-                            paragraph.text = paragraph.text.replace(placeholder, '')
-                            try:
-                                paragraph.add_run().add_picture(
-                                    str(image_path),
-                                    height=Inches(self.config['processing']['image_height_inches'])
-                                )
-                                insertions += 1
-                            except Exception as e:
-                                log_error(f"Ошибка вставки изображения {image_name}: {e}")
-
-        return insertions
+            image_path = self._find_image_file(value)
+            if image_path:
+                images[placeholder] = (image_path, value)
+            else:
+                log_warning(f"Изображение не найдено: {value}", detail=True)
 
-    def _find_image_file(self, image_name):
-        """Поиск файла изображения"""
-        image_name = str(image_name).strip()
+        for column_name in missing:
+            if column_name not in self.missing_columns:
+                self.missing_columns.add(column_name)
+                log_warning(f"Колонка '{column_name}' не найдена в данных")
 
-        base_path = Path(self.config['input']['images_folder'])
+        return values, images, images_requested
 
-        for subdirectory in self.config['input']['images_subdirectories'].values():
-            subdir_path = base_path / subdirectory
-            if not subdir_path.exists():
+    def referenced_images(self, row_data):
+        """Изображения строки: пары (имя, путь или None, если файл не найден)"""
+        referenced = []
+        for _, _, value in self.binding.image_values(row_data):
+            if value is MISSING or value is None or str(value).strip() == '':
                 continue
+            referenced.append((str(value), self._find_image_file(value)))
+        return referenced
 
-            for extension in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-                image_path = subdir_path / f"{image_name}{extension}"
-                if image_path.exists():
-                    return image_path
+    def _insert_image(self, run, image_path, image_name, image_parts):
+        """Вставка изображения в подготовленный run
 
-        return None
+        Изображение берется из кэша; одинаковые изображения в документе
+        хранятся одной частью (image_parts: SHA1 -> часть документа).
+        """
+        try:
+            image = self.image_cache.get(self.image_preprocessor.prepare(image_path))
+            story_part = run.part
+
+            image_part = image_parts.get(image.sha1)
+            if image_part is None:
+                package = story_part.package
+                used_numbers = {part.partname.idx for part in package.image_parts}
+                number = next(n for n in itertools.count(1) if n not in used_numbers)
+                image_part = ImagePart.from_image(image, PackURI(f"/word/media/image{number}.{image.ext}"))
+                package.image_parts.append(image_part)
+                image_parts[image.sha1] = image_part
+
+            rId = story_part.relate_to(image_part, RT.IMAGE)
+            height = Inches(self.config['processing']['image_height_inches'])
+            width, height = image.scaled_dimensions(None, height)
+            run._r.add_drawing(CT_Inline.new_pic_inline(story_part.next_id, rId, image.filename, width, height))
+            return 1
+        except Exception as e:
+            log_error(f"Ошибка вставки изображения {image_name}: {e}")
+            return 0
+
+    def _find_image_file(self, image_name):
+        """Поиск файла изображения"""
+        return self.image_index.find(image_name)
 
     def update_statistics(self, stats, text_replacements, image_insertions, images_requested):
         """Обновление статистики операций"""
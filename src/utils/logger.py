@@ -1,8 +1,31 @@
 """
 Система цветного логирования с эмодзи
+
+Сообщения передаются в фоновый поток через очередь (QueueHandler /
+QueueListener), вывод не задерживает генерацию. Процессы пула пишут в
+общую очередь multiprocessing, вывод идет только из главного процесса.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
 import sys
+import time
+from contextlib import contextmanager
+
+
+LOGGER_NAME = 'auto_doc_generator'
+LOG_FORMATS = ('human', 'json', 'progress')
+
+# Текущие настройки вывода
+_options = {'format': 'human', 'verbose': True, 'progress_interval_seconds': 0.5}
+_listeners = []
+_listeners_pid = None
+_handler = None
+_progress = {'last': 0.0, 'started': None}
 
 
 class ColoredFormatter(logging.Formatter):
@@ -28,35 +51,178 @@ class ColoredFormatter(logging.Formatter):
         return record.msg_colored
 
 
-def setup_logger():
-    """Настройка глобального логгера"""
-    logger = logging.getLogger('auto_doc_generator')
+class JsonFormatter(logging.Formatter):
+    """Одна JSON запись на строку"""
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            'level': record.levelname,
+            'process': record.process,
+            'message': record.getMessage()
+        }
+        progress = getattr(record, 'progress', None)
+        if progress is not None:
+            entry['event'] = 'progress'
+            entry.update(progress)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ProgressHandler(logging.StreamHandler):
+    """Сообщения и строка прогресса, которая перерисовывается на месте"""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.setFormatter(ColoredFormatter())
+        self.bar = ''
+        self.interactive = stream.isatty()
+
+    def emit(self, record):
+        try:
+            progress = getattr(record, 'progress', None)
+            if progress is not None:
+                self.bar = format_progress(progress)
+                if self.interactive:
+                    self.stream.write(f"\r\033[K{self.bar}")
+                    if progress['final']:
+                        self.stream.write('\n')
+                        self.bar = ''
+                elif progress['final']:
+                    self.stream.write(f"{self.bar}\n")
+            else:
+                message = self.format(record)
+                if self.interactive and self.bar:
+                    self.stream.write(f"\r\033[K{message}\n{self.bar}")
+                else:
+                    self.stream.write(f"{message}\n")
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+def format_progress(progress):
+    """Строка прогресса: доля, скорость и оставшееся время"""
+    done, total, rate = progress['done'], progress['total'], progress['rate']
+    line = f"{done} док., {rate:.1f} док./с"
+    if total:
+        share = min(1.0, done / total)
+        filled = int(share * 30)
+        line = f"[{'#' * filled}{'.' * (30 - filled)}] {share * 100:3.0f}% {done}/{total}, {rate:.1f} док./с"
+        if rate > 0 and done < total:
+            remaining = int((total - done) / rate)
+            line += f", осталось {remaining // 3600}:{remaining // 60 % 60:02d}:{remaining % 60:02d}"
+    if progress['errors']:
+        line += f", ошибок {progress['errors']}"
+    return line
+
+
+def _create_handler(log_format):
+    if log_format == 'progress':
+        return ProgressHandler(sys.stdout)
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else ColoredFormatter())
+    return handler
+
+
+def setup_logger(options=None, log_queue=None):
+    """Настройка глобального логгера
+
+    options - словарь настроек (format: human/json/progress, verbose,
+    progress_interval_seconds). log_queue - очередь главного процесса,
+    передается процессам пула: записи уходят в нее, вывод не создается.
+    """
+    global _handler
+
+    _options.update({key: value for key, value in (options or {}).items() if value is not None})
+    if _options['format'] not in LOG_FORMATS:
+        raise ValueError(f"Неизвестный формат логов: {_options['format']}")
+    if _options['format'] == 'progress':
+        _options['verbose'] = False
+
+    logger = logging.getLogger(LOGGER_NAME)
     logger.setLevel(logging.DEBUG)
+    logger.propagate = False
 
+    shutdown_logger()
     logger.handlers.clear()
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
-    console_handler.setFormatter(ColoredFormatter())
+    if log_queue is not None:
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        return logger
 
-    logger.addHandler(console_handler)
+    _handler = _create_handler(_options['format'])
+    local_queue = queue.SimpleQueue()
+    _start_listener(local_queue)
+    logger.addHandler(logging.handlers.QueueHandler(local_queue))
 
     return logger
 
 
+def _start_listener(log_queue):
+    global _listeners_pid
+    _listeners_pid = os.getpid()
+    listener = logging.handlers.QueueListener(log_queue, _handler)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+@contextmanager
+def worker_logging():
+    """Очередь для записей процессов пула на время их работы"""
+    log_queue = multiprocessing.Queue()
+    listener = _start_listener(log_queue) if _handler is not None else None
+    try:
+        yield log_queue
+    finally:
+        if listener is not None and listener in _listeners:
+            _listeners.remove(listener)
+            listener.stop()
+        log_queue.close()
+
+
+def logger_options():
+    """Текущие настройки вывода (передаются процессам пула)"""
+    return dict(_options)
+
+
+def shutdown_logger():
+    """Вывод оставшихся в очереди сообщений и остановка фоновых потоков
+
+    В процессе пула, созданном через fork, унаследованные обработчики
+    очередей только забываются: их потоки работают в главном процессе.
+    """
+    if _listeners_pid == os.getpid():
+        for listener in _listeners:
+            listener.stop()
+    _listeners.clear()
+
+
+atexit.register(shutdown_logger)
+
+
 def get_logger():
     """Получить настроенный логгер"""
-    return logging.getLogger('auto_doc_generator')
+    return logging.getLogger(LOGGER_NAME)
+
 
+def log_info(message: str, detail=False):
+    """Информационное сообщение
 
-def log_info(message: str):
-    """Информационное сообщение"""
+    detail=True - подробности по отдельным строкам данных, выводятся
+    только в подробном режиме.
+    """
+    if detail and not _options['verbose']:
+        return
     logger = get_logger()
     logger.info(message)
 
 
-def log_success(message: str):
+def log_success(message: str, detail=False):
     """Сообщение об успехе"""
+    if detail and not _options['verbose']:
+        return
     logger = get_logger()
     logger.info(f"✅ {message}")
 
@@ -67,8 +233,10 @@ def log_error(message: str):
     logger.error(f"❌ {message}")
 
 
-def log_warning(message: str):
-    """Предупреждение"""
+def log_warning(message: str, detail=False):
+    """Предупреждение; detail=True - по отдельной строке данных, как в log_info"""
+    if detail and not _options['verbose']:
+        return
     logger = get_logger()
     logger.warning(f"⚠️ {message}")
 
@@ -83,3 +251,31 @@ def log_separator():
     """Разделитель в логах"""
     logger = get_logger()
     logger.info("-" * 50)
+
+
+def log_progress(done: int, total=None, errors=0, final=False):
+    """Прогресс генерации в режимах progress и json
+
+    Вызывается на каждый документ; записи создаются не чаще
+    progress_interval_seconds.
+    """
+    if _options['format'] == 'human':
+        return
+
+    now = time.perf_counter()
+    if _progress['started'] is None or done == 0:
+        _progress['started'] = now
+        _progress['last'] = 0.0
+    if not final and now - _progress['last'] < _options['progress_interval_seconds']:
+        return
+    _progress['last'] = now
+
+    elapsed = now - _progress['started']
+    progress = {
+        'done': done,
+        'total': total,
+        'errors': errors,
+        'rate': done / elapsed if elapsed > 0 else 0.0,
+        'final': final
+    }
+    get_logger().info(format_progress(progress), extra={'progress': progress})
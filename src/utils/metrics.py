@@ -0,0 +1,338 @@
+"""
+Замеры времени этапов и экспорт метрик
+"""
+import cProfile
+import heapq
+import json
+import os
+import sys
+import time
+import uuid
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+
+
+QUANTILES = [0.5, 0.95, 0.99]
+
+# Разовые этапы текущего процесса (загрузка данных, компиляция шаблона)
+_run_stages = {}
+
+# Профилировщик строк текущего процесса (processing.profile)
+_row_profiler = None
+
+
+@contextmanager
+def timed(stage):
+    """Замер разового этапа процесса: wall и CPU время"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        totals = _run_stages.setdefault(stage, [0.0, 0.0])
+        totals[0] += time.perf_counter() - wall
+        totals[1] += time.process_time() - cpu
+
+
+def reset_run_stages():
+    """Сброс разовых этапов перед новым запуском в том же процессе"""
+    _run_stages.clear()
+
+
+class StageTimer:
+    """Время этапов создания одного документа: wall и CPU потока"""
+
+    def __init__(self):
+        self.wall = {}
+        self.cpu = {}
+
+    @contextmanager
+    def stage(self, name):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.wall[name] = self.wall.get(name, 0.0) + time.perf_counter() - wall
+            self.cpu[name] = self.cpu.get(name, 0.0) + time.thread_time() - cpu
+
+    def as_dict(self):
+        return {'wall': self.wall, 'cpu': self.cpu}
+
+
+class RowProfiler:
+    """Профилирование строк через cProfile
+
+    Сохраняются профили не больше slowest самых медленных строк процесса,
+    профили более быстрых строк удаляются.
+    """
+
+    def __init__(self, slowest, folder):
+        self.slowest = slowest
+        self.folder = Path(folder)
+        self.kept = []
+
+    @contextmanager
+    def profile(self, result):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Уже работает другой профилировщик (например, запуск под cProfile)
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._keep(profile, result, time.perf_counter() - started)
+
+    def _keep(self, profile, result, seconds):
+        if len(self.kept) >= self.slowest and seconds <= self.kept[0][0]:
+            return
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        path = self.folder / f"row_{result['row_index'] + 1:05d}.prof"
+        profile.dump_stats(path)
+        heapq.heappush(self.kept, (seconds, str(path)))
+        if len(self.kept) > self.slowest:
+            _remove_file(heapq.heappop(self.kept)[1])
+
+        result['profile'] = str(path)
+        result['profile_seconds'] = seconds
+
+
+def start_profiling(config):
+    """Подготовка профилирования запуска: старые профили удаляются"""
+    global _row_profiler
+    _row_profiler = None
+
+    options = config['processing'].get('profile', {})
+    if options.get('slowest_rows'):
+        for path in Path(options.get('folder', 'output/profiles')).glob('*.prof'):
+            _remove_file(path)
+
+
+@contextmanager
+def profile_row(config, result):
+    """Профилирование обработки строки, если включено processing.profile"""
+    global _row_profiler
+    options = config['processing'].get('profile', {})
+    if not options.get('slowest_rows'):
+        yield
+        return
+
+    if _row_profiler is None:
+        _row_profiler = RowProfiler(options['slowest_rows'], options.get('folder', 'output/profiles'))
+    with _row_profiler.profile(result):
+        yield
+
+
+def peak_rss():
+    """Пиковый RSS текущего процесса в байтах или None
+
+    На Linux используется VmHWM: ru_maxrss наследуется через exec.
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def peak_rss_children():
+    """Наибольший пиковый RSS завершенных дочерних процессов в байтах или None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def quantile(values, q):
+    """Квантиль по методу ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(q * len(ordered) + 0.999999)))
+    return ordered[rank - 1]
+
+
+class RunMetrics:
+    """Метрики запуска: этапы документов, задержки, пиковая память
+
+    Времена этапов документов приходят в результатах строк (поле timings),
+    поэтому учитываются и документы, созданные в процессах пула.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.latencies = array('d')
+        self.stage_wall = {}
+        self.stage_cpu = {}
+        self.wall_seconds = 0.0
+        self.profiles = []
+
+    def add_result(self, result):
+        """Учет времени обработки строки"""
+        if not result['success']:
+            return
+
+        self.documents += 1
+        self.latencies.append(result.get('render_seconds', 0.0) + result.get('pdf_seconds', 0.0))
+
+        timings = result.get('timings') or {}
+        for name, seconds in timings.get('wall', {}).items():
+            self.stage_wall.setdefault(name, array('d')).append(seconds)
+        for name, seconds in timings.get('cpu', {}).items():
+            self.stage_cpu[name] = self.stage_cpu.get(name, 0.0) + seconds
+        if result.get('pdf_seconds'):
+            self.stage_wall.setdefault('pdf', array('d')).append(result['pdf_seconds'])
+        if result.get('profile'):
+            self.profiles.append((result['profile_seconds'], result['row_index'], result['profile']))
+
+    def finish(self, wall_seconds, profile_slowest=0):
+        """Завершение запуска: из профилей процессов остаются самые медленные"""
+        self.wall_seconds = wall_seconds
+        self.profiles.sort(reverse=True)
+        for _, _, path in self.profiles[profile_slowest:]:
+            _remove_file(path)
+        del self.profiles[profile_slowest:]
+
+    def as_dict(self):
+        """Метрики в виде словаря для JSON"""
+        document_stages = {}
+        for name, values in self.stage_wall.items():
+            values = list(values)
+            document_stages[name] = {
+                'count': len(values),
+                'wall_seconds': sum(values),
+                'cpu_seconds': self.stage_cpu.get(name),
+                **{f"p{round(q * 100)}": quantile(values, q) for q in QUANTILES}
+            }
+
+        latencies = list(self.latencies)
+        return {
+            'documents': self.documents,
+            'wall_seconds': self.wall_seconds,
+            'documents_per_second': self.documents / self.wall_seconds if self.wall_seconds else 0.0,
+            'document_latency_seconds': {f"p{round(q * 100)}": quantile(latencies, q) for q in QUANTILES},
+            'run_stages': {
+                name: {'wall_seconds': wall, 'cpu_seconds': cpu} for name, (wall, cpu) in _run_stages.items()
+            },
+            'document_stages': document_stages,
+            'peak_rss_bytes': peak_rss(),
+            'peak_rss_children_bytes': peak_rss_children(),
+            'profiles': [
+                {'row': row_index + 1, 'seconds': seconds, 'path': path}
+                for seconds, row_index, path in self.profiles
+            ]
+        }
+
+    def summary_lines(self):
+        """Строки для итоговой сводки"""
+        if not self.documents:
+            return []
+        data = self.as_dict()
+        latency = data['document_latency_seconds']
+        lines = [
+            f"⚡ Документов в секунду: {data['documents_per_second']:.1f}",
+            f"   Время документа: p50 {latency['p50'] * 1000:.0f} мс, "
+            f"p95 {latency['p95'] * 1000:.0f} мс, p99 {latency['p99'] * 1000:.0f} мс"
+        ]
+        if data['peak_rss_bytes']:
+            lines.append(f"   Пиковая память: {data['peak_rss_bytes'] / 1024 / 1024:.0f} МБ")
+        for profile in data['profiles']:
+            lines.append(f"🔬 Профиль строки {profile['row']}: {profile['seconds'] * 1000:.0f} мс, {profile['path']}")
+        return lines
+
+    def export_json(self, path):
+        _write_atomic(path, json.dumps(self.as_dict(), ensure_ascii=False, indent=2))
+
+    def export_prometheus(self, path):
+        """Метрики в текстовом формате Prometheus (для textfile collector)"""
+        data = self.as_dict()
+        lines = [
+            '# HELP docgen_documents_total Documents created in the last run.',
+            '# TYPE docgen_documents_total gauge',
+            f"docgen_documents_total {data['documents']}",
+            '# HELP docgen_run_wall_seconds Wall time of the generation stage.',
+            '# TYPE docgen_run_wall_seconds gauge',
+            f"docgen_run_wall_seconds {data['wall_seconds']:.6f}",
+            '# HELP docgen_documents_per_second Generation throughput.',
+            '# TYPE docgen_documents_per_second gauge',
+            f"docgen_documents_per_second {data['documents_per_second']:.6f}",
+            '# HELP docgen_document_latency_seconds Per-document latency.',
+            '# TYPE docgen_document_latency_seconds summary',
+        ]
+        for name, value in data['document_latency_seconds'].items():
+            lines.append(f'docgen_document_latency_seconds{{quantile="{int(name[1:]) / 100}"}} {value:.6f}')
+        lines.append(f"docgen_document_latency_seconds_sum {sum(self.latencies):.6f}")
+        lines.append(f"docgen_document_latency_seconds_count {len(self.latencies)}")
+
+        lines += [
+            '# HELP docgen_stage_wall_seconds Wall time per stage.',
+            '# TYPE docgen_stage_wall_seconds gauge',
+        ]
+        for name, stage in data['run_stages'].items():
+            lines.append(f'docgen_stage_wall_seconds{{stage="{name}"}} {stage["wall_seconds"]:.6f}')
+        for name, stage in data['document_stages'].items():
+            lines.append(f'docgen_stage_wall_seconds{{stage="{name}"}} {stage["wall_seconds"]:.6f}')
+
+        lines += [
+            '# HELP docgen_stage_cpu_seconds CPU time per stage.',
+            '# TYPE docgen_stage_cpu_seconds gauge',
+        ]
+        for name, stage in data['run_stages'].items():
+            lines.append(f'docgen_stage_cpu_seconds{{stage="{name}"}} {stage["cpu_seconds"]:.6f}')
+        for name, stage in data['document_stages'].items():
+            if stage['cpu_seconds'] is not None:
+                lines.append(f'docgen_stage_cpu_seconds{{stage="{name}"}} {stage["cpu_seconds"]:.6f}')
+
+        lines += [
+            '# HELP docgen_stage_latency_seconds Per-document stage latency.',
+            '# TYPE docgen_stage_latency_seconds gauge',
+        ]
+        for name, stage in data['document_stages'].items():
+            for q in QUANTILES:
+                key = f"p{round(q * 100)}"
+                lines.append(f'docgen_stage_latency_seconds{{stage="{name}",quantile="{q}"}} {stage[key]:.6f}')
+
+        lines += [
+            '# HELP docgen_peak_rss_bytes Peak resident memory.',
+            '# TYPE docgen_peak_rss_bytes gauge',
+        ]
+        if data['peak_rss_bytes'] is not None:
+            lines.append(f'docgen_peak_rss_bytes{{process="main"}} {data["peak_rss_bytes"]}')
+        if data['peak_rss_children_bytes'] is not None:
+            lines.append(f'docgen_peak_rss_bytes{{process="children"}} {data["peak_rss_children_bytes"]}')
+
+        _write_atomic(path, '\n'.join(lines) + '\n')
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _write_atomic(path, text):
+    """Запись через временный файл: читатели не видят частично записанный файл"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temporary, path)
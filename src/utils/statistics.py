@@ -1,6 +1,7 @@
 """
 Система сбора статистики
 """
+from src.utils.metrics import RunMetrics
 
 
 class Statistics:
@@ -16,7 +17,17 @@ class Statistics:
         self.images_found = 0
         self.images_not_found = 0
         self.documents_created = 0
+        self.pdfs_created = 0
         self.errors = 0
+        self.image_cache_hits = 0
+        self.image_cache_misses = 0
+        self.incremental = False
+        self.pipeline = None
+        self.documents_skipped = 0
+        self.documents_regenerated = 0
+        self.documents_removed = 0
+        self.documents_deduplicated = 0
+        self.metrics = RunMetrics()
 
     def add_text_replacements(self, count: int):
         """Добавить количество замен текста"""
@@ -42,15 +53,59 @@ class Statistics:
         """Увеличить счетчик ошибок"""
         self.errors += 1
 
+    def add_image_cache_usage(self, hits: int, misses: int):
+        """Добавить обращения к кэшу изображений"""
+        self.image_cache_hits += hits
+        self.image_cache_misses += misses
+
+    def add_incremental_counts(self, skipped: int, regenerated: int, removed: int):
+        """Добавить итоги инкрементального запуска"""
+        self.incremental = True
+        self.documents_skipped += skipped
+        self.documents_regenerated += regenerated
+        self.documents_removed += removed
+
+    def set_pipeline_summary(self, pipeline):
+        """Сохранить статистику этапов конвейера"""
+        self.pipeline = pipeline
+
+    def add_document_result(self, result):
+        """Учесть результат обработки одной строки"""
+        self.metrics.add_result(result)
+        if result.get('deduplicated'):
+            self.documents_deduplicated += 1
+        self.add_image_cache_usage(result.get('image_cache_hits', 0), result.get('image_cache_misses', 0))
+
+        if not result['success']:
+            self.add_error()
+            return
+
+        self.add_text_replacements(result['text_replacements'])
+        self.add_image_insertions(result['image_insertions'])
+        self.add_document_created()
+        if result.get('pdf_created'):
+            self.pdfs_created += 1
+
+        images_found = result['image_insertions']
+        self.images_found += images_found
+        self.images_not_found += result['images_requested'] - images_found
+
     def get_summary(self):
         """Получить сводку статистики"""
         return {
             'documents_created': self.documents_created,
+            'pdfs_created': self.pdfs_created,
             'text_replacements': self.text_replacements,
             'image_insertions': self.image_insertions,
             'images_found': self.images_found,
             'images_not_found': self.images_not_found,
-            'errors': self.errors
+            'errors': self.errors,
+            'image_cache_hits': self.image_cache_hits,
+            'image_cache_misses': self.image_cache_misses,
+            'documents_skipped': self.documents_skipped,
+            'documents_regenerated': self.documents_regenerated,
+            'documents_removed': self.documents_removed,
+            'documents_deduplicated': self.documents_deduplicated
         }
 
     def get_formatted_summary(self):
@@ -63,11 +118,48 @@ class Statistics:
             f"🖼️ Изображений вставлено: {self.image_insertions}",
         ]
 
+        if self.pdfs_created > 0:
+            summary.append(f"📑 PDF создано: {self.pdfs_created}")
+
         if total_images > 0:
             summary.append(f"✅ Изображений найдено: {self.images_found}/{total_images}")
             summary.append(f"❌ Изображений не найдено: {self.images_not_found}/{total_images}")
 
+        cache_requests = self.image_cache_hits + self.image_cache_misses
+        if cache_requests > 0:
+            summary.append(f"🗂️ Кэш изображений: {self.image_cache_hits}/{cache_requests} из кэша")
+
+        if self.incremental:
+            summary.append(f"⏭️ Пропущено без изменений: {self.documents_skipped}")
+            summary.append(f"🔁 Перегенерировано: {self.documents_regenerated}")
+            summary.append(f"🗑️ Удалено устаревших: {self.documents_removed}")
+
+        if self.documents_deduplicated > 0:
+            summary.append(f"♻️ Повторов без повторного рендеринга: {self.documents_deduplicated}")
+
         if self.errors > 0:
             summary.append(f"⚠️ Ошибок: {self.errors}")
 
+        if self.pipeline:
+            summary.extend(self._format_pipeline())
+
+        summary.extend(self.metrics.summary_lines())
+
         return summary
+
+    def _format_pipeline(self):
+        """Строки сводки по этапам конвейера"""
+        lines = [f"⏱️ Время генерации: {self.pipeline['wall_seconds']:.1f} с"]
+        for stage in self.pipeline['stages']:
+            busy = stage['busy_seconds'] / stage['workers']
+            rate = stage['items'] / busy if busy > 0 else 0.0
+            line = f"   {stage['name']}: {stage['items']} шт., {busy:.1f} с, {rate:.1f} шт./с"
+            if stage['workers'] > 1:
+                line += f", обработчиков {stage['workers']}"
+            if stage['queue_size']:
+                line += (
+                    f", очередь {stage['queue_mean_depth']:.1f} в среднем, "
+                    f"макс {stage['queue_max_depth']}/{stage['queue_size']}"
+                )
+            lines.append(line)
+        return lines
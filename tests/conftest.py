@@ -0,0 +1,61 @@
+"""
+Общие данные тестов: шаблон с текстовыми плейсхолдерами и конфигурация во временной папке
+"""
+import json
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+ROOT = Path(__file__).resolve().parent.parent
+PLACEHOLDERS = {
+    '{ИМЯ}': {'type': 'text', 'column': 'Имя'},
+    '{АДРЕС}': {'type': 'text', 'column': 'Адрес'}
+}
+
+
+def write_template(path):
+    """Шаблон с плейсхолдерами в абзаце, таблице и колонтитуле"""
+    document = Document()
+    document.add_paragraph('Получатель: {ИМЯ}')
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = '{ИМЯ}'
+    table.cell(0, 1).text = 'Адрес: {АДРЕС}.'
+    document.sections[0].header.paragraphs[0].text = 'Для {ИМЯ}'
+    document.save(path)
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Конфигурация проекта, все входные и выходные пути - во временной папке
+
+    make_config(render_mode='docx') создает шаблон и папку Word документов
+    word_<render_mode>; PDF не создаются, отчет и метрики отключены.
+    """
+    def make(render_mode='docx'):
+        with open(ROOT / 'config.json', 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        template = tmp_path / 'шаблон.docx'
+        write_template(template)
+        word_folder = tmp_path / f'word_{render_mode}'
+        word_folder.mkdir(exist_ok=True)
+
+        config['input']['word_template'] = str(template)
+        config['input']['images_folder'] = str(tmp_path / 'images')
+        config['excel_columns']['naming_column'] = 'Имя'
+        config['placeholders'] = PLACEHOLDERS
+        config['output'].update({
+            'word_folder': str(word_folder),
+            'pdf_folder': str(tmp_path / 'pdf'),
+            'report_file': None,
+            'plan_file': str(tmp_path / 'plan.csv'),
+            'metrics': {},
+            'shards': {'folder': str(tmp_path / 'shards')}
+        })
+        config['processing']['render_mode'] = render_mode
+        config['processing']['create_pdf'] = False
+        config['processing']['image_preprocessing']['cache_folder'] = str(tmp_path / '.image_cache')
+        return config
+
+    return make
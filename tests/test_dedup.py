@@ -0,0 +1,81 @@
+"""
+Дедупликация: одинаковые документы рендерятся один раз, повторы - ссылки или копии
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.core.document_generator import DocumentGenerator
+from src.core.word_processor import WordProcessor
+
+ROWS = [
+    {'Номер': 'А-1', 'Имя': 'Иванов', 'Адрес': 'ул. Садовая, 1'},
+    {'Номер': 'А-2', 'Имя': 'Петров', 'Адрес': 'ул. Садовая, 2'},
+    {'Номер': 'А-3', 'Имя': 'Иванов', 'Адрес': 'ул. Садовая, 1'},
+    {'Номер': 'А-4', 'Имя': 'Иванов', 'Адрес': 'ул. Садовая, 1'}
+]
+
+
+@pytest.fixture
+def dedup_config(tmp_path, make_config):
+    config = make_config()
+    config['excel_columns']['naming_column'] = 'Номер'
+    config['processing']['dedup'] = {'enabled': True, 'link': 'hardlink'}
+    config['output']['report_file'] = str(tmp_path / 'report.xlsx')
+    config['output']['report'] = {'enabled': True, 'sibling': 'jsonl'}
+    return config
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Имена документов, которые действительно прошли рендеринг"""
+    names = []
+    original = WordProcessor.create_document_from_template
+
+    def counting_render(self, row_data, output_path):
+        names.append(row_data['Номер'])
+        return original(self, row_data, output_path)
+
+    monkeypatch.setattr(WordProcessor, 'create_document_from_template', counting_render)
+    return names
+
+
+def word_path(config, name):
+    return Path(config['output']['word_folder']) / f"{name}.docx"
+
+
+@pytest.mark.parametrize('link', ['hardlink', 'copy'])
+def test_duplicates_rendered_once_and_linked(dedup_config, rendered, link):
+    dedup_config['processing']['dedup']['link'] = link
+
+    stats = DocumentGenerator(dedup_config).run(list(enumerate(ROWS)))
+
+    assert rendered == ['А-1', 'А-2']
+    assert (stats.documents_created, stats.documents_deduplicated, stats.errors) == (4, 2, 0)
+    original = word_path(dedup_config, 'А-1')
+    for name in ('А-3', 'А-4'):
+        duplicate = word_path(dedup_config, name)
+        assert duplicate.read_bytes() == original.read_bytes()
+        assert os.path.samefile(duplicate, original) == (link == 'hardlink')
+
+
+def test_report_marks_duplicates(dedup_config, rendered):
+    DocumentGenerator(dedup_config).run(list(enumerate(ROWS)))
+
+    report = Path(dedup_config['output']['report_file']).with_suffix('.jsonl')
+    records = [json.loads(line) for line in report.read_text(encoding='utf-8').splitlines()]
+    statuses = {record['filename']: record['status'] for record in records}
+    assert statuses == {'А-1': 'ok', 'А-2': 'ok', 'А-3': 'duplicate', 'А-4': 'duplicate'}
+    assert sorted(record['row'] for record in records) == [1, 2, 3, 4]
+
+
+def test_manifest_records_duplicates(dedup_config, rendered):
+    DocumentGenerator(dedup_config).run(list(enumerate(ROWS)), incremental=True)
+    stats = DocumentGenerator(dedup_config).run(list(enumerate(ROWS)), incremental=True)
+
+    manifest = json.loads((Path(dedup_config['output']['word_folder']).parent / 'manifest.json').read_text('utf-8'))
+    assert sorted(manifest['files']) == ['А-1', 'А-2', 'А-3', 'А-4']
+    assert (stats.documents_skipped, stats.documents_created) == (4, 0)
+    assert rendered == ['А-1', 'А-2']
@@ -0,0 +1,37 @@
+"""
+Генерация в пуле процессов: падение обработчика затрагивает только свою строку
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from src.core import generation
+from src.core.word_processor import WordProcessor
+
+original_render = WordProcessor.create_document_from_template
+
+
+def crashing_render(self, row_data, output_path):
+    """Рендеринг, который завершает процесс обработчика на строке 'crash'"""
+    if row_data['Имя'] == 'crash':
+        os._exit(1)
+    return original_render(self, row_data, output_path)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="процессы пула наследуют подмену только при fork")
+def test_crashing_row_fails_only_that_row(make_config, monkeypatch):
+    monkeypatch.setattr(WordProcessor, 'create_document_from_template', crashing_render)
+    config = make_config()
+    names = ['а', 'б', 'crash', 'в', 'г', 'д', 'е']
+    jobs = [(position, position, f'doc_{position}', {'Имя': name, 'Адрес': ''}) for position, name in enumerate(names)]
+
+    results = list(generation.generate_parallel(config, jobs, workers=2, chunk_size=3))
+
+    assert [result['position'] for result in results] == list(range(len(names)))
+    failed = [result['position'] for result in results if not result['success']]
+    assert failed == [2]
+    assert 'аварийно' in results[2]['error']
+    for result in results:
+        if result['success']:
+            assert (Path(config['output']['word_folder']) / f"{result['filename']}.docx").exists()
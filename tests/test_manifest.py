@@ -0,0 +1,72 @@
+"""
+Инкрементальные запуски: пропуск неизменных документов по манифесту
+"""
+from pathlib import Path
+
+import pytest
+
+from src.core.document_generator import DocumentGenerator
+
+ROWS = [{'Имя': f'Клиент {number}', 'Адрес': f'ул. Садовая, {number}'} for number in range(1, 4)]
+
+
+class FakeConverter:
+    """PDF конвертер без LibreOffice: available=False - конвертация недоступна"""
+
+    pool_size = 1
+
+    def __init__(self, available):
+        self.available = available
+        self.converted = 0
+
+    def is_available(self):
+        return self.available
+
+    def convert_word_to_pdf(self, word_path, pdf_path):
+        Path(pdf_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(pdf_path).write_bytes(b'%PDF-1.4')
+        self.converted += 1
+        return True
+
+    def close(self):
+        pass
+
+
+def run(config, converter):
+    return DocumentGenerator(config).run(list(enumerate(ROWS)), incremental=True, pdf_converter=converter)
+
+
+@pytest.mark.parametrize('available', [False, True])
+def test_second_run_skips_unchanged_rows(make_config, available):
+    config = make_config()
+    config['processing']['create_pdf'] = True
+
+    first = run(config, FakeConverter(available))
+    converter = FakeConverter(available)
+    second = run(config, converter)
+
+    assert (first.documents_created, first.pdfs_created) == (3, 3 if available else 0)
+    assert (second.documents_created, second.documents_skipped) == (0, 3)
+    assert converter.converted == 0
+
+
+def test_missing_pdf_regenerates_row(make_config):
+    config = make_config()
+    config['processing']['create_pdf'] = True
+    run(config, FakeConverter(True))
+
+    (Path(config['output']['pdf_folder']) / 'Клиент_2.pdf').unlink()
+    stats = run(config, FakeConverter(True))
+
+    assert (stats.documents_created, stats.documents_skipped, stats.documents_regenerated) == (1, 2, 1)
+    assert (Path(config['output']['pdf_folder']) / 'Клиент_2.pdf').exists()
+
+
+def test_rows_without_pdf_regenerate_when_converter_appears(make_config):
+    config = make_config()
+    config['processing']['create_pdf'] = True
+    run(config, FakeConverter(False))
+
+    stats = run(config, FakeConverter(True))
+
+    assert (stats.documents_created, stats.pdfs_created, stats.documents_skipped) == (3, 3, 0)
@@ -0,0 +1,53 @@
+"""
+План генерации: имена файлов плана совпадают с именами, которые создает генерация
+"""
+import pytest
+from openpyxl import Workbook
+
+from src.core.document_generator import DocumentGenerator
+from src.core.excel_processor import ExcelProcessor
+
+# Код - первая колонка (запасное имя), Имя - колонка именования
+ROWS = [
+    ('к1', 'Иванов', 'ул. Садовая, 1'),
+    ('к2', 'Иванов', 'ул. Садовая, 2'),
+    ('к3', None, 'ул. Садовая, 3'),
+    (None, '   ', 'ул. Садовая, 4'),
+    ('к5', 'ООО "Рога/Копыта": №1?', 'ул. Садовая, 5'),
+    ('к6', 42, 'ул. Садовая, 6'),
+    ('к7', 'Иванов_2', 'ул. Садовая, 7'),
+    ('к8', '  Петров Петр  ', 'ул. Садовая, 8'),
+    ('к9', 'a<b>|c*', 'ул. Садовая, 9')
+]
+
+
+def write_table(path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['Код', 'Имя', 'Адрес'])
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(path)
+
+
+@pytest.mark.parametrize('resolve_collisions', [False, True])
+def test_plan_names_match_generated_names(tmp_path, make_config, resolve_collisions):
+    config = make_config()
+    config['output']['resolve_collisions'] = resolve_collisions
+    write_table(tmp_path / 'таблица.xlsx')
+
+    excel_processor = ExcelProcessor(config)
+    excel_processor.load_file(str(tmp_path / 'таблица.xlsx'))
+    excel_processor.validate_structure()
+    excel_processor.clean_data()
+    generator = DocumentGenerator(config)
+
+    plan = generator.plan(excel_processor.data)
+    outputs = []
+    generator.run(excel_processor.iter_records(), outputs=outputs)
+
+    assert list(plan.rows['output_name']) == [name for _, name in outputs]
+    assert list(plan.rows['row']) == [number for number, _ in outputs]
+    names = list(plan.rows['output_name'])
+    assert names[:4] == ['Иванов', 'Иванов_2' if resolve_collisions else 'Иванов', 'к3', '0004']
+    assert names[4:] == ['ООО__Рога_Копыта___№1_', '0042', 'Иванов_2', 'Петров_Петр', 'a_b__c_']
@@ -0,0 +1,39 @@
+"""
+Быстрый рендеринг raw_xml: результат совпадает с python-docx
+"""
+import zipfile
+
+from lxml import etree
+
+from src.core.word_processor import WordProcessor
+
+
+def canonical_members(path):
+    """Распакованные элементы архива, XML - в каноническом виде"""
+    members = {}
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            data = archive.read(name)
+            if name.endswith('.xml') or name.endswith('.rels'):
+                data = etree.tostring(etree.fromstring(data), method='c14n')
+            members[name] = data
+    return members
+
+
+def test_raw_xml_matches_docx_rendering(tmp_path, make_config):
+    row = {'Имя': 'ООО "Рога & Копыта" <1>', 'Адрес': 'ул. Ленина, 1\nкв. 2\tподъезд 3'}
+    outputs = {}
+    for render_mode in ('docx', 'raw_xml'):
+        word_processor = WordProcessor(make_config(render_mode))
+        word_processor.load_template(word_processor.config['input']['word_template'])
+        assert (word_processor.raw_renderer is not None) == (render_mode == 'raw_xml')
+
+        outputs[render_mode] = tmp_path / f'{render_mode}.docx'
+        result = word_processor.create_document_from_template(row, str(outputs[render_mode]))
+        assert result['text_replacements'] == 4
+
+    docx_members = canonical_members(outputs['docx'])
+    raw_members = canonical_members(outputs['raw_xml'])
+    assert list(raw_members) == list(docx_members)
+    for name, data in docx_members.items():
+        assert raw_members[name] == data, name
@@ -0,0 +1,123 @@
+"""
+Разделение строк между запусками и объединение результатов
+"""
+import json
+import random
+
+import pandas as pd
+import pytest
+
+from src.core.sharding import RowSelection, merge_results, shard_of, _latest_split, _write_json
+
+NAMES = [f"Документ {number}" for number in range(200)]
+METRICS = {'documents': 1, 'wall_seconds': 1.0, 'document_stages': {}, 'peak_rss_bytes': 0}
+
+
+def test_shard_depends_only_on_name():
+    shards = {name: shard_of(name, 4) for name in NAMES}
+    shuffled = NAMES[:]
+    random.Random(1).shuffle(shuffled)
+
+    assert {name: shard_of(name, 4) for name in shuffled} == shards
+    assert set(shards.values()) == {1, 2, 3, 4}
+
+
+@pytest.mark.parametrize('shard, rows', [('2/4', None), (None, '20:150'), ('3/3', '10:')])
+def test_filter_data_and_filter_records_select_same_rows(shard, rows):
+    data = pd.DataFrame({'Имя': NAMES, 'Адрес': [str(number) for number in range(len(NAMES))]})
+    selection = RowSelection(shard=shard, rows=rows)
+
+    selected = selection.filter_data(data, data['Имя'])
+    records = selection.filter_records(enumerate(data.to_dict('records')), lambda row, number: row['Имя'])
+
+    assert list(selected.index) == [row_index for row_index, _ in records]
+    assert 0 < len(selected) < len(data)
+
+
+@pytest.mark.parametrize('shard', ['0/4', '5/4', '1/0', 'a/b', '2'])
+def test_invalid_shard(shard):
+    with pytest.raises(ValueError):
+        RowSelection(shard=shard)
+
+
+@pytest.mark.parametrize('rows', ['0:10', '10:5', 'a:b', '5'])
+def test_invalid_rows(rows):
+    with pytest.raises(ValueError):
+        RowSelection(rows=rows)
+
+
+def write_result(folder, index, count, outputs, finished='2026-01-01T00:00:00', errors=0):
+    result = {
+        'version': 1,
+        'label': f"shard-{index}-of-{count}",
+        'shard': [index, count],
+        'rows': None,
+        'finished': finished,
+        'summary': {'documents_created': len(outputs), 'errors': errors},
+        'metrics': METRICS,
+        'latencies': [0.1] * len(outputs),
+        'outputs': outputs
+    }
+    _write_json(folder / f"{result['label']}.json", result)
+    return result
+
+
+@pytest.fixture
+def shards_config(tmp_path):
+    return {'output': {'shards': {'folder': str(tmp_path)}}}
+
+
+def merged(tmp_path):
+    return json.loads((tmp_path / 'merged.json').read_text(encoding='utf-8'))
+
+
+def test_merge_complete_shards(tmp_path, shards_config):
+    write_result(tmp_path, 1, 2, [[1, 'а'], [3, 'в']])
+    write_result(tmp_path, 2, 2, [[2, 'б']])
+
+    assert merge_results(shards_config) == 0
+    summary = merged(tmp_path)
+    assert summary['summary']['documents_created'] == 3
+    assert summary['warnings'] == [] and summary['collisions'] == {}
+
+
+def test_merge_detects_name_collisions(tmp_path, shards_config):
+    write_result(tmp_path, 1, 2, [[1, 'а'], [3, 'в']])
+    write_result(tmp_path, 2, 2, [[2, 'в']])
+
+    assert merge_results(shards_config) == 1
+    assert merged(tmp_path)['collisions'] == {'в': ['shard-1-of-2', 'shard-2-of-2']}
+
+
+def test_merge_detects_overlapping_rows(tmp_path, shards_config):
+    write_result(tmp_path, 1, 2, [[1, 'а'], [2, 'б']])
+    write_result(tmp_path, 2, 2, [[2, 'в']])
+
+    assert merge_results(shards_config) == 1
+    assert merged(tmp_path)['overlapping_rows'] == 1
+
+
+def test_merge_warns_about_missing_shards(tmp_path, shards_config):
+    write_result(tmp_path, 1, 3, [[1, 'а']])
+    write_result(tmp_path, 3, 3, [[3, 'в']])
+
+    assert merge_results(shards_config) == 0
+    assert merged(tmp_path)['warnings'] == ["Нет результатов шардов: 2/3"]
+
+
+def test_latest_split_drops_older_shard_count(tmp_path, shards_config):
+    old = [write_result(tmp_path, index, 3, [[index, f"старый {index}"]]) for index in (1, 2, 3)]
+    new = [write_result(tmp_path, index, 2, [[index, f"новый {index}"]], finished='2026-02-01T00:00:00')
+           for index in (1, 2)]
+
+    assert _latest_split(old + new) == new
+    assert merge_results(shards_config) == 0
+    assert merged(tmp_path)['runs'] == ['shard-1-of-2', 'shard-2-of-2']
+
+
+def test_explicit_mixed_shard_counts_fail(tmp_path, shards_config):
+    write_result(tmp_path, 1, 3, [[1, 'а']])
+    write_result(tmp_path, 2, 2, [[2, 'б']])
+
+    paths = [tmp_path / 'shard-1-of-3.json', tmp_path / 'shard-2-of-2.json']
+    assert merge_results(shards_config, paths) == 1
@@ -0,0 +1,68 @@
+"""
+Потоковое чтение (--stream): документы совпадают с чтением всей таблицы
+"""
+import datetime
+import io
+import zipfile
+
+from docx import Document
+from openpyxl import Workbook
+
+from src.core.document_generator import DocumentGenerator
+from src.core.excel_processor import ExcelProcessor
+
+COLUMNS = ['Имя', 'Адрес', 'Дата', 'Сумма', 'Количество', 'Доля']
+ROWS = [
+    ('Иванов', 'ул. Садовая, 1', datetime.datetime(2024, 3, 5), 1500.5, 3, 0.25),
+    ('Петров', None, datetime.datetime(2024, 12, 31, 14, 30), 2, None, 1),
+    (None, 'ул. Садовая, 3', None, None, 7, None),
+    ('Сидоров', 'ул. Садовая, 4', datetime.datetime(2025, 1, 1), 1e6, 0, 0.1),
+    (None, None, None, None, None, None),
+    ('  Кузнецов  ', '', datetime.datetime(2023, 7, 9), -3.75, 12, 0.5)
+]
+
+
+def write_table(path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(COLUMNS)
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def streaming_config(tmp_path, make_config):
+    config = make_config()
+    config['placeholders'] = {f"{{{column.upper()}}}": {'type': 'text', 'column': column} for column in COLUMNS}
+    document = Document()
+    for placeholder in config['placeholders']:
+        document.add_paragraph(f"{placeholder[1:-1]}: {placeholder}")
+    document.save(config['input']['word_template'])
+    return config
+
+
+def document_xml(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return archive.read('word/document.xml')
+
+
+def test_stream_renders_same_documents_as_full_load(tmp_path, make_config):
+    config = streaming_config(tmp_path, make_config)
+    path = tmp_path / 'таблица.xlsx'
+    write_table(path)
+    generator = DocumentGenerator(config)
+
+    excel_processor = ExcelProcessor(config)
+    excel_processor.load_file(str(path))
+    excel_processor.validate_structure()
+    excel_processor.clean_data()
+    loaded = list(excel_processor.iter_records())
+    streamed = list(ExcelProcessor(config).iter_rows(str(path)))
+
+    assert [row_index for row_index, _ in streamed] == [row_index for row_index, _ in loaded]
+    loaded_documents = list(generator.iter_documents(row for _, row in loaded))
+    streamed_documents = list(generator.iter_documents(row for _, row in streamed))
+    assert len(loaded_documents) == 5
+    for (loaded_name, loaded_data), (streamed_name, streamed_data) in zip(loaded_documents, streamed_documents):
+        assert streamed_name == loaded_name
+        assert document_xml(streamed_data) == document_xml(loaded_data), loaded_name
@@ -0,0 +1,47 @@
+"""
+Подстановка плейсхолдеров за один проход
+"""
+from docx import Document
+from docx.oxml.ns import qn
+
+from src.core.substitution import SubstitutionEngine
+
+PLACEHOLDERS = {
+    '{ИМЯ}': {'type': 'text', 'column': 'Имя'}
+}
+
+
+def split_paragraph():
+    """Абзац, в котором Word разбил плейсхолдер на runs с разным форматированием"""
+    paragraph = Document().add_paragraph()
+    paragraph.add_run('Уважаемый ').bold = True
+    paragraph.add_run('{ИМ').italic = True
+    paragraph.add_run('Я}')
+    paragraph.add_run('!').underline = True
+    return paragraph
+
+
+def test_split_placeholder_keeps_run_formatting():
+    paragraph = split_paragraph()
+
+    replacements, anchors = SubstitutionEngine(PLACEHOLDERS).substitute(paragraph._p, {'{ИМЯ}': 'Иван'})
+
+    assert (replacements, anchors) == (1, [])
+    assert paragraph.text == 'Уважаемый Иван!'
+    runs = paragraph.runs
+    assert [run.text for run in runs] == ['Уважаемый ', 'Иван', '', '!']
+    assert runs[0].bold and runs[1].italic and runs[3].underline
+    assert not runs[0].italic and not runs[3].bold
+
+
+def test_line_breaks_and_tabs_become_word_elements():
+    paragraph = split_paragraph()
+
+    SubstitutionEngine(PLACEHOLDERS).substitute(paragraph._p, {'{ИМЯ}': 'Иван\nПетрович\tмл.'})
+
+    run = paragraph.runs[1]._r
+    assert [child.tag for child in run if child.tag != qn('w:rPr')] == [
+        qn('w:t'), qn('w:br'), qn('w:t'), qn('w:tab'), qn('w:t')
+    ]
+    assert [node.text for node in run.iter(qn('w:t'))] == ['Иван', 'Петрович', 'мл.']
+    assert paragraph.text == 'Уважаемый Иван\nПетрович\tмл.!'